@@ -54,6 +54,30 @@ def health_check():
         'message': 'FocusLearner Pro API is running'
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Runtime metrics for outbound calls and caches"""
+    from utils.http_client import get_http_client
+    from utils.response_cache import get_cache_metrics
+    from utils.singleflight import get_singleflight_metrics
+    from utils.resilience import get_breaker_metrics, get_hedge_metrics
+    from services.registry import (registered_services, get_leaderboard_service, get_search_result_cache,
+                                   get_content_aggregator, get_transcript_store, get_content_filter)
+    decision_cache = get_content_filter().decision_cache
+    return jsonify({
+        'http': get_http_client().get_metrics(),
+        'caches': get_cache_metrics(),
+        'singleflight': get_singleflight_metrics(),
+        'circuit_breakers': get_breaker_metrics(),
+        'hedges': get_hedge_metrics(),
+        'filter_decisions': decision_cache.get_stats() if decision_cache else None,
+        'search_results': get_search_result_cache().get_stats(),
+        'content_sources': get_content_aggregator().get_stats(),
+        'transcripts': get_transcript_store().get_stats(),
+        'leaderboards': get_leaderboard_service().get_stats(),
+        'services': registered_services()
+    })
+
 @app.route('/api', methods=['GET'])
 def api_info():
     """API information endpoint"""
@@ -0,0 +1,13 @@
+"""
+Fetch the NLTK data the backend uses into backend/nltk_data.
+Run once at build time (e.g. in the container image); the app never downloads at runtime.
+"""
+import nltk
+from services.content_filter import LOCAL_NLTK_DATA
+
+PACKAGES = ['stopwords']
+
+if __name__ == "__main__":
+    for package in PACKAGES:
+        print(f"Downloading NLTK '{package}' to {LOCAL_NLTK_DATA}...")
+        nltk.download(package, download_dir=LOCAL_NLTK_DATA, quiet=True)
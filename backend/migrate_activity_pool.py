@@ -0,0 +1,29 @@
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    print("Migrating game_challenges for activity pool...")
+    with app.app_context():
+        columns = [
+            ("is_pooled", "BOOLEAN DEFAULT 0"),
+            ("claimed_at", "DATETIME"),
+            ("content_hash", "VARCHAR(64)"),
+        ]
+        for name, ddl in columns:
+            try:
+                db.session.execute(text(f"ALTER TABLE game_challenges ADD COLUMN {name} {ddl}"))
+                db.session.commit()
+                print(f"Added {name} to game_challenges")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Column {name} may already exist: {e}")
+
+        try:
+            db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_game_challenges_content_hash ON game_challenges (content_hash)"))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Index creation failed: {e}")
+
+if __name__ == "__main__":
+    migrate()
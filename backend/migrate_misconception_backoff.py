@@ -0,0 +1,16 @@
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    print("Migrating misconception_jobs for retry backoff...")
+    with app.app_context():
+        try:
+            db.session.execute(text("ALTER TABLE misconception_jobs ADD COLUMN next_attempt_at TIMESTAMP"))
+            db.session.commit()
+            print("Added next_attempt_at to misconception_jobs")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Column next_attempt_at may already exist: {e}")
+
+if __name__ == "__main__":
+    migrate()
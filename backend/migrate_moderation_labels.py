@@ -0,0 +1,16 @@
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    print("Migrating content_items for moderation labels...")
+    with app.app_context():
+        try:
+            db.session.execute(text("ALTER TABLE content_items ADD COLUMN moderation_label VARCHAR(20)"))
+            db.session.commit()
+            print("Added moderation_label to content_items")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Column moderation_label may already exist: {e}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,48 @@
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    print("Migrating content_items for search result cache...")
+    with app.app_context():
+        columns = [
+            ("search_key", "VARCHAR(64)"),
+            ("search_rank", "INTEGER"),
+            ("fetched_at", "DATETIME"),
+            ("thumbnail", "VARCHAR(1000)"),
+            ("channel", "VARCHAR(200)"),
+            ("published_at", "VARCHAR(50)"),
+            ("details", "TEXT"),
+        ]
+        for name, ddl in columns:
+            try:
+                db.session.execute(text(f"ALTER TABLE content_items ADD COLUMN {name} {ddl}"))
+                db.session.commit()
+                print(f"Added {name} to content_items")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Column {name} may already exist: {e}")
+
+        try:
+            db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_content_items_search_key ON content_items (search_key)"))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Index creation failed: {e}")
+
+        try:
+            # Drop duplicates left by concurrent stores before enforcing one row per video and key
+            db.session.execute(text(
+                "DELETE FROM content_items WHERE search_key IS NOT NULL AND id NOT IN ("
+                "SELECT MIN(id) FROM content_items WHERE search_key IS NOT NULL GROUP BY search_key, source_id)"
+            ))
+            db.session.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_content_items_search_key_source_id "
+                "ON content_items (search_key, source_id)"
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Unique index creation failed: {e}")
+
+if __name__ == "__main__":
+    migrate()
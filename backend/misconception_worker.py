@@ -0,0 +1,23 @@
+from app import app, db
+from services.registry import get_misconception_queue
+import sys
+
+def run_worker(drain_only=False):
+    print("Starting misconception analysis worker...")
+    
+    with app.app_context():
+        # Create tables if they don't exist (just in case)
+        db.create_all()
+    
+    queue = get_misconception_queue()
+    if drain_only:
+        with app.app_context():
+            processed = queue.run_pending()
+        print(f"Processed {processed} queued analyses.")
+        return
+    
+    queue.run_worker(app)
+
+if __name__ == "__main__":
+    # `python misconception_worker.py --drain` processes the backlog once and exits
+    run_worker(drain_only='--drain' in sys.argv)
@@ -3,6 +3,7 @@ FocusLearner Pro - Database Models
 SQLAlchemy models for user data, focus sessions, and progress tracking
 """
 
+import json
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from enum import Enum
@@ -94,6 +95,8 @@ class FocusSession(db.Model):
 class ContentItem(db.Model):
     """Content item model for storing aggregated educational content"""
     __tablename__ = 'content_items'
+    # A cached result list holds each video once, even if two processes store it at the same time
+    __table_args__ = (db.UniqueConstraint('search_key', 'source_id', name='uq_content_items_search_key_source_id'),)
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
@@ -107,6 +110,38 @@ class ContentItem(db.Model):
     filter_reason = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Search result cache: rows sharing a search_key are one cached result list
+    search_key = db.Column(db.String(64), nullable=True, index=True)
+    search_rank = db.Column(db.Integer, nullable=True)
+    fetched_at = db.Column(db.DateTime, nullable=True)
+    thumbnail = db.Column(db.String(1000), nullable=True)
+    channel = db.Column(db.String(200), nullable=True)
+    published_at = db.Column(db.String(50), nullable=True)
+    details = db.Column(db.Text, nullable=True)  # JSON: tags, duration, category, statistics
+    
+    # Reviewer's verdict ('educational' / 'distracting'), used to train the relevance classifier
+    moderation_label = db.Column(db.String(20), nullable=True)
+    
+    def to_video_dict(self):
+        """Same shape as YouTubeService.search_videos results"""
+        video = {
+            'video_id': self.source_id,
+            'title': self.title,
+            'description': self.description,
+            'thumbnail': self.thumbnail,
+            'channel': self.channel,
+            'published_at': self.published_at,
+            'url': self.url,
+            'source': self.source,
+            'subject_focus': self.subject_focus,
+            'tags': [],
+            'is_filtered': self.is_filtered,
+            'filter_reason': self.filter_reason
+        }
+        if self.details:
+            video.update(json.loads(self.details))
+        return video
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -212,6 +247,20 @@ class Lecture(db.Model):
         }
 
 
+class VideoTranscript(db.Model):
+    """Stored YouTube transcript (zlib-compressed JSON segments), or a record that none is available"""
+    __tablename__ = 'video_transcripts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(50), unique=True, nullable=False, index=True)
+    is_available = db.Column(db.Boolean, default=False)
+    data = db.Column(db.LargeBinary, nullable=True)
+    segment_count = db.Column(db.Integer, default=0)
+    etag = db.Column(db.String(64), nullable=True)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+    retry_after = db.Column(db.DateTime, nullable=True)  # Unavailable transcripts are re-checked after this
+
+
 class ChatMessage(db.Model):
     """Chat message model for storing AI tutor conversations"""
     __tablename__ = 'chat_messages'
@@ -277,6 +326,11 @@ class GameChallenge(db.Model):
     data = db.Column(db.Text, nullable=False) # JSON string
     solution = db.Column(db.Text, nullable=False) # JSON string or specific answer
     
+    # Pre-generated inventory: pooled rows have no user until claimed
+    is_pooled = db.Column(db.Boolean, default=False)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True, index=True) # sha256 of data
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -352,6 +406,30 @@ class LearningLoopState(db.Model):
     intent = db.relationship('LearningIntent', backref='loop_states')
 
 
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+class MisconceptionJob(db.Model):
+    """Queued AI misconception analysis for a failed activity attempt"""
+    __tablename__ = 'misconception_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    loop_state_id = db.Column(db.Integer, db.ForeignKey('learning_loop_states.id'), nullable=False, index=True)
+    payload = db.Column(db.Text, nullable=False) # JSON: question, user_answer, correct_answer, subject
+    status = db.Column(db.Enum(JobStatus), default=JobStatus.PENDING, index=True)
+    attempts = db.Column(db.Integer, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=True) # Retry backoff; NULL = run as soon as possible
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
 class TopicMasteryState(str, Enum):
     NOT_STARTED = "NOT_STARTED"
     IN_PROGRESS = "IN_PROGRESS"
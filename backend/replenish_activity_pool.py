@@ -0,0 +1,20 @@
+from app import app, db
+from services.registry import get_activity_pool_service
+import sys
+
+def replenish_activity_pool(activity_types=None):
+    print("Replenishing pre-generated activity pool...")
+    
+    with app.app_context():
+        db.create_all()
+        
+        pool = get_activity_pool_service()
+        if not pool.ai_service.is_available:
+            print("Gemini is not configured (GOOGLE_API_KEY); the pool only holds generated activities.")
+            return
+        created = pool.replenish_all(activity_types)
+        print(f"Successfully generated {created} pooled activities.")
+
+if __name__ == "__main__":
+    # Optional: restrict to specific types, e.g. `python replenish_activity_pool.py coding lab`
+    replenish_activity_pool(sys.argv[1:] or None)
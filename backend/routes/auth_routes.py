@@ -14,10 +14,10 @@ if parent_dir not in sys.path:
 
 from models import User, UserPreferences, db
 from utils.auth import generate_token, token_required
-from services.google_auth import GoogleAuthService
+from services.registry import get_google_auth_service
 
 auth_routes = Blueprint('auth', __name__, url_prefix='/api/auth')
-google_auth_service = GoogleAuthService()
+google_auth_service = get_google_auth_service()
 
 
 @auth_routes.route('/register', methods=['POST'])
@@ -3,19 +3,78 @@ FocusLearner Pro - Chat Routes
 API endpoints for AI Tutor chat
 """
 
-from flask import Blueprint, request, jsonify
-from services.ai_service import AIService
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+import os
+import json
+from services.registry import get_ai_service, get_conversation_memory, get_transcript_store
+from models import FocusSession
 from utils.auth import token_required
+from utils.resilience import deadline_scope, with_deadline
 
 chat_routes = Blueprint('chat', __name__, url_prefix='/api/chat')
-ai_service = AIService()
+ai_service = get_ai_service()
 
 # Simple in-memory history for demo purposes (production would use DB)
 # Key: user_id, Value: List of messages
 chat_histories = {} 
 
+# Time budget for a tutor reply (blocking, including any hedged attempt, or streamed)
+CHAT_DEADLINE_SECONDS = float(os.getenv('CHAT_DEADLINE_SECONDS', '15'))
+
+FALLBACK_REPLY = "I'm having trouble connecting to my brain right now. Please try again."
+
+# Shown after a reply that was cut off; such replies stay out of the model's context
+INCOMPLETE_MARKER = " [incomplete]"
+
+
+def _record_turn(user_id, history, message, response_text, remember=True):
+    """
+    Append a user/tutor exchange to the user's history and return the trimmed
+    history. remember=False keeps it out of conversation memory, i.e. out of
+    the model's context (for fallback and cut-off replies).
+    """
+    history.append({'role': 'user', 'parts': [message]})
+    history.append({'role': 'model', 'parts': [response_text]})
+    if remember:
+        get_conversation_memory().add_turn(user_id, message, response_text)
+    
+    # Limit history size
+    if len(history) > 20: 
+        history = history[-20:]
+        
+    chat_histories[user_id] = history
+    return history
+
+
+def _transcript_excerpts(user_id, data, message):
+    """
+    Transcript passages for the video being watched: from the request's
+    video_id/timestamp, else the user's active focus session.
+    """
+    video_id = data.get('video_id')
+    timestamp = data.get('timestamp')
+    if not video_id:
+        session = FocusSession.query.filter_by(user_id=user_id, is_locked=True).first()
+        if not session or not session.current_video_id:
+            return []
+        video_id, timestamp = session.current_video_id, session.current_timestamp
+    
+    try:
+        return get_transcript_store().excerpts(video_id, message, float(timestamp) if timestamp is not None else None)
+    except Exception as e:
+        print(f"Transcript retrieval failed: {e}")
+        return []
+
+
+def _sse(payload, event=None):
+    """Format a Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+
 @chat_routes.route('/send', methods=['POST'])
 @token_required
+@with_deadline(CHAT_DEADLINE_SECONDS)
 def send_message():
     """Send message to AI Tutor"""
     data = request.get_json()
@@ -31,20 +90,17 @@ def send_message():
     
     try:
         # Call AI
-        response_text = ai_service.chat(message, context, history)
+        # Prompt context: running summary + recent turns within a token budget
+        summary, recent = get_conversation_memory().get_context(user_id)
+        excerpts = _transcript_excerpts(user_id, data, message)
+        response_text = ai_service.chat(message, context, recent, summary, excerpts)
         
-        if not response_text:
-             response_text = "I'm having trouble connecting to my brain right now. Please try again."
+        answered = bool(response_text)
+        if not answered:
+             response_text = FALLBACK_REPLY
 
         # Update History
-        history.append({'role': 'user', 'parts': [message]})
-        history.append({'role': 'model', 'parts': [response_text]})
-        
-        # Limit history size
-        if len(history) > 20: 
-            history = history[-20:]
-            
-        chat_histories[user_id] = history
+        history = _record_turn(user_id, history, message, response_text, remember=answered)
         
         return jsonify({
             'response': response_text,
@@ -55,6 +111,61 @@ def send_message():
         print(f"Chat Error: {e}")
         return jsonify({'error': 'Failed to process message'}), 500
 
+@chat_routes.route('/stream', methods=['POST'])
+@token_required
+def stream_message():
+    """
+    Send message to AI Tutor and stream the reply as Server-Sent Events.
+    Emits {'delta': text} chunks, then a 'done' event with the full response and history.
+    """
+    data = request.get_json()
+    user_id = request.current_user_id
+    message = data.get('message')
+    context = data.get('context') # Video title/subject
+    
+    if not message:
+        return jsonify({'error': 'Message is required'}), 400
+        
+    history = chat_histories.get(user_id, [])
+    excerpts = _transcript_excerpts(user_id, data, message)
+    
+    def generate():
+        chunks = []
+        failed = False
+        summary, recent = get_conversation_memory().get_context(user_id)
+        # The generator runs after the view returns, so the deadline is set here
+        with deadline_scope(CHAT_DEADLINE_SECONDS) as deadline:
+            try:
+                for chunk in ai_service.chat_stream(message, context, recent, summary, excerpts):
+                    chunks.append(chunk)
+                    yield _sse({'delta': chunk})
+                    if deadline.expired:
+                        print("Chat Stream Error: deadline exceeded")
+                        failed = True
+                        break
+            except Exception as e:
+                print(f"Chat Stream Error: {e}")
+                failed = True
+        
+        response_text = ''.join(chunks)
+        if not response_text:
+            response_text = FALLBACK_REPLY
+            yield _sse({'delta': response_text})
+        elif failed:
+            # Keep what the learner saw, marked, but never feed a cut-off reply back to the model
+            response_text += INCOMPLETE_MARKER
+            yield _sse({'delta': INCOMPLETE_MARKER})
+        
+        complete = bool(chunks) and not failed
+        updated_history = _record_turn(user_id, history, message, response_text, remember=complete)
+        yield _sse({'response': response_text, 'incomplete': not complete, 'history': updated_history}, event='done')
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @chat_routes.route('/history', methods=['GET'])
 @token_required
 def get_history():
@@ -69,4 +180,5 @@ def clear_history():
     """Clear chat history"""
     user_id = request.current_user_id
     chat_histories[user_id] = []
+    get_conversation_memory().clear(user_id)
     return jsonify({'message': 'History cleared'}), 200
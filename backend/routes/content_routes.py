@@ -12,23 +12,27 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-from services.youtube_service import YouTubeService
-from services.content_filter import ContentFilter
+from services.registry import get_youtube_service, get_content_filter, get_content_aggregator, get_transcript_store
 from models import ContentItem, db
+from utils.resilience import with_deadline
 
 content_routes = Blueprint('content', __name__, url_prefix='/api/content')
-youtube_service = YouTubeService()
-content_filter = ContentFilter()
+youtube_service = get_youtube_service()
+content_filter = get_content_filter()
+
+# Time budget for a search (query refinement + YouTube)
+SEARCH_DEADLINE_SECONDS = float(os.getenv('SEARCH_DEADLINE_SECONDS', '10'))
 
 
 @content_routes.route('/search', methods=['GET'])
+@with_deadline(SEARCH_DEADLINE_SECONDS)
 def search_content():
     """Search for educational content across all sources"""
     from utils.auth import get_token_from_request, verify_token
     
     query = request.args.get('query', '')
     subject_focus = request.args.get('subject_focus', '')
-    source = request.args.get('source', 'youtube')  # youtube, nptel, udemy
+    source = request.args.get('source', 'youtube')  # youtube, nptel, udemy, comma-separated list or 'all'
     
     # Try to get user preferences if authenticated
     user_preferences = None
@@ -52,27 +56,22 @@ def search_content():
     if not query:
         query = subject_focus
     
-    if source == 'youtube':
-        videos = youtube_service.search_videos(
-            query=query,
-            subject_focus=subject_focus,
-            max_results=20
-        )
-        
-        return jsonify({
-            'source': source,
-            'query': query,
-            'subject_focus': subject_focus,
-            'results': videos,
-            'count': len(videos)
-        }), 200
-    
-    # Placeholder for other sources
+    content_aggregator = get_content_aggregator()
+    sources = list(content_aggregator.adapters) if source == 'all' else [s.strip() for s in source.split(',') if s.strip()]
+    unknown = [s for s in sources if s not in content_aggregator.adapters]
+    if unknown or not sources:
+        return jsonify({'error': f"Unknown source(s): {', '.join(unknown) or source}"}), 400
+    
+    aggregated = content_aggregator.search(query, subject_focus, sources, limit=20)
+    
     return jsonify({
         'source': source,
         'query': query,
-        'results': [],
-        'message': f'{source} integration coming soon'
+        'subject_focus': subject_focus,
+        'results': aggregated['results'],
+        'count': len(aggregated['results']),
+        'sources': aggregated['sources'],
+        'partial': aggregated['partial']
     }), 200
 
 
@@ -99,17 +98,82 @@ def filter_content():
 
 @content_routes.route('/transcript/<video_id>', methods=['GET'])
 def get_transcript(video_id: str):
-    """Get transcript for a YouTube video"""
-    transcript = youtube_service.get_video_transcript(video_id)
+    """Get transcript for a YouTube video (supports If-None-Match / If-Modified-Since)"""
+    record = get_transcript_store().get(video_id)
+    
+    if record is None:
+        return jsonify({
+            'error': 'Transcript could not be fetched, try again later',
+            'video_id': video_id
+        }), 503
     
-    if not transcript:
+    if not record.is_available:
         return jsonify({
             'error': 'Transcript not available for this video',
             'video_id': video_id
         }), 404
     
-    return jsonify({
+    # Skip decompressing when the client already has this version
+    if request.if_none_match.contains(record.etag):
+        return '', 304, {'ETag': f'"{record.etag}"'}
+    
+    response = jsonify({
         'video_id': video_id,
-        'transcript': transcript
-    }), 200
+        'transcript': get_transcript_store().load_segments(record)
+    })
+    # Transcripts don't change once stored
+    response.set_etag(record.etag)
+    response.last_modified = record.fetched_at
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
 
+
+
+@content_routes.route('/transcript/<video_id>/range', methods=['GET'])
+def get_transcript_range(video_id: str):
+    """
+    Part of a transcript: segments overlapping [start, end) seconds, or the
+    `count` segments around `at` seconds (e.g. the current playback position).
+    """
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    at = request.args.get('at', type=float)
+    count = min(request.args.get('count', 20, type=int), 200)
+    
+    if at is None and (start is None or end is None):
+        return jsonify({'error': 'Provide start and end, or at'}), 400
+    if count < 1 or (at is None and end <= start):
+        return jsonify({'error': 'Empty range'}), 400
+    
+    store = get_transcript_store()
+    record = store.get(video_id)
+    
+    if record is None:
+        return jsonify({
+            'error': 'Transcript could not be fetched, try again later',
+            'video_id': video_id
+        }), 503
+    
+    if not record.is_available:
+        return jsonify({
+            'error': 'Transcript not available for this video',
+            'video_id': video_id
+        }), 404
+    
+    if at is not None:
+        first, segments = store.segments_around(record, at, count)
+    else:
+        first, segments = store.segments_between(record, start, end)
+    
+    response = jsonify({
+        'video_id': video_id,
+        'first_index': first,
+        'total_segments': record.segment_count,
+        'transcript': segments
+    })
+    response.set_etag(f"{record.etag}-{first}-{len(segments)}")
+    response.last_modified = record.fetched_at
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
@@ -14,11 +14,15 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from models import FocusSession, User, db
-from services.youtube_service import YouTubeService
+from services.registry import get_youtube_service, get_analytics_service
 from utils.auth import token_required
+from utils.resilience import with_deadline
 
 focus_routes = Blueprint('focus', __name__, url_prefix='/api/focus')
-youtube_service = YouTubeService()
+youtube_service = get_youtube_service()
+
+# Time budget for a search (query refinement + YouTube)
+SEARCH_DEADLINE_SECONDS = float(os.getenv('SEARCH_DEADLINE_SECONDS', '10'))
 
 
 @focus_routes.route('/lock', methods=['POST'])
@@ -139,6 +143,7 @@ def update_current_video():
 
 @focus_routes.route('/content', methods=['GET'])
 @token_required
+@with_deadline(SEARCH_DEADLINE_SECONDS)
 def get_focused_content():
     """Get filtered content for the current focus session"""
     user_id = request.current_user_id
@@ -167,8 +172,7 @@ def get_focused_content():
     }), 200
 
 # Initialize Analytics Service
-from services.analytics_service import AnalyticsService
-analytics_service = AnalyticsService()
+analytics_service = get_analytics_service()
 
 @focus_routes.route('/analytics/summary', methods=['GET'])
 @token_required
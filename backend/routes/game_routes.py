@@ -4,7 +4,6 @@ API endpoints for gamified learning challenges
 """
 
 from flask import Blueprint, request, jsonify
-import json
 import sys
 import os
 
@@ -13,16 +12,18 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-from services.game_service import GameService
-from services.ai_service import AIService
+from services.registry import get_game_service, get_ai_service, get_learning_loop_service, get_activity_pool_service
 from utils.auth import token_required
-from models import LearningIntent, GameChallenge
-from services.learning_loop_service import LearningLoopService
+from utils.resilience import with_deadline
+from models import LearningIntent
 
 game_routes = Blueprint('game', __name__, url_prefix='/api/game')
-game_service = GameService()
-ai_service = AIService()
-loop_service = LearningLoopService()
+game_service = get_game_service()
+ai_service = get_ai_service()
+loop_service = get_learning_loop_service()
+
+# Time budget for live activity generation before falling back
+ACTIVITY_DEADLINE_SECONDS = float(os.getenv('ACTIVITY_DEADLINE_SECONDS', '20'))
 
 
 @game_routes.route('/modules', methods=['GET'])
@@ -111,6 +112,22 @@ def get_leaderboard(module_id: str):
     }), 200
 
 
+@game_routes.route('/leaderboard/<module_id>/me', methods=['GET'])
+@token_required
+def get_leaderboard_standing(module_id: str):
+    """Get the current user's rank and neighbours on a leaderboard"""
+    user_id = request.current_user_id
+    subject = request.args.get('subject')
+    topic = request.args.get('topic')
+    radius = min(request.args.get('radius', 2, type=int), 25)
+    
+    standing = game_service.get_leaderboard_standing(user_id, subject, topic, radius)
+    if standing is None:
+        return jsonify({'module_id': module_id, 'rank': None, 'total': None, 'neighbors': []}), 200
+    
+    return jsonify(dict(standing, module_id=module_id)), 200
+
+
 
 @game_routes.route('/challenge/generate', methods=['POST'])
 @token_required
@@ -133,6 +150,7 @@ def generate_challenge():
 
 @game_routes.route('/activity/generate', methods=['POST'])
 @token_required
+@with_deadline(ACTIVITY_DEADLINE_SECONDS)
 def generate_activity():
     """Generate a specific activity securely"""
     user_id = request.current_user_id
@@ -151,8 +169,15 @@ def generate_activity():
         loop_state = loop_service.get_current_stage(user_id, intent.id)
     
     try:
-        # Pass ai_service explicitly, and intent
-        activity = game_service.create_activity(ai_service, user_id, subject, topic, activity_type, intent, loop_state)
+        # Serve from the pre-generated pool unless the activity must be adapted to retries
+        activity = None
+        if intent and not (loop_state and loop_state.attempts > 0):
+            resolved_type = ai_service.resolve_activity_type(subject, activity_type)
+            activity = get_activity_pool_service().claim(user_id, intent, resolved_type)
+        
+        if activity is None:
+            # Pass ai_service explicitly, and intent
+            activity = game_service.create_activity(ai_service, user_id, subject, topic, activity_type, intent, loop_state)
         return jsonify({'activity': activity}), 200
     except Exception as e:
         print(f"Activity generation error: {e}")
@@ -175,35 +200,17 @@ def submit_activity_route():
         return jsonify({'error': 'Challenge ID and Answer are required'}), 400
         
     try:
-        result = game_service.submit_activity(user_id, challenge_id, answer, violation_count)
+        # Grading, mastery, progress and the learning loop commit together
+        result = game_service.submit_activity(user_id, challenge_id, answer, violation_count, loop_service=loop_service)
         if 'error' in result:
              return jsonify(result), 404
              
-        # Update Learning Loop State
-        challenge = GameChallenge.query.get(challenge_id)
-        if challenge and challenge.learning_intent_id:
-            # Prepare metadata for AI analysis
-            try:
-                content_data = json.loads(challenge.data)
-                solution_data_local = json.loads(challenge.solution)
-                correct_val = solution_data_local.get('answer') if isinstance(solution_data_local, dict) else solution_data_local
-            except:
-                content_data = {}
-                correct_val = "Unknown"
-                
-            metadata = {
-                "question": content_data.get('question') or content_data.get('description') or "Unknown Question",
-                "user_answer": str(answer),
-                "correct_answer": str(correct_val),
-                "subject": challenge.subject
-            }
-            loop_update = loop_service.update_stage(user_id, challenge.learning_intent_id, result['is_correct'], result.get('score', 0), metadata)
-            result['loop_status'] = loop_update
-             
         return jsonify({'result': result}), 200
     except Exception as e:
         print(f"Submission error: {e}")
         return jsonify({'error': 'Failed to process submission'}), 500
+
+
 @game_routes.route('/mastery', methods=['GET'])
 @token_required
 def get_mastery_state():
@@ -15,10 +15,15 @@ if parent_dir not in sys.path:
 
 from models import Lecture, LearningIntent, db
 from utils.auth import token_required
-from services.ai_service import AIService
+from utils.resilience import with_deadline
+from services.registry import get_ai_service, get_youtube_service, get_learning_loop_service, get_transcript_store
 
 lecture_routes = Blueprint('lecture', __name__, url_prefix='/api/lectures')
-ai_service = AIService()
+ai_service = get_ai_service()
+
+# Time budgets for routes that wait on Gemini/YouTube
+LECTURE_CREATE_DEADLINE_SECONDS = float(os.getenv('LECTURE_CREATE_DEADLINE_SECONDS', '20'))
+QUIZ_DEADLINE_SECONDS = float(os.getenv('QUIZ_DEADLINE_SECONDS', '20'))
 
 
 @lecture_routes.route('/', methods=['GET'])
@@ -36,6 +41,7 @@ def get_lectures():
 
 @lecture_routes.route('/', methods=['POST'])
 @token_required
+@with_deadline(LECTURE_CREATE_DEADLINE_SECONDS)
 def create_lecture():
     """Create a new lecture"""
     user_id = request.current_user_id
@@ -50,26 +56,25 @@ def create_lecture():
     if not title or not subject or not topic:
         return jsonify({'error': 'Title, subject, and topic are required'}), 400
     
+    # Look up Learning Intent
+    intent = LearningIntent.query.filter_by(subject=subject, topic=topic).first()
+    intent_id = intent.id if intent else None
+
     # Auto-generate content if no videos provided
     if not video_ids:
         print(f"Auto-generating content for: {subject} - {topic}")
-        from services.youtube_service import YouTubeService
-        youtube_service = YouTubeService()
+        youtube_service = get_youtube_service()
         
         # Construct a targeted query
         query = f"{topic} lecture tutorial"
         
-        # Search for videos
-        videos = youtube_service.search_videos(query, subject_focus=subject, max_results=5)
+        # Search for videos, ranked against the intent's topic and outcomes
+        videos = youtube_service.search_videos(query, subject_focus=subject, max_results=5, intent=intent)
         
         # Extract IDs
         video_ids = [v['video_id'] for v in videos]
         print(f"Found {len(video_ids)} videos: {video_ids}")
 
-    # Look up Learning Intent
-    intent = LearningIntent.query.filter_by(subject=subject, topic=topic).first()
-    intent_id = intent.id if intent else None
-
     lecture = Lecture(
         user_id=user_id,
         title=title,
@@ -83,6 +88,9 @@ def create_lecture():
     db.session.add(lecture)
     db.session.commit()
     
+    # Lecture videos will be watched (and asked about), so store their transcripts now
+    get_transcript_store().prefetch(video_ids)
+    
     return jsonify({
         'message': 'Lecture created successfully',
         'lecture': lecture.to_dict()
@@ -127,6 +135,9 @@ def update_lecture(lecture_id):
     
     db.session.commit()
     
+    if data.get('video_ids'):
+        get_transcript_store().prefetch(data['video_ids'])
+    
     return jsonify({
         'message': 'Lecture updated successfully',
         'lecture': lecture.to_dict()
@@ -151,6 +162,7 @@ def delete_lecture(lecture_id):
 
 @lecture_routes.route('/quiz/generate', methods=['POST'])
 @token_required
+@with_deadline(QUIZ_DEADLINE_SECONDS)
 def generate_quiz():
     """Generate an AI quiz for a topic"""
     data = request.get_json()
@@ -169,8 +181,7 @@ def generate_quiz():
         return jsonify({'error': 'Failed to generate quiz'}), 500
 
 
-from services.learning_loop_service import LearningLoopService
-loop_service = LearningLoopService()
+loop_service = get_learning_loop_service()
 
 @lecture_routes.route('/<int:lecture_id>/complete', methods=['POST'])
 @token_required
@@ -42,10 +42,10 @@ def get_learning_intent(intent_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-from services.learning_loop_service import LearningLoopService
+from services.registry import get_learning_loop_service
 from utils.auth import token_required
 
-loop_service = LearningLoopService()
+loop_service = get_learning_loop_service()
 
 @taxonomy_bp.route('/loop/status', methods=['GET'])
 @token_required
@@ -75,5 +75,6 @@ def get_loop_status():
         'attempts': state.attempts,
         'last_updated': state.last_updated.isoformat(),
         'feedback': feedback_text,
-        'remediation_focus': remediation_focus
+        'remediation_focus': remediation_focus,
+        'analysis_pending': loop_service.misconception_queue.has_pending(state.id)
     }), 200
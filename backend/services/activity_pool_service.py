@@ -0,0 +1,152 @@
+"""
+FocusLearner Pro - Activity Pool Service
+Keeps an inventory of pre-generated activities per LearningIntent so requests
+don't have to wait for an LLM round trip
+"""
+import os
+import json
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from flask import current_app
+from models import db, GameChallenge, LearningIntent
+from .game_service import GameService
+from .registry import get_game_service
+
+
+class ActivityPoolService:
+    POOL_TYPES = ['coding', 'lab', 'crossword']
+
+    def __init__(self, ai_service, game_service: Optional[GameService] = None):
+        self.ai_service = ai_service
+        self.game_service = game_service or get_game_service()
+        self.enabled = os.getenv('ACTIVITY_POOL_ENABLED', 'true').lower() == 'true'
+        self.target_size = int(os.getenv('ACTIVITY_POOL_TARGET', '5'))
+        self.low_water = int(os.getenv('ACTIVITY_POOL_LOW_WATER', '2'))
+
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def _available_query(self, intent_id, activity_type):
+        return GameChallenge.query.filter(
+            GameChallenge.is_pooled.is_(True),
+            GameChallenge.user_id.is_(None),
+            GameChallenge.learning_intent_id == intent_id,
+            GameChallenge.activity_type == activity_type
+        )
+
+    def available_count(self, intent_id, activity_type) -> int:
+        return self._available_query(intent_id, activity_type).count()
+
+    def claim(self, user_id, intent, activity_type) -> Optional[Dict]:
+        """
+        Atomically hand out a pooled activity to a user.
+
+        Skips activities whose content the user has already been given. Returns the
+        sanitized activity, or None if the pool has nothing suitable (a refill is
+        requested either way once the pool is below the low-water mark).
+        """
+        if not self.enabled or activity_type not in self.POOL_TYPES:
+            return None
+
+        seen_hashes = db.session.query(GameChallenge.content_hash).filter(
+            GameChallenge.user_id == user_id,
+            GameChallenge.content_hash.isnot(None)
+        )
+        candidates = self._available_query(intent.id, activity_type)\
+            .filter(~GameChallenge.content_hash.in_(seen_hashes))\
+            .order_by(GameChallenge.created_at)\
+            .limit(5)\
+            .all()
+
+        claimed = None
+        for candidate in candidates:
+            # Conditional update: only one concurrent claimer can win a row
+            updated = GameChallenge.query.filter(
+                GameChallenge.id == candidate.id,
+                GameChallenge.user_id.is_(None)
+            ).update({'user_id': user_id, 'claimed_at': datetime.utcnow()}, synchronize_session=False)
+            db.session.commit()
+            if updated:
+                claimed = candidate
+                break
+
+        if self.available_count(intent.id, activity_type) < self.low_water:
+            self.request_refill(intent.id, activity_type)
+
+        if not claimed:
+            return None
+        return self.game_service.sanitize_activity(json.loads(claimed.data), claimed.id)
+
+    def replenish(self, intent, activity_type) -> int:
+        """
+        Generate activities until the pool for (intent, type) reaches its target size.
+        Content identical to an activity already waiting in the pool is dropped.
+        """
+        # Without Gemini the generators return fixed mock content, which mustn't fill the pool
+        if not self.ai_service.is_available:
+            return 0
+        missing = self.target_size - self.available_count(intent.id, activity_type)
+        created = 0
+        for _ in range(max(0, missing)):
+            generated_data = self.ai_service.generate_result_based_activity(
+                intent.subject, intent.topic, activity_type, intent, fresh=True
+            )
+            if 'error' in generated_data:
+                print(f"Activity pool: generation failed for intent {intent.id}/{activity_type}: {generated_data['error']}")
+                break
+            challenge = self.game_service.build_challenge(
+                None, intent.subject, intent.topic, activity_type, generated_data, intent, is_pooled=True
+            )
+            duplicate = self._available_query(intent.id, activity_type)\
+                .filter(GameChallenge.content_hash == challenge.content_hash).first()
+            if duplicate:
+                continue
+            db.session.add(challenge)
+            db.session.commit()
+            created += 1
+        return created
+
+    def replenish_all(self, activity_types=None) -> int:
+        """Top up every (intent, type) pool. Intended for off-peak batch runs."""
+        created = 0
+        for intent in LearningIntent.query.all():
+            for activity_type in activity_types or self.POOL_TYPES:
+                created += self.replenish(intent, activity_type)
+        return created
+
+    def request_refill(self, intent_id, activity_type):
+        """Queue a background refill (deduplicated per intent/type)"""
+        if not self.ai_service.is_available:
+            return
+        key = (intent_id, activity_type)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._worker is None or not self._worker.is_alive():
+                app = current_app._get_current_object()
+                self._worker = threading.Thread(target=self._worker_loop, args=(app,), daemon=True)
+                self._worker.start()
+        self._queue.put(key)
+
+    def _worker_loop(self, app):
+        while True:
+            intent_id, activity_type = self._queue.get()
+            try:
+                with app.app_context():
+                    intent = LearningIntent.query.get(intent_id)
+                    if intent:
+                        created = self.replenish(intent, activity_type)
+                        print(f"Activity pool: added {created} {activity_type} activities for intent {intent_id}")
+                    db.session.remove()
+            except Exception as e:
+                print(f"Activity pool refill failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard((intent_id, activity_type))
+                self._queue.task_done()
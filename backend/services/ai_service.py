@@ -5,23 +5,67 @@ Service for interacting with Google Gemini AI for content generation
 
 import os
 import json
-import requests
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Iterator, Optional
+from utils.http_client import get_http_client, is_upstream_failure
+from utils.response_cache import get_response_cache, ResponseCache
+from utils.singleflight import get_singleflight
+from utils.resilience import current_deadline, get_circuit_breaker, hedged_call
+from utils.upstreams import upstream_base_url, using_stub
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 1024,
+}
+
+MOCK_CHAT_REPLY = "I'm your AI Tutor. Since I'm running in mock mode, I can't really see the video, but I'm here to help! (Please configure GOOGLE_API_KEY)"
 
 class AIService:
     """Service for AI-powered content generation using Gemini REST API"""
     
     def __init__(self):
-        self.api_key = os.getenv('GOOGLE_API_KEY')
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+        self.api_key = os.getenv('GOOGLE_API_KEY') or ('stub-key' if using_stub() else None)
+        self.model_url = f"{upstream_base_url('GEMINI')}/models/gemini-1.5-flash"
+        self.base_url = f"{self.model_url}:generateContent"
+        self.stream_url = f"{self.model_url}:streamGenerateContent"
+        self.http = get_http_client()
+        self.response_cache = get_response_cache('gemini')
+        self.inflight = get_singleflight('gemini')
+        # Refined search queries per normalized (subject, query); they rarely go out of date
+        self.refinement_cache = get_response_cache(
+            'search_refinement', ttl=int(os.getenv('SEARCH_REFINE_TTL', str(30 * 86400)))
+        )
+        self.serve_stale = os.getenv('AI_CACHE_SERVE_STALE', 'true').lower() == 'true'
+        self.breaker = get_circuit_breaker('gemini')
+        self.hedge_enabled = os.getenv('GEMINI_HEDGE_ENABLED', 'true').lower() == 'true'
+        self.hedge_min_delay = float(os.getenv('GEMINI_HEDGE_MIN_DELAY', '2.0'))
         
         if not self.api_key:
             print("Warning: GOOGLE_API_KEY not found. AI features will use fallback mock data.")
 
+    @property
+    def is_available(self) -> bool:
+        """Whether Gemini is configured (otherwise generators return mock content)"""
+        return bool(self.api_key)
+
     def _call_gemini(self, prompt: str) -> Optional[str]:
-        """Helper to call Gemini REST API"""
+        """
+        Helper to call Gemini REST API.
+        Returns None (so callers take their cached/fallback path) if the request
+        deadline has passed, the circuit breaker is open, or the call fails.
+        """
         if not self.api_key:
             return None
+
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            print("Gemini call skipped: request deadline exceeded")
+            return None
+        if not self.breaker.allow():
+            print("Gemini call skipped: circuit breaker open")
+            return None
             
         headers = {
             'Content-Type': 'application/json'
@@ -31,26 +75,141 @@ class AIService:
             "contents": [{
                 "parts": [{"text": prompt}]
             }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "topK": 40,
-                "topP": 0.95,
-                "maxOutputTokens": 1024,
-            }
+            "generationConfig": GENERATION_CONFIG
         }
         
+        response = None
+        started = time.monotonic()
         try:
-            response = requests.post(f"{self.base_url}?key={self.api_key}", headers=headers, json=data)
+            response = self.http.post(self.base_url, params={'key': self.api_key}, headers=headers, json=data, deadline=deadline)
             response.raise_for_status()
             result = response.json()
             # Extract text from response
-            return result['candidates'][0]['content']['parts'][0]['text']
+            text = result['candidates'][0]['content']['parts'][0]['text']
+            self.breaker.record_success(time.monotonic() - started)
+            return text
         except Exception as e:
+            self._record_error(e)
             print(f"Gemini API Error: {e}")
-            if response.status_code != 200:
+            if response is not None and response.status_code != 200:
                 print(f"Response: {response.text}")
             return None
 
+    def _stream_gemini(self, prompt: str) -> Iterator[str]:
+        """Helper to call the Gemini streaming endpoint, yielding text chunks as they arrive"""
+        data = {
+            "contents": [{
+                "parts": [{"text": prompt}]
+            }],
+            "generationConfig": GENERATION_CONFIG
+        }
+        
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            print("Gemini stream skipped: request deadline exceeded")
+            return
+        if not self.breaker.allow():
+            print("Gemini stream skipped: circuit breaker open")
+            return
+
+        started = time.monotonic()
+        try:
+            # The deadline also caps how long each chunk read may stall
+            response = self.http.post(
+                self.stream_url,
+                params={'key': self.api_key, 'alt': 'sse'},
+                headers={'Content-Type': 'application/json'},
+                json=data,
+                stream=True,
+                deadline=deadline
+            )
+        except Exception as e:
+            self._record_error(e)
+            raise
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                # Server-Sent Events: each payload line is "data: {GenerateContentResponse}"
+                if not line or not line.startswith('data:'):
+                    continue
+                chunk = json.loads(line[len('data:'):].strip())
+                candidates = chunk.get('candidates') or [{}]
+                for part in candidates[0].get('content', {}).get('parts', []):
+                    if part.get('text'):
+                        yield part['text']
+            self.breaker.record_success(time.monotonic() - started)
+        except GeneratorExit:
+            # Consumer went away (e.g. client disconnected); not an upstream failure
+            self.breaker.record_success(time.monotonic() - started)
+            raise
+        except Exception as e:
+            if deadline is not None and deadline.expired:
+                # A read cut short by our own deadline says nothing about Gemini
+                self.breaker.release()
+            else:
+                self._record_error(e)
+            raise
+        finally:
+            response.close()
+
+    def _record_error(self, error: Exception):
+        """Only upstream trouble counts against the breaker, not our own deadline or a bad payload"""
+        if is_upstream_failure(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    def _generate_cached(self, prompt: str, parse, fresh: bool = False) -> Optional[Any]:
+        """
+        Run a prompt through the response cache.
+
+        Args:
+            prompt: Fully rendered prompt
+            parse: Callable turning the raw completion into the cached value (None if unusable)
+            fresh: Skip the lookup and always call Gemini; the result isn't cached
+                either, since each fresh call is meant to be a new variant
+
+        Returns:
+            Parsed value, a stale cached value if Gemini is unavailable, or None
+        """
+        key = ResponseCache.make_key(prompt, GENERATION_CONFIG)
+        cached, is_fresh = self.response_cache.get(key, allow_stale=self.serve_stale)
+        if cached is not None and is_fresh and not fresh:
+            return cached
+
+        def generate():
+            value = parse(self._call_gemini(prompt))
+            if value is not None:
+                self.response_cache.set(key, value)
+            return value
+
+        if fresh:
+            result = parse(self._call_gemini(prompt))
+        else:
+            # Identical concurrent prompts (e.g. a whole class opening one lecture) share one
+            # call; only the leader runs generate(), so the result is cached once
+            result = self.inflight.do(key, generate)
+        if result is not None:
+            return result
+
+        if cached is not None:
+            print("Gemini unavailable, serving stale cached response")
+            return cached
+        return None
+
+    @staticmethod
+    def _load_json(text_response: Optional[str]) -> Optional[Any]:
+        """Parse a JSON completion, tolerating markdown fences. None if unusable."""
+        if not text_response:
+            return None
+        try:
+            # Clean up potential markdown formatting if the model disregards instructions
+            cleaned_text = text_response.replace('```json', '').replace('```', '').strip()
+            return json.loads(cleaned_text)
+        except Exception as e:
+            print(f"Error parsing AI response: {e}")
+            return None
+
     def generate_quiz(self, subject: str, topic: str, count: int = 5) -> List[Dict[str, Any]]:
         """
         Generate a quiz for a specific subject and topic.
@@ -69,42 +228,39 @@ class AIService:
         - 'explanation': string (brief explanation of the answer)
         """
 
-        text_response = self._call_gemini(prompt)
-        
-        if not text_response:
-             return self._get_mock_quiz(subject, topic, count)
-
-        try:
-            # Clean up potential markdown formatting if the model disregards instructions
-            cleaned_text = text_response.replace('```json', '').replace('```', '').strip()
-            return json.loads(cleaned_text)
-        except Exception as e:
-            print(f"Error parsing AI quiz: {e}")
+        quiz = self._generate_cached(prompt, self._load_json)
+        if quiz is None:
             return self._get_mock_quiz(subject, topic, count)
+        return quiz
 
-    def generate_result_based_activity(self, subject: str, topic: str, activity_type: str = "auto", intent=None, loop_state=None) -> Dict[str, Any]:
+    def resolve_activity_type(self, subject: str, activity_type: str = "auto") -> str:
+        """Map 'auto' to a concrete activity type based on subject"""
+        if activity_type != "auto":
+            return activity_type
+        if any(x in subject for x in ["CS", "Computer", "Algorithm", "Web"]):
+            return "coding"
+        elif any(x in subject for x in ["Physics", "Chemistry", "Biology", "Medical"]):
+            return "lab"
+        return "crossword"
+
+    def generate_result_based_activity(self, subject: str, topic: str, activity_type: str = "auto", intent=None, loop_state=None, fresh: bool = False) -> Dict[str, Any]:
         """
         Generate a specific type of activity: 'coding', 'lab', 'crossword', 'quiz'.
         If 'auto', decides based on subject.
+        Set fresh to bypass the response cache (e.g. when pre-generating distinct variants).
         """
-        if activity_type == "auto":
-             if any(x in subject for x in ["CS", "Computer", "Algorithm", "Web"]):
-                 activity_type = "coding"
-             elif any(x in subject for x in ["Physics", "Chemistry", "Biology", "Medical"]):
-                 activity_type = "lab"
-             else:
-                 activity_type = "crossword"
+        activity_type = self.resolve_activity_type(subject, activity_type)
         
         if activity_type == "coding":
-            return self.generate_coding_challenge(subject, topic, intent, loop_state)
+            return self.generate_coding_challenge(subject, topic, intent, loop_state, fresh)
         elif activity_type == "lab":
-            return self.generate_virtual_lab(subject, topic, intent, loop_state)
+            return self.generate_virtual_lab(subject, topic, intent, loop_state, fresh)
         elif activity_type == "crossword":
-            return self.generate_crossword(subject, topic)
+            return self.generate_crossword(subject, topic, fresh)
         
         return self.generate_game_content(subject, 1) # Fallback
 
-    def generate_coding_challenge(self, subject: str, topic: str, intent=None, loop_state=None) -> Dict[str, Any]:
+    def generate_coding_challenge(self, subject: str, topic: str, intent=None, loop_state=None, fresh: bool = False) -> Dict[str, Any]:
         if not self.api_key:
              return {
                  "type": "coding",
@@ -145,9 +301,9 @@ class AIService:
         - solution: string (complete solution code)
         - points: 100
         """
-        return self._parse_json_response(self._call_gemini(prompt), "coding")
+        return self._generate_cached(prompt, self._load_json, fresh) or {"type": "coding", "error": "AI unavailable"}
 
-    def generate_virtual_lab(self, subject: str, topic: str, intent=None, loop_state=None) -> Dict[str, Any]:
+    def generate_virtual_lab(self, subject: str, topic: str, intent=None, loop_state=None, fresh: bool = False) -> Dict[str, Any]:
         if not self.api_key:
             return {
                 "type": "lab",
@@ -185,9 +341,9 @@ class AIService:
         - correct_answer: string
         - explanation: string
         """
-        return self._parse_json_response(self._call_gemini(prompt), "lab")
+        return self._generate_cached(prompt, self._load_json, fresh) or {"type": "lab", "error": "AI unavailable"}
 
-    def generate_crossword(self, subject: str, topic: str) -> Dict[str, Any]:
+    def generate_crossword(self, subject: str, topic: str, fresh: bool = False) -> Dict[str, Any]:
          if not self.api_key:
              return {
                  "type": "crossword",
@@ -205,7 +361,7 @@ class AIService:
          - words: array of objects {{ "word": string (uppercase), "clue": string }}
          Generate at least 5 words.
          """
-         return self._parse_json_response(self._call_gemini(prompt), "crossword")
+         return self._generate_cached(prompt, self._load_json, fresh) or {"type": "crossword", "error": "AI unavailable"}
 
     def _parse_json_response(self, text_response, fallback_type):
         if not text_response:
@@ -222,13 +378,31 @@ class AIService:
         """
         return self._get_mock_game_problem(subject, level)
 
+    @staticmethod
+    def _refinement_key(subject: str, user_query: str) -> str:
+        normalize = lambda text: ' '.join((text or '').lower().split())
+        return ResponseCache.make_key(normalize(subject), normalize(user_query))
+
+    def cached_refinement(self, subject: str, user_query: str) -> Optional[str]:
+        """Memoized refinement for (subject, query) if one exists, without calling Gemini"""
+        if not self.api_key:
+            return f"{subject} {user_query} tutorial"
+        refined, _ = self.refinement_cache.get(self._refinement_key(subject, user_query), allow_stale=True)
+        return refined
+
     def refine_search_query(self, subject: str, user_query: str) -> str:
         """
         Refine a search query to be more specific and educational.
+        Results are memoized per normalized (subject, query).
         """
         if not self.api_key:
             return f"{subject} {user_query} tutorial"
 
+        memo_key = self._refinement_key(subject, user_query)
+        memoized, is_fresh = self.refinement_cache.get(memo_key, allow_stale=True)
+        if memoized and is_fresh:
+            return memoized
+
         prompt = f"""
         Refine the following search query to find the best educational YouTube videos.
         Subject: "{subject}"
@@ -238,9 +412,12 @@ class AIService:
         Video should be a tutorial or lecture.
         """
         
-        text_response = self._call_gemini(prompt)
-        if text_response:
-            return text_response.strip()
+        refined = self._generate_cached(prompt, lambda text: text.strip() if text else None)
+        if refined:
+            self.refinement_cache.set(memo_key, refined)
+            return refined
+        if memoized:
+            return memoized
         return f"{subject} {user_query} lecture"
 
     def analyze_misconception(self, question: str, user_answer: str, correct_answer: str, subject: str) -> Dict[str, str]:
@@ -267,17 +444,9 @@ class AIService:
         
         return self._parse_json_response(self._call_gemini(prompt), "misconception")
 
-    def chat(self, message: str, context: Optional[str] = None, history: List[Dict[str, str]] = []) -> str:
-        """
-        Chat with the AI Tutor.
-        Args:
-            message: User's message.
-            context: Context about the current video/subject.
-            history: List of previous messages [{'role': 'user'/'model', 'parts': ['text']}]
-        """
-        if not self.api_key:
-            return "I'm your AI Tutor. Since I'm running in mock mode, I can't really see the video, but I'm here to help! (Please configure GOOGLE_API_KEY)"
-
+    def _build_chat_prompt(self, message: str, context: Optional[str], history: List[Dict[str, str]], summary: Optional[str] = None,
+                           excerpts: Optional[List[Dict]] = None) -> str:
+        """Render the tutor prompt from context, transcript excerpts, conversation summary, recent history and the new message"""
         # Construct prompt with context
         system_instruction = "You are a helpful, encouraging AI Tutor called 'FocusBot'. available in FocusLearner Pro app. You help students understand the educational video they are watching. keep answers concise and encouraging."
         
@@ -290,14 +459,96 @@ class AIService:
         
         full_prompt = f"System: {system_instruction}\n"
         
-        for msg in history[-5:]: # Keep last 5 turns for context window
+        if excerpts:
+            full_prompt += "Relevant parts of the video transcript (use them to ground your answer, cite timestamps when helpful):\n"
+            for excerpt in excerpts:
+                start = int(excerpt['start'])
+                full_prompt += f"[{start // 60:02d}:{start % 60:02d}] {excerpt['text']}\n"
+        
+        if summary:
+            full_prompt += f"Conversation so far (summary): {summary}\n"
+        
+        # Without a summary, keep only the last 5 messages for the context window
+        recent = history if summary is not None else history[-5:]
+        for msg in recent:
             role = "User" if msg.get("role") == "user" else "Tutor"
             content = msg.get("parts", [""])[0] 
             full_prompt += f"{role}: {content}\n"
             
         full_prompt += f"User: {message}\nTutor:"
-        
-        return self._call_gemini(full_prompt)
+        return full_prompt
+
+    def chat(self, message: str, context: Optional[str] = None, history: List[Dict[str, str]] = [], summary: Optional[str] = None,
+             excerpts: Optional[List[Dict]] = None) -> str:
+        """
+        Chat with the AI Tutor.
+        Args:
+            message: User's message.
+            context: Context about the current video/subject.
+            history: List of previous messages [{'role': 'user'/'model', 'parts': ['text']}]
+            summary: Running summary of older turns (history is then used as-is)
+            excerpts: Transcript passages [{'start': seconds, 'text': ...}] relevant to the message
+        """
+        if not self.api_key:
+            return MOCK_CHAT_REPLY
+
+        prompt = self._build_chat_prompt(message, context, history, summary, excerpts)
+        if not self.hedge_enabled:
+            return self._call_gemini(prompt)
+
+        # Latency-critical: fire a second attempt if the first runs past recent p95
+        p95 = self.breaker.latency_percentile(95)
+        hedge_after = max(self.hedge_min_delay, p95 or 0)
+        return hedged_call(lambda: self._call_gemini(prompt), hedge_after)
+
+    def chat_stream(self, message: str, context: Optional[str] = None, history: List[Dict[str, str]] = [], summary: Optional[str] = None,
+                    excerpts: Optional[List[Dict]] = None) -> Iterator[str]:
+        """
+        Streaming variant of chat(). Yields reply text chunks as Gemini produces them.
+        Yields nothing if the upstream call fails before the first chunk; a failure
+        after that is raised, so the caller knows the reply was cut off.
+        """
+        if not self.api_key:
+            yield MOCK_CHAT_REPLY
+            return
+
+        started = False
+        try:
+            for chunk in self._stream_gemini(self._build_chat_prompt(message, context, history, summary, excerpts)):
+                started = True
+                yield chunk
+        except Exception as e:
+            print(f"Gemini Stream Error: {e}")
+            if started:
+                raise
+
+    def summarize_conversation(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Fold older chat messages into a running summary.
+        Falls back to a clipped extract of the messages if Gemini is unavailable.
+        """
+        transcript = "\n".join(
+            f"{'User' if msg.get('role') == 'user' else 'Tutor'}: {msg.get('parts', [''])[0]}" for msg in messages
+        )
+
+        if self.api_key:
+            prompt = f"""
+            Update the running summary of a tutoring conversation.
+            Current summary: "{previous_summary or 'None'}"
+            New messages:
+            {transcript}
+            
+            Return ONLY the updated summary in at most 4 sentences. Keep the topics discussed,
+            the student's misunderstandings and anything the tutor promised to follow up on.
+            """
+            text_response = self._call_gemini(prompt)
+            if text_response:
+                return text_response.strip()
+
+        # Extractive fallback: keep the first sentence of each message
+        extract = " ".join(msg.get('parts', [''])[0].split('. ')[0][:160] for msg in messages)
+        combined = f"{previous_summary} {extract}".strip()
+        return combined[-1200:]
 
     def _get_mock_quiz(self, subject, topic, count):
         """Fallback to high-quality static quizzes if AI fails"""
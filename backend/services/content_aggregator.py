@@ -0,0 +1,203 @@
+"""
+FocusLearner Pro - Content Aggregator
+Concurrent search across content sources with per-source deadlines and merged ranking
+"""
+
+import os
+import time
+import contextvars
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import or_
+from models import ContentItem
+from utils.resilience import current_deadline, deadline_scope
+
+
+class FallbackResults(Exception):
+    """A source couldn't search and offered stand-in suggestions instead"""
+
+    def __init__(self, videos: List[Dict]):
+        super().__init__(f"{len(videos)} fallback suggestion(s)")
+        self.videos = videos
+
+
+class SourceAdapter(ABC):
+    """A searchable content source. Results use the ContentItem.to_video_dict shape."""
+
+    name = None
+    # Seconds to wait for this source unless CONTENT_SOURCE_TIMEOUT_<NAME> is set
+    # (None: CONTENT_SOURCE_TIMEOUT)
+    default_timeout = None
+
+    def __init__(self, timeout: Optional[float] = None, weight: float = 1.0):
+        if timeout is None:
+            default = self.default_timeout or os.getenv('CONTENT_SOURCE_TIMEOUT', '4')
+            timeout = float(os.getenv(f'CONTENT_SOURCE_TIMEOUT_{self.name.upper()}', default))
+        self.timeout = timeout
+        self.weight = weight
+
+    @abstractmethod
+    def search(self, query: str, subject_focus: str, limit: int) -> List[Dict]:
+        """Up to limit results, best first (raises if the source is unavailable)"""
+
+
+class YouTubeAdapter(SourceAdapter):
+    """Live YouTube search (through the search result cache)"""
+
+    name = 'youtube'
+    # A cold search refines the query with Gemini, then calls search.list and videos.list
+    default_timeout = 8.0
+
+    def __init__(self, youtube_service, **kwargs):
+        super().__init__(**kwargs)
+        self.youtube_service = youtube_service
+
+    def search(self, query: str, subject_focus: str, limit: int) -> List[Dict]:
+        results = self.youtube_service.search_videos(query=query, subject_focus=subject_focus, max_results=limit)
+        # search_videos falls back to canned suggestions when the API is unavailable;
+        # those aren't search results, so they must not be ranked as such
+        if results and all(video.get('source') == 'mock' for video in results):
+            raise FallbackResults(results)
+        return results
+
+
+class CatalogAdapter(SourceAdapter):
+    """
+    Curated ContentItem rows (seeded or added by admins) for one source, e.g.
+    NPTEL or Udemy courses. Cached search results are excluded.
+    """
+
+    def __init__(self, name: str, **kwargs):
+        self.name = name
+        super().__init__(**kwargs)
+
+    def search(self, query: str, subject_focus: str, limit: int) -> List[Dict]:
+        items = ContentItem.query.filter(
+            ContentItem.source == self.name,
+            ContentItem.search_key.is_(None),
+            ContentItem.is_approved.is_(True),
+            ContentItem.is_filtered.isnot(True)
+        )
+        if subject_focus:
+            items = items.filter(ContentItem.subject_focus == subject_focus)
+
+        terms = [term for term in query.lower().split() if len(term) > 2]
+        if terms:
+            items = items.filter(or_(*[
+                or_(ContentItem.title.ilike(f'%{term}%'), ContentItem.description.ilike(f'%{term}%'))
+                for term in terms
+            ]))
+
+        results = [item.to_video_dict() for item in items.limit(limit * 3).all()]
+        # Most matching terms first
+        results.sort(key=lambda video: -sum(
+            term in f"{video['title']} {video['description'] or ''}".lower() for term in terms
+        ))
+        return results[:limit]
+
+
+class ContentAggregator:
+    """
+    Fans a search out to several sources at once.
+
+    Each source runs on the shared pool under its own deadline (never beyond the
+    request's). Sources that miss their deadline or fail are reported and left
+    out, so the response carries whatever arrived in time. Results are
+    deduplicated on (source, source_id) and merged with weighted reciprocal
+    rank fusion, so no source's raw scores need to be comparable. A source's
+    fallback suggestions are never fused; they are returned only when no
+    source produced results.
+    """
+
+    RRF_K = 60
+
+    def __init__(self, adapters: List[SourceAdapter], max_workers: Optional[int] = None):
+        self.adapters = {adapter.name: adapter for adapter in adapters}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('CONTENT_AGGREGATOR_WORKERS', '8')),
+            thread_name_prefix='content-source'
+        )
+        self._lock = threading.Lock()
+        self.stats = {name: {'calls': 0, 'ok': 0, 'timeouts': 0, 'errors': 0} for name in self.adapters}
+
+    def search(self, query: str, subject_focus: str, sources: List[str], limit: int = 20) -> Dict:
+        """
+        Returns:
+            Dict with 'results' (merged, ranked), 'sources' (per-source status:
+            ok, timeout, error or fallback; count and latency) and 'partial'
+            (True if any source was dropped)
+        """
+        app = current_app._get_current_object() if has_app_context() else None
+        started = time.monotonic()
+        request_deadline = current_deadline()
+
+        futures = {}
+        for name in sources:
+            adapter = self.adapters[name]
+            futures[name] = self._executor.submit(
+                contextvars.copy_context().run, self._run, app, adapter, query, subject_focus, limit
+            )
+
+        statuses, ranked_lists, fallbacks = {}, {}, []
+        for name, future in futures.items():
+            adapter = self.adapters[name]
+            wait_for = started + adapter.timeout - time.monotonic()
+            if request_deadline is not None:
+                wait_for = min(wait_for, request_deadline.remaining())
+            try:
+                results, latency = future.result(timeout=max(0.0, wait_for))
+                ranked_lists[name] = results
+                statuses[name] = {'status': 'ok', 'count': len(results), 'latency_ms': round(latency * 1000, 1)}
+                self._count(name, 'ok')
+            except FutureTimeoutError:
+                statuses[name] = {'status': 'timeout', 'count': 0}
+                self._count(name, 'timeouts')
+            except FallbackResults as e:
+                statuses[name] = {'status': 'fallback', 'count': 0}
+                fallbacks.extend(e.videos)
+                self._count(name, 'errors')
+            except Exception as e:
+                print(f"Content source '{name}' failed: {e}")
+                statuses[name] = {'status': 'error', 'count': 0}
+                self._count(name, 'errors')
+
+        results = self._merge(ranked_lists)
+        return {
+            'results': (results or fallbacks)[:limit],
+            'sources': statuses,
+            'partial': any(status['status'] != 'ok' for status in statuses.values())
+        }
+
+    def _run(self, app, adapter: SourceAdapter, query: str, subject_focus: str, limit: int):
+        self._count(adapter.name, 'calls')
+        started = time.monotonic()
+        with deadline_scope(adapter.timeout):
+            if app is None:
+                results = adapter.search(query, subject_focus, limit)
+            else:
+                # Fresh app context per worker so each source gets its own DB session
+                with app.app_context():
+                    results = adapter.search(query, subject_focus, limit)
+        return results, time.monotonic() - started
+
+    def _merge(self, ranked_lists: Dict[str, List[Dict]]) -> List[Dict]:
+        merged, scores = {}, {}
+        for name, results in ranked_lists.items():
+            weight = self.adapters[name].weight
+            for rank, item in enumerate(results):
+                key = (item.get('source', name), item.get('video_id') or item.get('url'))
+                scores[key] = scores.get(key, 0.0) + weight / (self.RRF_K + rank + 1)
+                merged.setdefault(key, item)
+        return [merged[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+    def _count(self, name: str, stat: str):
+        with self._lock:
+            self.stats[name][stat] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self.stats.items()}
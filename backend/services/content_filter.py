@@ -3,22 +3,163 @@ FocusLearner Pro - Content Filtering Service
 Aggressive filtering system to remove distracting content
 """
 
+import os
 import re
-from typing import Dict, List, Tuple
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import nltk
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+from utils.response_cache import get_response_cache, ResponseCache
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+# NLTK data is read from local directories only (never downloaded at runtime).
+# Populate backend/nltk_data at build time with download_nltk_data.py.
+LOCAL_NLTK_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'nltk_data')
+
+
+def nltk_data_paths() -> List[str]:
+    """Directories searched for NLTK data, in order"""
+    paths = [path for path in os.getenv('NLTK_DATA', '').split(os.pathsep) if path]
+    return paths + [LOCAL_NLTK_DATA, os.path.expanduser('~/nltk_data')]
+
+
+def load_stopwords(language: str = 'english') -> Set[str]:
+    """
+    NLTK stopword list read straight from the corpus file, so neither nltk
+    itself nor a download is needed. Empty if the data isn't installed.
+    """
+    for base in nltk_data_paths():
+        path = os.path.join(base, 'corpora', 'stopwords', language)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return {line.strip() for line in f if line.strip()}
+    print(f"Warning: NLTK '{language}' stopwords not found in {nltk_data_paths()}")
+    return set()
+
+
+class KeywordMatcher:
+    """
+    Counts the distinct keywords of each class found in a text in one pass.
+
+    A keyword counts when a word starts with it, so inflections and derivations
+    match as they did with substring scanning ("lecturer", "educational",
+    "practiced", "gamers"). Matches must start at a word boundary, so keywords
+    no longer fire in the middle of unrelated words ("game" in "endgame",
+    "food" in "seafood"), and keywords shorter than MIN_PREFIX_LENGTH only
+    match whole words ("mv" in "MVC").
+
+    All keywords are compiled into one regex shaped as a trie (common prefixes
+    factored out), so a text is scanned once instead of once per keyword.
+    """
+
+    MIN_PREFIX_LENGTH = 3
+
+    def __init__(self, classes: Dict[str, List[str]]):
+        self.classes = list(classes)
+        self._classes_of: Dict[str, Tuple[str, ...]] = {}
+        for name, keywords in classes.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                self._classes_of[keyword] = tuple(sorted(set(self._classes_of.get(keyword, ())) | {name}))
+
+        keywords = sorted(self._classes_of)
+        self._pattern = re.compile(r'\b(' + self._trie_pattern(keywords) + ')')
+        # The regex returns the longest keyword at each word start and never
+        # overlaps matches, so each match also stands for the keywords inside it
+        # ("gaming" for itself, "oddly satisfying" for "satisfying" too)
+        self._contains: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(inner for inner in keywords if re.search(r'\b' + re.escape(inner), keyword))
+            for keyword in keywords
+        }
+
+    def _trie_pattern(self, keywords: List[str]) -> str:
+        trie: Dict = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = len(keyword) >= self.MIN_PREFIX_LENGTH  # False: must end at a word boundary
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char != '']
+            body = '|'.join(branches)
+            if '' not in node:
+                return f'(?:{body})' if len(branches) > 1 else body
+            if node['']:
+                return f'(?:{body})?' if body else ''
+            return f'(?:{body}|\\b)' if body else r'\b'
+
+        return build(trie)
+
+    def count(self, text: str) -> Dict[str, int]:
+        found = set()
+        contains = self._contains
+        for keyword in set(self._pattern.findall(text.lower())):
+            found.update(contains[keyword])
+
+        counts = dict.fromkeys(self.classes, 0)
+        for keyword in found:
+            for name in self._classes_of[keyword]:
+                counts[name] += 1
+        return counts
+
+
+class DecisionCache:
+    """
+    In-process LRU of rule verdicts. Keys are plain tuples and values the
+    verdict tuples themselves, so a hit costs a dict lookup. With a persistent
+    ResponseCache attached, memory misses fall back to it (surviving restarts).
+    """
+
+    def __init__(self, max_entries: int, persistent: Optional[ResponseCache] = None):
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self._entries: "OrderedDict[Tuple, Tuple[bool, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _persistent_key(key: Tuple) -> str:
+        return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: Tuple) -> Optional[Tuple[bool, str]]:
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return verdict
+        if self.persistent is not None:
+            stored, _ = self.persistent.get(self._persistent_key(key))
+            if stored is not None:
+                verdict = (stored[0], stored[1])
+                self._remember(key, verdict)
+                with self._lock:
+                    self.stats['hits'] += 1
+                return verdict
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, key: Tuple, verdict: Tuple[bool, str]):
+        self._remember(key, verdict)
+        if self.persistent is not None:
+            self.persistent.set(self._persistent_key(key), list(verdict))
+
+    def _remember(self, key: Tuple, verdict: Tuple[bool, str]):
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
 
 
 class ContentFilter:
@@ -33,7 +174,7 @@ class ContentFilter:
         'beauty', 'makeup', 'fashion', 'shopping', 'haul', 'unboxing',
         'gossip', 'celebrity', 'news', 'politics', 'sports', 'football',
         'basketball', 'soccer', 'cricket', 'movie', 'film', 'trailer',
-        'review', 'unboxing', 'asmr', 'satisfying', 'oddly satisfying'
+        'review', 'asmr', 'satisfying', 'oddly satisfying'
     ]
     
     # Educational keywords (positive signals)
@@ -44,8 +185,67 @@ class ContentFilter:
         'university', 'college', 'professor', 'instructor', 'teacher'
     ]
     
+    # Title patterns that indicate non-educational content
+    DISTRACTION_PATTERNS = [
+        r'\b\d+\s*(million|billion|views|subscribers)\b',
+        r'\b(you won\'t believe|shocking|amazing|incredible)\b',
+        r'\b(epic|fail|win|best|worst)\b.*\b(ever|of all time)\b',
+        r'\b(prank|challenge|dare)\b',
+        r'\b(reacting to|reacts to)\b',
+    ]
+    
+    # Shorter videos (Shorts, clips) are rarely lectures
+    MIN_DURATION_SECONDS = 60
+    
+    # Rejected outright above this many distraction keywords
+    MAX_DISTRACTION_KEYWORDS = 2
+    # Approved as educational from this many educational keywords
+    MIN_EDUCATIONAL_KEYWORDS = 3
+    
+    # Bump when the decision logic in filter_content/_filter_details changes
+    # (the lists and constants above are hashed into rules_version already)
+    RULES_REVISION = 1
+    
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
+        self._stop_words = None
+        # 'rules' or 'classifier' (rules as a pre-filter, then the trained model)
+        self.mode = os.getenv('CONTENT_FILTER_MODE', 'rules').lower()
+        self.classifier_threshold = float(os.getenv('CONTENT_CLASSIFIER_THRESHOLD', '0.5'))
+        self.classifier = None  # Defaults to the model at CONTENT_CLASSIFIER_PATH
+        # Compiled once: keyword counting and title patterns each take a single pass
+        self._keywords = KeywordMatcher({
+            'distraction': self.DISTRACTION_KEYWORDS,
+            'educational': self.EDUCATIONAL_KEYWORDS,
+        })
+        self._distraction_pattern = re.compile('|'.join(f'(?:{p})' for p in self.DISTRACTION_PATTERNS))
+        
+        # Rule verdicts per video, keyed by rule-set version, video id and every
+        # field the rules read. The version hashes the keyword lists, patterns,
+        # thresholds and RULES_REVISION, so after a change stale verdicts are
+        # never looked up again.
+        self.rules_version = ResponseCache.make_key(
+            self.DISTRACTION_KEYWORDS, self.EDUCATIONAL_KEYWORDS, self.DISTRACTION_PATTERNS,
+            self.MIN_DURATION_SECONDS, KeywordMatcher.MIN_PREFIX_LENGTH,
+            self.MAX_DISTRACTION_KEYWORDS, self.MIN_EDUCATIONAL_KEYWORDS, self.RULES_REVISION
+        )[:16]
+        self.decision_cache = None
+        if os.getenv('FILTER_CACHE_ENABLED', 'true').lower() == 'true':
+            persistent = None
+            if os.getenv('FILTER_CACHE_PERSIST', 'false').lower() == 'true':
+                # The shared AI_CACHE_PATH file; its memory tier is skipped in favour of ours
+                persistent = get_response_cache(
+                    'filter_decisions',
+                    ttl=int(os.getenv('FILTER_CACHE_TTL', str(30 * 86400))),
+                    stale_ttl=0,
+                    max_entries=1
+                )
+            self.decision_cache = DecisionCache(int(os.getenv('FILTER_CACHE_ENTRIES', '10000')), persistent)
+    
+    @property
+    def stop_words(self) -> Set[str]:
+        if self._stop_words is None:
+            self._stop_words = load_stopwords('english')
+        return self._stop_words
     
     def filter_content(self, title: str, description: str = "", tags: List[str] = None) -> Tuple[bool, str]:
         """
@@ -62,12 +262,13 @@ class ContentFilter:
         # Combine all text for analysis
         combined_text = f"{title} {description} {' '.join(tags)}".lower()
         
-        # Check for distraction keywords
-        distraction_score = self._calculate_distraction_score(combined_text)
-        educational_score = self._calculate_educational_score(combined_text)
+        # Count distraction and educational keywords
+        counts = self._keywords.count(combined_text)
+        distraction_score = counts['distraction']
+        educational_score = counts['educational']
         
         # Rule-based filtering
-        if distraction_score > 2:  # Multiple distraction keywords found
+        if distraction_score > self.MAX_DISTRACTION_KEYWORDS:  # Multiple distraction keywords found
             return True, f"Contains {distraction_score} distraction keyword(s)"
         
         if distraction_score > 0 and educational_score == 0:
@@ -78,52 +279,53 @@ class ContentFilter:
             return True, "Title matches distraction pattern"
         
         # If educational score is high, allow even with some distraction keywords
-        if educational_score >= 3:
+        if educational_score >= self.MIN_EDUCATIONAL_KEYWORDS:
             return False, "Educational content approved"
         
         # Default: approve if no strong signals either way
         return False, "Content approved"
     
-    def _calculate_distraction_score(self, text: str) -> int:
-        """Calculate score based on distraction keywords found"""
-        score = 0
-        text_lower = text.lower()
-        
-        for keyword in self.DISTRACTION_KEYWORDS:
-            if keyword in text_lower:
-                score += 1
+    def _has_distraction_pattern(self, title: str) -> bool:
+        """Check for specific distraction patterns in title"""
+        return self._distraction_pattern.search(title.lower()) is not None
+    
+    def _filter_details(self, video: Dict, reason: str) -> Tuple[bool, str]:
+        """
+        Checks that need videos.list details (skipped when they are missing).
+        There is no category check: the only videos filtered come from
+        search.list, which is already restricted to the Education category.
+        """
+        duration = video.get('duration_seconds')
+        if duration is not None and 0 < duration < self.MIN_DURATION_SECONDS:
+            return True, "Too short to be a lesson"
         
-        return score
+        return False, reason
     
-    def _calculate_educational_score(self, text: str) -> int:
-        """Calculate score based on educational keywords found"""
-        score = 0
-        text_lower = text.lower()
+    def _decision_key(self, video: Dict) -> Tuple:
+        """Rule-set version, video id and every field the rules read"""
+        return (
+            self.rules_version, video.get('video_id', ''), video.get('title') or '', video.get('description') or '',
+            tuple(video.get('tags') or ()), video.get('duration_seconds')
+        )
+    
+    def _rule_verdict(self, video: Dict) -> Tuple[bool, str]:
+        """filter_content plus the detail checks, memoized per video content"""
+        key = None
+        if self.decision_cache is not None:
+            key = self._decision_key(video)
+            cached = self.decision_cache.get(key)
+            if cached is not None:
+                return cached
         
-        for keyword in self.EDUCATIONAL_KEYWORDS:
-            if keyword in text_lower:
-                score += 1
+        is_filtered, reason = self.filter_content(
+            video.get('title', ''), video.get('description', ''), video.get('tags', [])
+        )
+        if not is_filtered:
+            is_filtered, reason = self._filter_details(video, reason)
         
-        return score
-    
-    def _has_distraction_pattern(self, title: str) -> bool:
-        """Check for specific distraction patterns in title"""
-        title_lower = title.lower()
-        
-        # Patterns that indicate non-educational content
-        patterns = [
-            r'\b\d+\s*(million|billion|views|subscribers)\b',
-            r'\b(you won\'t believe|shocking|amazing|incredible)\b',
-            r'\b(epic|fail|win|best|worst)\b.*\b(ever|of all time)\b',
-            r'\b(prank|challenge|dare)\b',
-            r'\b(reacting to|reacts to)\b',
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, title_lower):
-                return True
-        
-        return False
+        if key is not None:
+            self.decision_cache.set(key, (is_filtered, reason))
+        return is_filtered, reason
     
     def filter_video_list(self, videos: List[Dict]) -> List[Dict]:
         """
@@ -131,6 +333,7 @@ class ContentFilter:
         
         Args:
             videos: List of video dicts with 'title', 'description', 'tags' keys
+                (and 'duration_seconds' when enriched)
         
         Returns:
             Filtered list of videos with 'is_filtered' and 'filter_reason' added
@@ -138,11 +341,7 @@ class ContentFilter:
         filtered_videos = []
         
         for video in videos:
-            title = video.get('title', '')
-            description = video.get('description', '')
-            tags = video.get('tags', [])
-            
-            is_filtered, reason = self.filter_content(title, description, tags)
+            is_filtered, reason = self._rule_verdict(video)
             
             video['is_filtered'] = is_filtered
             video['filter_reason'] = reason
@@ -150,5 +349,25 @@ class ContentFilter:
             if not is_filtered:
                 filtered_videos.append(video)
         
+        if self.mode == 'classifier':
+            filtered_videos = self._classify(filtered_videos)
+        
         return filtered_videos
+    
+    def _classify(self, videos: List[Dict]) -> List[Dict]:
+        """Score the rule survivors in one batch and drop the ones below threshold"""
+        from .registry import get_relevance_classifier
+        classifier = self.classifier or get_relevance_classifier()
+        if not classifier.is_trained or not videos:
+            return videos
+        
+        kept = []
+        for video, score in zip(videos, classifier.score(videos)):
+            video['relevance_score'] = round(score, 4)
+            if score < self.classifier_threshold:
+                video['is_filtered'] = True
+                video['filter_reason'] = f"Low educational relevance ({score:.2f})"
+            else:
+                kept.append(video)
+        return kept
 
@@ -0,0 +1,109 @@
+"""
+FocusLearner Pro - Conversation Memory
+Bounded tutor-chat context: a running summary plus the most recent turns
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+class ConversationMemory:
+    """
+    Per-user tutor chat memory.
+
+    Recent messages are kept verbatim while they fit in the token budget. Older
+    messages are folded into a running summary by a background worker, so the
+    prompt stays small without putting a summarization call on the request path.
+    Messages waiting to be summarized are still returned verbatim until the
+    summary catches up; if summarization fails, the oldest of them are dropped
+    to bring the context back within budget (a later turn retries the rest).
+    """
+
+    def __init__(self, ai_service, token_budget: int = None, max_recent_messages: int = None):
+        self.ai_service = ai_service
+        self.token_budget = token_budget or int(os.getenv('CHAT_MEMORY_TOKEN_BUDGET', '800'))
+        self.max_recent_messages = max_recent_messages or int(os.getenv('CHAT_MEMORY_MAX_RECENT', '6'))
+
+        self._states: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-summary')
+
+    def _state(self, user_id) -> Dict:
+        state = self._states.get(user_id)
+        if state is None:
+            state = {'summary': '', 'recent': [], 'pending': [], 'summarizing': False, 'generation': 0}
+            self._states[user_id] = state
+        return state
+
+    def get_context(self, user_id) -> Tuple[str, List[Dict]]:
+        """Return (summary, messages) to include in the next prompt"""
+        with self._lock:
+            state = self._state(user_id)
+            return state['summary'], list(state['pending']) + list(state['recent'])
+
+    def add_turn(self, user_id, message: str, response_text: str):
+        """Record an exchange and fold overflow into the summary in the background"""
+        with self._lock:
+            state = self._state(user_id)
+            state['recent'].append({'role': 'user', 'parts': [message]})
+            state['recent'].append({'role': 'model', 'parts': [response_text]})
+
+            budget = self.token_budget - estimate_tokens(state['summary'])
+            while len(state['recent']) > 2 and (
+                len(state['recent']) > self.max_recent_messages
+                or sum(estimate_tokens(m['parts'][0]) for m in state['recent']) > budget
+            ):
+                state['pending'].append(state['recent'].pop(0))
+
+            if state['pending'] and not state['summarizing']:
+                self._schedule(user_id, state)
+
+    def clear(self, user_id):
+        with self._lock:
+            state = self._state(user_id)
+            state.update({'summary': '', 'recent': [], 'pending': []})
+            # Invalidate any summarization already in flight
+            state['generation'] += 1
+
+    def _schedule(self, user_id, state: Dict):
+        state['summarizing'] = True
+        batch = list(state['pending'])
+        self._executor.submit(self._summarize, user_id, state['summary'], batch, state['generation'])
+
+    def _summarize(self, user_id, previous_summary: str, batch: List[Dict], generation: int):
+        try:
+            summary = self.ai_service.summarize_conversation(previous_summary, batch)
+        except Exception as e:
+            print(f"Chat summarization failed: {e}")
+            summary = None
+
+        with self._lock:
+            state = self._state(user_id)
+            state['summarizing'] = False
+            if state['generation'] != generation:
+                return
+            if summary:
+                state['summary'] = summary
+                del state['pending'][:len(batch)]
+                if state['pending']:
+                    self._schedule(user_id, state)
+            else:
+                # Nothing was folded in; don't let unsummarized messages outgrow the budget
+                self._trim_pending(state)
+
+    def _trim_pending(self, state: Dict):
+        """Drop the oldest pending messages until the context fits the token budget again"""
+        budget = self.token_budget - estimate_tokens(state['summary'])
+        total = sum(estimate_tokens(m['parts'][0]) for m in state['pending'] + state['recent'])
+        while state['pending'] and total > budget:
+            total -= estimate_tokens(state['pending'].pop(0)['parts'][0])
+        # Start on a question, not half an exchange
+        if state['pending'] and state['pending'][0]['role'] != 'user':
+            state['pending'].pop(0)
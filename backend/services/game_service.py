@@ -4,8 +4,10 @@ Business logic for gamification system and real evaluation engine
 """
 import uuid
 import json
-from models import db, GameProgress, User, GameChallenge, ActivityResult, UserTopicMastery, TopicMasteryState
+import hashlib
+from models import db, GameProgress, GameChallenge, ActivityResult, UserTopicMastery, TopicMasteryState
 from datetime import datetime
+from .registry import get_leaderboard_service
 
 class GameService:
     GAME_MODULES = {
@@ -36,15 +38,23 @@ class GameService:
         """
         Generates an activity via AI, persists it securely, and returns it to the user.
         """
+        activity_type = ai_service.resolve_activity_type(subject, activity_type)
+
         # 1. Generate Content
         generated_data = ai_service.generate_result_based_activity(subject, topic, activity_type, intent, loop_state)
         
-        # 2. Extract Solution (Critical for grading)
+        # 2. Persist the challenge together with its secret solution
+        challenge = self.build_challenge(user_id, subject, topic, activity_type, generated_data, intent)
+        db.session.add(challenge)
+        db.session.commit()
+        
+        # 3. Return sanitized data
+        return self.sanitize_activity(generated_data, challenge.id)
+
+    def build_challenge(self, user_id, subject, topic, activity_type, generated_data, intent=None, is_pooled=False):
+        """Build (but do not commit) a GameChallenge row for generated activity content"""
         # The AI service should ideally return separate 'content' and 'solution' fields, 
         # or we assume 'answer'/'correct_answer'/'solution' key in the dict is the secure part.
-        
-        # For simplicity, we assume the whole blob is data, and we extract specific keys for solution.
-        # 3. Extract Solution & Explanation
         solution_val = None
         if 'correct_answer' in generated_data:
             solution_val = generated_data['correct_answer']
@@ -59,29 +69,25 @@ class GameService:
             "answer": solution_val,
             "explanation": generated_data.get('explanation', '')
         }
-            
-        # 3. Create Challenge Record
-        challenge_id = str(uuid.uuid4())
-        
-        challenge = GameChallenge(
-            id=challenge_id,
+
+        data = json.dumps(generated_data, sort_keys=True)
+        return GameChallenge(
+            id=str(uuid.uuid4()),
             user_id=user_id,
             subject=subject,
             topic=topic,
-            activity_type=generated_data.get('type', 'unknown'),
-            data=json.dumps(generated_data),
+            activity_type=generated_data.get('type', activity_type),
+            data=data,
             solution=json.dumps(solution_obj),
-            learning_intent_id=intent.id if intent else None
+            learning_intent_id=intent.id if intent else None,
+            is_pooled=is_pooled,
+            content_hash=hashlib.sha256(data.encode('utf-8')).hexdigest()
         )
-        
-        db.session.add(challenge)
-        db.session.commit()
-        
-        # 4. Return sanitized data (remove answer if frontend shouldn't see it - though existing frontend checks local answer for some types)
-        # Ideally, we strip the answer before sending. For Lab/Quiz, frontend checks locally currently? 
+
+    def sanitize_activity(self, generated_data, challenge_id):
+        """Strip secret fields (answers, solutions) before sending content to the client"""
         # The prompt says "Real score calculation (not frontend-controlled)". 
         # So we should strip the answer.
-        
         sanitized_data = generated_data.copy()
         for secret in ['answer', 'correct_answer', 'solution', 'explanation']:
             if secret in sanitized_data:
@@ -92,9 +98,14 @@ class GameService:
         
         return sanitized_data
 
-    def submit_activity(self, user_id, challenge_id, user_answer, violation_count=0):
+    def submit_activity(self, user_id, challenge_id, user_answer, violation_count=0, loop_service=None):
         """
         Grades the submission on the backend, updates mastery, and returns result.
+        
+        With a loop_service, the learning loop is advanced in the same pass: every
+        row is loaded once, the challenge JSON is parsed once, and all changes
+        (result, mastery, progress, loop state, misconception job) are committed
+        in a single transaction.
         """
         challenge = GameChallenge.query.get(challenge_id)
         if not challenge:
@@ -153,11 +164,9 @@ class GameService:
         mastery_update = self._update_topic_mastery(user_id, challenge.subject, challenge.topic, is_correct, weight)
         
         # 5. Update Global Game Progress (Legacy compatibility)
-        self._update_legacy_progress(user_id, challenge.subject, xp_earned)
+        progress = self._update_legacy_progress(user_id, challenge.subject, xp_earned)
         
-        db.session.commit()
-        
-        return {
+        response = {
             'is_correct': is_correct,
             'score': raw_score,
             'xp_earned': xp_earned,
@@ -166,6 +175,45 @@ class GameService:
             'mastery_state': mastery_update['state'],
             'new_proficiency': mastery_update['proficiency']
         }
+        
+        # Leaderboard values, read before commit expires the rows
+        subject, topic = challenge.subject, challenge.topic
+        standing = (progress.mastery_points, progress.level)
+        
+        # 6. Advance the Learning Loop (same transaction)
+        try:
+            if loop_service and challenge.learning_intent_id:
+                metadata = self._submission_metadata(challenge, expected_val, user_answer)
+                response['loop_status'] = loop_service.update_stage(
+                    user_id, challenge.learning_intent_id, is_correct, raw_score, metadata, commit=False
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        # 7. Leaderboards follow committed changes
+        leaderboards = get_leaderboard_service()
+        leaderboards.record_progress(user_id, subject, *standing)
+        leaderboards.record_mastery(user_id, subject, topic, mastery_update['proficiency'], mastery_update['attempts'])
+        
+        return response
+
+    @staticmethod
+    def _submission_metadata(challenge, expected_val, user_answer):
+        """Question/answer context for misconception analysis"""
+        try:
+            content_data = json.loads(challenge.data) if challenge.data else {}
+        except ValueError:
+            content_data = {}
+        if not isinstance(content_data, dict):
+            content_data = {}
+        return {
+            "question": content_data.get('question') or content_data.get('description') or "Unknown Question",
+            "user_answer": str(user_answer),
+            "correct_answer": str(expected_val),
+            "subject": challenge.subject
+        }
 
     def _grade_answer(self, type, expected, actual):
         """Returns (is_correct, raw_score_0_to_1, feedback)"""
@@ -190,7 +238,9 @@ class GameService:
     def _update_topic_mastery(self, user_id, subject, topic, is_correct, weight=1.0):
         mastery = UserTopicMastery.query.filter_by(user_id=user_id, subject=subject, topic=topic).first()
         if not mastery:
-            mastery = UserTopicMastery(user_id=user_id, subject=subject, topic=topic, state=TopicMasteryState.IN_PROGRESS)
+            # Column defaults only apply on insert, so set the counters explicitly
+            mastery = UserTopicMastery(user_id=user_id, subject=subject, topic=topic, state=TopicMasteryState.IN_PROGRESS,
+                                       proficiency_score=0.0, total_attempts=0)
             db.session.add(mastery)
             
         mastery.total_attempts += 1
@@ -216,19 +266,21 @@ class GameService:
             mastery.state = TopicMasteryState.NEEDS_REVIEW
             
         mastery.last_activity_at = datetime.utcnow()
-        return {'state': mastery.state.value, 'proficiency': round(mastery.proficiency_score, 1)}
+        return {'state': mastery.state.value, 'proficiency': round(mastery.proficiency_score, 1),
+                'attempts': mastery.total_attempts}
 
     def _update_legacy_progress(self, user_id, subject, xp):
         # reuse existing logic to keep leaderboard working
         progress = GameProgress.query.filter_by(user_id=user_id, subject_focus=subject).first()
         if not progress:
-             progress = GameProgress(user_id=user_id, subject_focus=subject, game_module='all_activities', score=0, level=1)
+             progress = GameProgress(user_id=user_id, subject_focus=subject, game_module='all_activities', score=0, level=1, mastery_points=0)
              db.session.add(progress)
         
         progress.mastery_points += xp
         progress.score += xp # Approximation
         # Recalc level
         progress.level = int(progress.mastery_points / 100) + 1
+        return progress
 
     # --- Mastery Access Methods ---
     def get_topic_mastery(self, user_id, subject, topic):
@@ -302,45 +354,12 @@ class GameService:
 
     def get_leaderboard(self, module_id, subject=None, topic=None, limit=10):
         """
-        Get leaderboard. 
+        Get leaderboard (served from the in-memory leaderboards).
         If subject/topic provided -> Granular Mastery Leaderboard.
-        Else -> Global XP Leaderboard.
+        Else -> Global XP Leaderboard (optionally for one subject).
         """
-        if subject and topic:
-            # Granular Topic Mastery Leaderboard
-            results = db.session.query(UserTopicMastery, User.username)\
-                .join(User)\
-                .filter(UserTopicMastery.subject == subject, UserTopicMastery.topic == topic)\
-                .order_by(UserTopicMastery.proficiency_score.desc())\
-                .limit(limit)\
-                .all()
-                
-            return [{
-                'username': r[1],
-                'level': int(r[0].proficiency_score / 10) + 1, # Approx level from proficiency
-                'score': round(r[0].proficiency_score, 1),
-                'metric': 'Proficiency %',
-                'id': r[0].user_id
-            } for r in results]
-            
-        else:
-            # Global XP Leaderboard (Legacy GameProgress)
-            query = db.session.query(GameProgress, User.username)\
-                .join(User)\
-                .filter(GameProgress.game_module == 'all_activities')
-                
-            if subject:
-                 query = query.filter(GameProgress.subject_focus == subject)
-                 
-            results = query.order_by(GameProgress.mastery_points.desc())\
-                .limit(limit)\
-                .all()
-                
-            return [{
-                'username': r[1],
-                'level': r[0].level,
-                'score': r[0].mastery_points,
-                'metric': 'XP',
-                'subject': r[0].subject_focus,
-                'id': r[0].user_id
-            } for r in results]
+        return get_leaderboard_service().top(subject, topic, limit)
+
+    def get_leaderboard_standing(self, user_id, subject=None, topic=None, radius=2):
+        """A user's rank on a leaderboard plus the entries just above and below"""
+        return get_leaderboard_service().standing(user_id, subject, topic, radius)
@@ -4,13 +4,14 @@ Handles Google Sign-In authentication
 """
 
 import os
-import requests
 from typing import Dict, Optional
+from utils.http_client import get_http_client
+from utils.upstreams import upstream_base_url
 
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID', '141636012206-oviq8cma0p7pkmvlatc54dia781ov87m.apps.googleusercontent.com')
 GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET', '')
-GOOGLE_TOKEN_VERIFY_URL = 'https://www.googleapis.com/oauth2/v1/tokeninfo'
-GOOGLE_USER_INFO_URL = 'https://www.googleapis.com/oauth2/v2/userinfo'
+GOOGLE_TOKEN_VERIFY_URL = f"{upstream_base_url('GOOGLE_OAUTH')}/v1/tokeninfo"
+GOOGLE_USER_INFO_URL = f"{upstream_base_url('GOOGLE_OAUTH')}/v2/userinfo"
 
 
 class GoogleAuthService:
@@ -19,6 +20,7 @@ class GoogleAuthService:
     def __init__(self):
         self.client_id = GOOGLE_CLIENT_ID
         self.client_secret = GOOGLE_CLIENT_SECRET
+        self.http = get_http_client()
         if not self.client_id:
             print("WARNING: GOOGLE_CLIENT_ID not set!")
     
@@ -34,7 +36,7 @@ class GoogleAuthService:
         """
         try:
             # First, try to get user info directly with access token
-            user_info_response = requests.get(
+            user_info_response = self.http.get(
                 GOOGLE_USER_INFO_URL,
                 headers={'Authorization': f'Bearer {token}'}
             )
@@ -50,7 +52,7 @@ class GoogleAuthService:
                 }
             
             # If that fails, try verifying token first
-            token_response = requests.get(
+            token_response = self.http.get(
                 GOOGLE_TOKEN_VERIFY_URL,
                 params={'access_token': token}
             )
@@ -64,7 +66,7 @@ class GoogleAuthService:
                     # Continue anyway - client ID check is optional for access tokens
                 
                 # Get user info
-                user_info_response = requests.get(
+                user_info_response = self.http.get(
                     GOOGLE_USER_INFO_URL,
                     headers={'Authorization': f'Bearer {token}'}
                 )
@@ -0,0 +1,241 @@
+"""
+FocusLearner Pro - Leaderboard Service
+In-process sorted leaderboards, built from the database once and updated on every XP/proficiency change
+"""
+
+import os
+import time
+import bisect
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from flask import current_app
+from models import db, GameProgress, UserTopicMastery, User
+
+
+class Leaderboard:
+    """
+    One ranking, kept as a sorted list of (-score, user_id, member) keys.
+    Lookups (top-N, a member's rank, its neighbours) are a bisect plus a slice;
+    an update is a bisect to remove the old key and an insort for the new one.
+
+    An update may carry a version (anything that only grows per member); one
+    older than the member's current entry is ignored, so concurrent writers
+    reporting out of order can't put a stale score back.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple] = []
+        self._entries: Dict[Hashable, Tuple[Tuple, Dict, Any]] = {}
+        self._members_by_user: Dict[int, set] = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, member: Hashable, user_id: int, score: float, payload: Dict, version: Any = None) -> bool:
+        """Set a member's score; False if the update is older than the current entry"""
+        old = self._entries.get(member)
+        if old is not None:
+            if version is not None and old[2] is not None and version < old[2]:
+                return False
+            del self._keys[bisect.bisect_left(self._keys, old[0])]
+        key = (-score, user_id, member)
+        bisect.insort(self._keys, key)
+        self._entries[member] = (key, payload, version)
+        self._members_by_user.setdefault(user_id, set()).add(member)
+        return True
+
+    def top(self, n: int) -> List[Tuple[int, Dict]]:
+        """(rank, payload) for the first n entries"""
+        return [(i + 1, self._entries[key[2]][1]) for i, key in enumerate(self._keys[:n])]
+
+    def rank(self, member: Hashable) -> Optional[int]:
+        """1-based position of a member, None if absent"""
+        entry = self._entries.get(member)
+        if entry is None:
+            return None
+        return bisect.bisect_left(self._keys, entry[0]) + 1
+
+    def best_member(self, user_id: int) -> Optional[Hashable]:
+        """A user's highest-ranked member (boards may hold several per user, e.g. one per subject)"""
+        members = self._members_by_user.get(user_id)
+        if not members:
+            return None
+        return min(members, key=lambda member: self._entries[member][0])
+
+    def around(self, member: Hashable, radius: int) -> List[Tuple[int, Dict]]:
+        """(rank, payload) for up to `radius` entries either side of a member, including it"""
+        rank = self.rank(member)
+        if rank is None:
+            return []
+        first = max(0, rank - 1 - radius)
+        return [(first + i + 1, self._entries[key[2]][1]) for i, key in enumerate(self._keys[first:rank + radius])]
+
+
+class LeaderboardService:
+    """
+    XP leaderboards (global and per subject, from GameProgress) and proficiency
+    leaderboards per subject/topic (from UserTopicMastery), served from memory.
+
+    The boards are built from the database on first use. GameService updates
+    them after each committed submission. They are rebuilt in the background
+    every LEADERBOARD_REFRESH_SECONDS so changes written by other processes
+    show up too; updates made during a rebuild are replayed on top of it.
+    """
+
+    def __init__(self):
+        self.refresh_interval = float(os.getenv('LEADERBOARD_REFRESH_SECONDS', '300'))
+        self._lock = threading.RLock()
+        self._boards: Dict[Tuple, Leaderboard] = {}
+        self._usernames: Dict[int, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._rebuilding = False
+        self._replay: List[Tuple] = []
+        self.stats = {'rebuilds': 0, 'updates': 0, 'reads': 0}
+
+    # --- Writes ---
+
+    def record_progress(self, user_id: int, subject: str, mastery_points: int, level: int):
+        """XP changed for a user in a subject (GameProgress 'all_activities' row)"""
+        self._apply(('progress', user_id, subject, mastery_points, level))
+
+    def record_mastery(self, user_id: int, subject: str, topic: str, proficiency: float, attempts: int):
+        """Proficiency changed for a user in a topic (attempts orders the changes)"""
+        self._apply(('mastery', user_id, subject, topic, proficiency, attempts))
+
+    def _apply(self, change: Tuple):
+        with self._lock:
+            # A build is running: its snapshot may predate the change, so replay it on top
+            if self._rebuilding:
+                self._replay.append(change)
+            # Not built yet: the first build reads the committed change from the database
+            if self._loaded_at is None:
+                return
+            self._update(self._boards, change)
+            self.stats['updates'] += 1
+
+    @staticmethod
+    def _update(boards: Dict[Tuple, Leaderboard], change: Tuple):
+        if change[0] == 'progress':
+            # XP only grows, so the total is its own version
+            _, user_id, subject, mastery_points, level = change
+            payload = {'level': level, 'score': mastery_points, 'metric': 'XP', 'subject': subject, 'id': user_id}
+            boards.setdefault(('xp', None), Leaderboard()).update((user_id, subject), user_id, mastery_points, payload,
+                                                                  version=mastery_points)
+            boards.setdefault(('xp', subject), Leaderboard()).update(user_id, user_id, mastery_points, payload,
+                                                                     version=mastery_points)
+        else:
+            _, user_id, subject, topic, proficiency, attempts = change
+            payload = {
+                'level': int(proficiency / 10) + 1,  # Approx level from proficiency
+                'score': round(proficiency, 1),
+                'metric': 'Proficiency %',
+                'id': user_id
+            }
+            boards.setdefault(('topic', subject, topic), Leaderboard()).update(user_id, user_id, proficiency, payload,
+                                                                               version=attempts)
+
+    # --- Building ---
+
+    def rebuild(self):
+        """Rebuild every board from the database (needs an app context)"""
+        boards: Dict[Tuple, Leaderboard] = {}
+        usernames = dict(db.session.query(User.id, User.username).all())
+        progress_rows = db.session.query(
+            GameProgress.user_id, GameProgress.subject_focus, GameProgress.mastery_points, GameProgress.level
+        ).filter(GameProgress.game_module == 'all_activities').all()
+        for user_id, subject, mastery_points, level in progress_rows:
+            self._update(boards, ('progress', user_id, subject, mastery_points or 0, level or 1))
+        mastery_rows = db.session.query(
+            UserTopicMastery.user_id, UserTopicMastery.subject, UserTopicMastery.topic,
+            UserTopicMastery.proficiency_score, UserTopicMastery.total_attempts
+        ).all()
+        for user_id, subject, topic, proficiency, attempts in mastery_rows:
+            self._update(boards, ('mastery', user_id, subject, topic, proficiency or 0.0, attempts or 0))
+
+        with self._lock:
+            for change in self._replay:
+                self._update(boards, change)
+            self._replay = []
+            self._boards = boards
+            self._usernames = usernames
+            self._loaded_at = time.monotonic()
+            self._rebuilding = False
+            self.stats['rebuilds'] += 1
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._loaded_at is None:
+                self._rebuilding = True
+                loaded = False
+            elif not self._rebuilding and time.monotonic() - self._loaded_at > self.refresh_interval:
+                self._rebuilding = True
+                loaded = True
+            else:
+                return
+
+        if not loaded:
+            # First use in this process: build on the caller's path
+            try:
+                self.rebuild()
+            except Exception:
+                with self._lock:
+                    self._rebuilding = False
+                raise
+            return
+
+        app = current_app._get_current_object()
+        threading.Thread(target=self._background_rebuild, args=(app,), daemon=True,
+                         name='leaderboard-rebuild').start()
+
+    def _background_rebuild(self, app):
+        with app.app_context():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"Leaderboard rebuild failed: {e}")
+                with self._lock:
+                    self._rebuilding = False
+                    self._replay = []
+            finally:
+                db.session.remove()
+
+    # --- Reads ---
+
+    @staticmethod
+    def _board_key(subject: Optional[str], topic: Optional[str]) -> Tuple:
+        return ('topic', subject, topic) if subject and topic else ('xp', subject or None)
+
+    def _rows(self, ranked: List[Tuple[int, Dict]]) -> List[Dict]:
+        """Payloads with rank and username (users who signed up since the last build are looked up once)"""
+        missing = {payload['id'] for _, payload in ranked if payload['id'] not in self._usernames}
+        if missing:
+            found = dict(db.session.query(User.id, User.username).filter(User.id.in_(missing)).all())
+            with self._lock:
+                self._usernames.update({user_id: found.get(user_id) for user_id in missing})
+        return [dict(payload, rank=rank, username=self._usernames.get(payload['id'])) for rank, payload in ranked]
+
+    def top(self, subject: Optional[str] = None, topic: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        self._ensure_fresh()
+        with self._lock:
+            self.stats['reads'] += 1
+            board = self._boards.get(self._board_key(subject, topic))
+            ranked = board.top(limit) if board else []
+        return self._rows(ranked)
+
+    def standing(self, user_id: int, subject: Optional[str] = None, topic: Optional[str] = None,
+                 radius: int = 2) -> Optional[Dict[str, Any]]:
+        """A user's rank on a board and the entries around it, None if they aren't on it"""
+        self._ensure_fresh()
+        with self._lock:
+            self.stats['reads'] += 1
+            board = self._boards.get(self._board_key(subject, topic))
+            member = board.best_member(user_id) if board else None
+            if member is None:
+                return None
+            rank, total, neighbors = board.rank(member), len(board), board.around(member, radius)
+        return {'rank': rank, 'total': total, 'neighbors': self._rows(neighbors)}
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, boards=len(self._boards), entries=sum(len(board) for board in self._boards.values()))
@@ -4,13 +4,19 @@ Manages the strict pedagogical flow: Understand -> Apply -> Fail -> Retry -> Mas
 """
 from models import db, LearningLoopState, LearningIntent, LearningStage
 from datetime import datetime
+from .registry import get_misconception_queue
 
 class LearningLoopService:
+
+    def __init__(self, misconception_queue=None):
+        self.misconception_queue = misconception_queue or get_misconception_queue()
     
-    def get_current_stage(self, user_id, intent_id):
+    def get_current_stage(self, user_id, intent_id, commit=True):
         """
         Get the current learning stage for a user on a specific intent.
         If no state exists, initializes it to UNDERSTAND (Lecture).
+        With commit=False a new state is only flushed (so it has an id) and
+        the caller's transaction commits it.
         """
         state = LearningLoopState.query.filter_by(
             user_id=user_id, 
@@ -25,11 +31,14 @@ class LearningLoopService:
                 attempts=0
             )
             db.session.add(state)
-            db.session.commit()
+            if commit:
+                db.session.commit()
+            else:
+                db.session.flush()
             
         return state
 
-    def update_stage(self, user_id, intent_id, success: bool, score: float = 0, metadata=None):
+    def update_stage(self, user_id, intent_id, success: bool, score: float = 0, metadata=None, commit=True):
         """
         Advances the learning loop based on activity result.
         
@@ -38,14 +47,17 @@ class LearningLoopService:
         - APPLY -> Success (>80%) -> MASTERED
         - APPLY -> Fail (<80%) -> REMEDIATE
         - REMEDIATE -> (Stay until remediation completed via specific call)
+        
+        With commit=False the changes join the caller's transaction.
         """
-        state = self.get_current_stage(user_id, intent_id)
+        state = self.get_current_stage(user_id, intent_id, commit=commit)
         # Increment attempts only if applying
         if state.current_stage == LearningStage.APPLY:
             state.attempts += 1
             
         state.last_updated = datetime.utcnow()
         feedback = ""
+        analysis_pending = False
         
         # STRICT MASTERY GATE
         # Even if technically "correct", low score prevents mastery
@@ -72,28 +84,19 @@ class LearningLoopService:
                  # Transition to REMEDIATE (or stay)
                  state.current_stage = LearningStage.REMEDIATE
                  
-                 # ANALYZE MISCONCEPTION
+                 # ANALYZE MISCONCEPTION (queued; /loop/status picks up the result)
+                 state.last_feedback = None
                  if metadata:
-                     try:
-                         analysis = self.ai_service.analyze_misconception(
-                             metadata.get('question'),
-                             metadata.get('user_answer'),
-                             metadata.get('correct_answer'),
-                             metadata.get('subject')
-                         )
-                         state.last_feedback = json.dumps(analysis)
-                         feedback = feedback_prefix + analysis.get('analysis', "Review the material.")
-                     except Exception as e:
-                         print(f"AI Analysis Failed: {e}")
-                         feedback = feedback_prefix + "Let's review. Watch this key segment before trying again."
-                 else:
-                     feedback = feedback_prefix + "Let's review. Watch this key segment before trying again."
+                     self.misconception_queue.enqueue(state, metadata)
+                     analysis_pending = True
+                 feedback = feedback_prefix + "Let's review. Watch this key segment before trying again."
             else:
                  # Failed while in Understand? Unlikely unless quiz.
                  feedback = "Keep going."
                 
-        db.session.commit()
-        return {"stage": state.current_stage.value, "feedback": feedback}
+        if commit:
+            db.session.commit()
+        return {"stage": state.current_stage.value, "feedback": feedback, "analysis_pending": analysis_pending}
 
     def complete_remediation(self, user_id, intent_id):
         """Call this when user finishes watching the remediation video"""
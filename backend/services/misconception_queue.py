@@ -0,0 +1,186 @@
+"""
+FocusLearner Pro - Misconception Analysis Queue
+Durable, DB-backed queue that runs AI misconception analysis off the request path
+"""
+import os
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from models import db, MisconceptionJob, JobStatus, LearningLoopState, LearningStage
+
+
+class MisconceptionQueue:
+
+    def __init__(self, ai_service=None):
+        self._ai_service = ai_service
+        self.max_attempts = int(os.getenv('MISCONCEPTION_JOB_MAX_ATTEMPTS', '3'))
+        self.stale_after = timedelta(seconds=int(os.getenv('MISCONCEPTION_JOB_STALE_SECONDS', '300')))
+        # Failed attempts are retried after an exponential, jittered delay
+        self.backoff_base = float(os.getenv('MISCONCEPTION_JOB_BACKOFF_SECONDS', '30'))
+        self.backoff_max = float(os.getenv('MISCONCEPTION_JOB_BACKOFF_MAX_SECONDS', '900'))
+        self.poll_interval = float(os.getenv('MISCONCEPTION_WORKER_POLL_SECONDS', '1.0'))
+        # Run a worker thread inside the web process (otherwise run misconception_worker.py)
+        self.in_process = os.getenv('MISCONCEPTION_WORKER_INPROCESS', 'true').lower() == 'true'
+
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def ai_service(self):
+        if self._ai_service is None:
+            from .registry import get_ai_service
+            self._ai_service = get_ai_service()
+        return self._ai_service
+
+    def enqueue(self, state, metadata):
+        """
+        Add an analysis job for a loop state. Joins the caller's transaction;
+        the caller commits.
+        """
+        job = MisconceptionJob(
+            user_id=state.user_id,
+            loop_state_id=state.id,
+            payload=json.dumps(metadata),
+            status=JobStatus.PENDING
+        )
+        db.session.add(job)
+
+        if self.in_process:
+            self._ensure_worker()
+            self._wakeup.set()
+        return job
+
+    def has_pending(self, loop_state_id) -> bool:
+        """Whether analysis for this loop state is still queued or running"""
+        return db.session.query(MisconceptionJob.id).filter(
+            MisconceptionJob.loop_state_id == loop_state_id,
+            MisconceptionJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+        ).first() is not None
+
+    def _next_due(self):
+        """Oldest pending job whose retry delay has passed"""
+        return MisconceptionJob.query.filter(
+            MisconceptionJob.status == JobStatus.PENDING,
+            db.or_(MisconceptionJob.next_attempt_at.is_(None), MisconceptionJob.next_attempt_at <= datetime.utcnow())
+        ).order_by(MisconceptionJob.created_at).first()
+
+    def claim_next(self):
+        """Atomically move the oldest due pending job to RUNNING and return it (or None)"""
+        self._requeue_stale()
+        candidate = self._next_due()
+        while candidate:
+            updated = MisconceptionJob.query.filter(
+                MisconceptionJob.id == candidate.id,
+                MisconceptionJob.status == JobStatus.PENDING
+            ).update({
+                'status': JobStatus.RUNNING,
+                'started_at': datetime.utcnow(),
+                'attempts': MisconceptionJob.attempts + 1
+            }, synchronize_session=False)
+            db.session.commit()
+            if updated:
+                return MisconceptionJob.query.get(candidate.id)
+            # Another worker won the race; try the next one
+            candidate = self._next_due()
+        return None
+
+    def _requeue_stale(self):
+        """
+        Return jobs stuck in RUNNING (e.g. worker crashed) to the queue, or fail
+        them once they have used up their attempts
+        """
+        cutoff = datetime.utcnow() - self.stale_after
+        stale = MisconceptionJob.query.filter(
+            MisconceptionJob.status == JobStatus.RUNNING,
+            MisconceptionJob.started_at < cutoff
+        )
+        failed = stale.filter(MisconceptionJob.attempts >= self.max_attempts).update({
+            'status': JobStatus.FAILED,
+            'finished_at': datetime.utcnow(),
+            'last_error': 'Worker stopped while running the job'
+        }, synchronize_session=False)
+        requeued = stale.update({'status': JobStatus.PENDING}, synchronize_session=False)
+        if failed or requeued:
+            db.session.commit()
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Seconds before retrying a job that has failed `attempts` times (equal jitter)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def process(self, job):
+        """Run the analysis and store it as the loop state's feedback"""
+        breaker = getattr(self.ai_service, 'breaker', None)
+        if self.ai_service.is_available and breaker is not None and breaker.is_open:
+            # Gemini wouldn't be called; wait out the breaker without using up an attempt
+            job.status = JobStatus.PENDING
+            job.attempts -= 1
+            job.next_attempt_at = datetime.utcnow() + timedelta(seconds=breaker.reset_timeout)
+            db.session.commit()
+            return
+
+        try:
+            metadata = json.loads(job.payload)
+            analysis = self.ai_service.analyze_misconception(
+                metadata.get('question'),
+                metadata.get('user_answer'),
+                metadata.get('correct_answer'),
+                metadata.get('subject')
+            )
+            # The AI service reports an outage in the result instead of raising
+            if analysis.get('error'):
+                raise RuntimeError(analysis['error'])
+
+            state = LearningLoopState.query.get(job.loop_state_id)
+            # Don't overwrite feedback if the learner has already moved on
+            if state and state.current_stage == LearningStage.REMEDIATE:
+                state.last_feedback = json.dumps(analysis)
+
+            job.status = JobStatus.DONE
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Misconception analysis failed (job {job.id}): {e}")
+            job.last_error = str(e)
+            if job.attempts >= self.max_attempts:
+                job.status = JobStatus.FAILED
+                job.finished_at = datetime.utcnow()
+            else:
+                job.status = JobStatus.PENDING
+                job.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.backoff_delay(job.attempts))
+            db.session.commit()
+
+    def run_pending(self, limit=None) -> int:
+        """Process due jobs until none are left (or limit is reached)"""
+        processed = 0
+        while limit is None or processed < limit:
+            job = self.claim_next()
+            if not job:
+                break
+            self.process(job)
+            processed += 1
+        return processed
+
+    def run_worker(self, app):
+        """Blocking worker loop"""
+        while True:
+            try:
+                with app.app_context():
+                    self.run_pending()
+                    db.session.remove()
+            except Exception as e:
+                print(f"Misconception worker error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                app = current_app._get_current_object()
+                self._worker = threading.Thread(target=self.run_worker, args=(app,), daemon=True)
+                self._worker.start()
@@ -0,0 +1,118 @@
+"""
+FocusLearner Pro - Service Registry
+One lazily-created, shared instance of each service per process
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, List
+
+_services: Dict[str, Any] = {}
+# Re-entrant: a factory may resolve its own dependencies through the registry
+_lock = threading.RLock()
+
+
+def get_service(name: str, factory: Callable[[], Any]) -> Any:
+    """Instance registered under name, created with factory() on first use"""
+    service = _services.get(name)
+    if service is None:
+        with _lock:
+            service = _services.get(name)
+            if service is None:
+                service = factory()
+                _services[name] = service
+    return service
+
+
+def registered_services() -> List[str]:
+    """Names of the services created so far in this process"""
+    return sorted(_services)
+
+
+def get_ai_service():
+    from .ai_service import AIService
+    return get_service('ai', AIService)
+
+
+def get_content_filter():
+    from .content_filter import ContentFilter
+    return get_service('content_filter', ContentFilter)
+
+
+def get_relevance_classifier():
+    """Model from train_content_classifier.py (untrained if it hasn't been run)"""
+    from .relevance_classifier import RelevanceClassifier, DEFAULT_MODEL_PATH
+    return get_service('relevance_classifier', lambda: (
+        RelevanceClassifier.load(os.getenv('CONTENT_CLASSIFIER_PATH', DEFAULT_MODEL_PATH)) or RelevanceClassifier()
+    ))
+
+
+def get_search_result_cache():
+    from .search_cache_service import SearchResultCache
+    return get_service('search_results', SearchResultCache)
+
+
+def get_youtube_service():
+    from .youtube_service import YouTubeService
+    return get_service('youtube', lambda: YouTubeService(
+        ai_service=get_ai_service(), content_filter=get_content_filter()
+    ))
+
+
+def get_transcript_retriever():
+    from .transcript_retrieval import TranscriptRetriever
+    return get_service('transcript_retriever', TranscriptRetriever)
+
+
+def get_transcript_store():
+    from .transcript_store import TranscriptStore
+    return get_service('transcripts', lambda: TranscriptStore(get_youtube_service()))
+
+
+def get_content_aggregator():
+    from .content_aggregator import ContentAggregator, YouTubeAdapter, CatalogAdapter
+    return get_service('content_aggregator', lambda: ContentAggregator([
+        YouTubeAdapter(get_youtube_service()),
+        CatalogAdapter('nptel'),
+        CatalogAdapter('udemy'),
+    ]))
+
+
+def get_conversation_memory():
+    from .conversation_memory import ConversationMemory
+    return get_service('conversation_memory', lambda: ConversationMemory(get_ai_service()))
+
+
+def get_misconception_queue():
+    from .misconception_queue import MisconceptionQueue
+    return get_service('misconception_queue', MisconceptionQueue)
+
+
+def get_game_service():
+    from .game_service import GameService
+    return get_service('game', GameService)
+
+
+def get_activity_pool_service():
+    from .activity_pool_service import ActivityPoolService
+    return get_service('activity_pool', lambda: ActivityPoolService(get_ai_service(), get_game_service()))
+
+
+def get_leaderboard_service():
+    from .leaderboard_service import LeaderboardService
+    return get_service('leaderboards', LeaderboardService)
+
+
+def get_learning_loop_service():
+    from .learning_loop_service import LearningLoopService
+    return get_service('learning_loop', LearningLoopService)
+
+
+def get_analytics_service():
+    from .analytics_service import AnalyticsService
+    return get_service('analytics', AnalyticsService)
+
+
+def get_google_auth_service():
+    from .google_auth import GoogleAuthService
+    return get_service('google_auth', GoogleAuthService)
@@ -0,0 +1,99 @@
+"""
+FocusLearner Pro - Relevance Classifier
+TF-IDF + logistic regression model scoring whole result lists at once
+"""
+
+import os
+import json
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+MODERATION_LABELS = ('educational', 'distracting')
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'content_classifier.pkl')
+
+
+def video_text(video: Dict) -> str:
+    """Text the classifier sees for a video: title, description, tags and channel"""
+    tags = video.get('tags') or []
+    return ' '.join([video.get('title') or '', video.get('description') or '', ' '.join(tags), video.get('channel') or ''])
+
+
+def training_rows() -> Tuple[List[Dict], List[int]]:
+    """
+    Labelled examples from content_items: curated rows (not search cache rows)
+    that a reviewer has given a moderation_label. Filter verdicts are not used
+    as labels, since the model would only learn to copy the rules.
+    Needs an app context.
+    """
+    from models import ContentItem
+
+    items = ContentItem.query.filter(
+        ContentItem.search_key.is_(None),
+        ContentItem.moderation_label.in_(MODERATION_LABELS)
+    ).all()
+
+    videos, labels = [], []
+    for item in items:
+        video = {'title': item.title, 'description': item.description, 'channel': item.channel, 'tags': []}
+        if item.details:
+            video['tags'] = json.loads(item.details).get('tags') or []
+        videos.append(video)
+        labels.append(1 if item.moderation_label == 'educational' else 0)
+    return videos, labels
+
+
+class RelevanceClassifier:
+    """
+    Probability that a video is study material. Scoring vectorizes a whole list
+    into one sparse matrix and makes a single predict_proba call, so a page of
+    search results costs about as much as one video.
+    """
+
+    def __init__(self, pipeline=None):
+        self.pipeline = pipeline
+
+    @property
+    def is_trained(self) -> bool:
+        return self.pipeline is not None
+
+    def train(self, videos: List[Dict], labels: List[int]) -> 'RelevanceClassifier':
+        if len(set(labels)) < 2:
+            raise ValueError("Training data needs both educational and distracting examples")
+
+        # Imported on first use: scikit-learn (and scipy) take ~1s to import
+        from sklearn.pipeline import make_pipeline
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        self.pipeline = make_pipeline(
+            TfidfVectorizer(sublinear_tf=True, ngram_range=(1, 2), min_df=1, max_features=50000),
+            LogisticRegression(class_weight='balanced', max_iter=1000)
+        )
+        self.pipeline.fit([video_text(video) for video in videos], labels)
+        return self
+
+    def score(self, videos: List[Dict]) -> List[float]:
+        """Educational probability for each video, in order"""
+        if not videos:
+            return []
+        probabilities = self.pipeline.predict_proba([video_text(video) for video in videos])
+        educational = list(self.pipeline.classes_).index(1)
+        return [float(p) for p in probabilities[:, educational]]
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self.pipeline, f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['RelevanceClassifier']:
+        """Model written by train_content_classifier.py, or None if there isn't one"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return cls(pickle.load(f))
+        except Exception as e:
+            print(f"Warning: could not load content classifier from {path}: {e}")
+            return None
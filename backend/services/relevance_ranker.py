@@ -0,0 +1,106 @@
+"""
+FocusLearner Pro - Relevance Ranker
+BM25 ranking of filtered search results against the subject focus and learning intent
+"""
+
+import os
+import re
+import math
+from typing import Dict, List
+
+from .content_filter import load_stopwords
+
+TOKEN = re.compile(r'\w+')
+
+
+def intent_terms(intent) -> List[str]:
+    """Topic, sub-topic and required outcomes of a LearningIntent (model or to_dict())"""
+    if intent is None:
+        return []
+    if not isinstance(intent, dict):
+        intent = intent.to_dict()
+    return [intent.get('topic') or '', intent.get('sub_topic') or ''] + list(intent.get('required_outcomes') or [])
+
+
+class RelevanceRanker:
+    """
+    Orders a result list by how well each video matches the learning context.
+
+    Each video's title (counted TITLE_WEIGHT times), description and tags form a
+    document; the subject focus, search query and intent topic/outcomes form the
+    query. BM25 statistics (document frequencies, average length) are taken
+    from the result list itself, so no global index is needed: the list becomes
+    one sparse term-frequency matrix over the query terms and is scored with a
+    single sparse dot product. The normalized match score is blended with
+    YouTube's order and popularity.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 2
+
+    def __init__(self):
+        self.match_weight = float(os.getenv('SEARCH_RANK_MATCH_WEIGHT', '0.5'))
+        self._stop_words = None
+
+    def _tokens(self, text: str) -> List[str]:
+        if self._stop_words is None:
+            self._stop_words = load_stopwords('english')
+        return [token for token in TOKEN.findall(text.lower()) if token not in self._stop_words]
+
+    def _document(self, video: Dict) -> List[str]:
+        title = self._tokens(video.get('title') or '')
+        rest = self._tokens(f"{video.get('description') or ''} {' '.join(video.get('tags') or [])}")
+        return title * self.TITLE_WEIGHT + rest
+
+    def match_scores(self, videos: List[Dict], context: List[str]) -> List[float]:
+        """BM25 score of each video against the context phrases"""
+        query = sorted(set(self._tokens(' '.join(context))))
+        if not videos or not query:
+            return [0.0] * len(videos)
+
+        # Imported on first use: scikit-learn (and scipy) take ~1s to import
+        import numpy as np
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        documents = [self._document(video) for video in videos]
+        # Documents x query terms; terms outside the query never affect a score
+        tf = CountVectorizer(analyzer=lambda tokens: tokens, vocabulary=query).transform(documents).astype(float)
+        lengths = np.array([len(document) for document in documents], dtype=float)
+        norms = self.K1 * (1 - self.B + self.B * lengths / (lengths.mean() or 1))
+
+        n = len(documents)
+        document_frequency = np.bincount(tf.indices, minlength=len(query))
+        idf = np.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        # Term-frequency saturation on the stored entries only, each against its row's length norm
+        rows = np.repeat(np.arange(n), np.diff(tf.indptr))
+        tf.data = tf.data * (self.K1 + 1) / (tf.data + norms[rows])
+        return (tf @ idf).tolist()
+
+    def rank(self, videos: List[Dict], context: List[str]) -> List[Dict]:
+        """
+        Videos ordered by match_weight * normalized BM25 plus the remainder split
+        0.7 / 0.3 between YouTube's order and log-scaled view count (when known).
+        Adds 'match_score' to each video.
+        """
+        if not videos:
+            return videos
+
+        matches = self.match_scores(videos, context)
+        best = max(matches) or 1.0
+        has_views = any(video.get('view_count') for video in videos)
+
+        scored = []
+        for position, (video, match) in enumerate(zip(videos, matches)):
+            video['match_score'] = round(match, 4)
+            order = 1.0 / (1 + position)
+            if has_views:
+                popularity = min(1.0, math.log10(video.get('view_count', 0) + 1) / 7)
+                prior = 0.7 * order + 0.3 * popularity
+            else:
+                prior = order
+            score = self.match_weight * match / best + (1 - self.match_weight) * prior
+            scored.append((score, -position, video))
+        scored.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+        return [video for _, _, video in scored]
@@ -0,0 +1,168 @@
+"""
+FocusLearner Pro - Search Result Cache
+Filtered YouTube search results persisted in ContentItem, served stale-while-revalidate
+"""
+
+import os
+import json
+import hashlib
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from flask import current_app, has_app_context
+from models import db, ContentItem
+from utils.singleflight import get_singleflight
+
+# Enrichment fields (from videos.list) kept alongside the cached result
+DETAIL_FIELDS = ('tags', 'category_id', 'duration_seconds', 'view_count', 'like_count')
+
+
+class SearchResultCache:
+    """
+    Cache of filtered search results keyed by normalized (query, subject_focus).
+
+    Each cached result list is a set of ContentItem rows sharing a search_key,
+    ordered by search_rank. Fresh entries are served directly; stale entries are
+    served immediately while a background refresh fetches new results; entries
+    past the stale window (or missing) are fetched on the request path. If a
+    fetch fails, whatever is cached is served regardless of age. Concurrent
+    fetches of the same key (misses and refreshes alike) share one search call.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+        self.ttl = timedelta(seconds=int(os.getenv('SEARCH_CACHE_TTL', str(6 * 3600))))
+        self.stale_ttl = timedelta(seconds=int(os.getenv('SEARCH_CACHE_STALE_TTL', str(7 * 86400))))
+        # Results stored per query; a search costs the same quota whatever maxResults is
+        self.fetch_size = int(os.getenv('SEARCH_CACHE_RESULTS', '20'))
+
+        self.inflight = get_singleflight('search_results')
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='search-refresh')
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0, 'errors_served_cached': 0}
+
+    @staticmethod
+    def make_key(query: str, subject_focus: str) -> str:
+        normalize = lambda text: ' '.join((text or '').lower().split())
+        return hashlib.sha256(f"{normalize(subject_focus)}\n{normalize(query)}".encode('utf-8')).hexdigest()
+
+    def get_or_fetch(self, query: str, subject_focus: str, max_results: int,
+                     fetch: Callable[[str, str, int], List[Dict]]) -> List[Dict]:
+        """
+        Cached results for the query, calling fetch(query, subject_focus, n) on a miss.
+        fetch should raise on failure rather than return placeholder results.
+        """
+        if not self.enabled or not has_app_context():
+            return fetch(query, subject_focus, max_results)
+
+        key = self.make_key(query, subject_focus)
+        size = max(max_results, self.fetch_size)
+        rows = self._load(key)
+
+        if rows:
+            age = datetime.utcnow() - min(row.fetched_at for row in rows)
+            if age <= self.ttl:
+                self._count('hits')
+                return [row.to_video_dict() for row in rows[:max_results]]
+            if age <= self.ttl + self.stale_ttl:
+                self._count('stale_hits')
+                self._schedule_refresh(key, query, subject_focus, size, fetch)
+                return [row.to_video_dict() for row in rows[:max_results]]
+
+        self._count('misses')
+        try:
+            videos = self._fetch_and_store(key, query, subject_focus, size, fetch)
+        except Exception:
+            if not rows:
+                raise
+            self._count('errors_served_cached')
+            return [row.to_video_dict() for row in rows[:max_results]]
+        return videos[:max_results]
+
+    def _fetch_and_store(self, key, query, subject_focus, size, fetch) -> List[Dict]:
+        """Fetch and cache a result list; concurrent callers for the key wait for one fetch"""
+        def fetch_and_store():
+            videos = fetch(query, subject_focus, size)
+            self._store(key, videos)
+            return videos
+        return self.inflight.do(f"{key}:{size}", fetch_and_store)
+
+    def _load(self, key: str) -> List[ContentItem]:
+        return ContentItem.query.filter_by(search_key=key).order_by(ContentItem.search_rank).all()
+
+    def _store(self, key: str, videos: List[Dict]):
+        """Replace the cached result list for a key"""
+        # Empty results are not cached so a transient filter/API hiccup isn't pinned for the TTL
+        if not videos:
+            return
+        now = datetime.utcnow()
+        seen, unique = set(), []
+        for video in videos:
+            if video['video_id'] not in seen:
+                seen.add(video['video_id'])
+                unique.append(video)
+        try:
+            ContentItem.query.filter_by(search_key=key).delete()
+            for rank, video in enumerate(unique):
+                details = {field: video[field] for field in DETAIL_FIELDS if field in video}
+                db.session.add(ContentItem(
+                    title=video.get('title') or '',
+                    description=video.get('description'),
+                    source=video.get('source', 'youtube'),
+                    source_id=video['video_id'],
+                    url=video.get('url') or f"https://www.youtube.com/watch?v={video['video_id']}",
+                    subject_focus=video.get('subject_focus') or '',
+                    thumbnail=video.get('thumbnail'),
+                    channel=video.get('channel'),
+                    published_at=video.get('published_at'),
+                    is_filtered=bool(video.get('is_filtered', False)),
+                    filter_reason=video.get('filter_reason'),
+                    details=json.dumps(details) if details else None,
+                    search_key=key,
+                    search_rank=rank,
+                    fetched_at=now
+                ))
+            db.session.commit()
+        except Exception as e:
+            # Including losing a race with another process storing the same key
+            db.session.rollback()
+            print(f"Failed to cache search results: {e}")
+
+    def _schedule_refresh(self, key, query, subject_focus, size, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        app = current_app._get_current_object()
+        # The caller's context goes along, so the refresh keeps the request's deadline
+        self._executor.submit(contextvars.copy_context().run, self._refresh, app, key, query, subject_focus, size, fetch)
+
+    def _refresh(self, app, key, query, subject_focus, size, fetch):
+        try:
+            # fetch filters and may use the database (filter cache, classifier), so it needs the app context too
+            with app.app_context():
+                self._fetch_and_store(key, query, subject_focus, size, fetch)
+                db.session.remove()
+            self._count('refreshes')
+        except Exception as e:
+            print(f"Background search refresh failed: {e}")
+            self._count('refresh_errors')
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['refreshing'] = len(self._refreshing)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / lookups, 3) if lookups else 0.0
+        return stats
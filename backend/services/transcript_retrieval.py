@@ -0,0 +1,108 @@
+"""
+FocusLearner Pro - Transcript Retrieval
+TF-IDF passage index over stored transcripts for timestamp-aware tutor context
+"""
+
+import os
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class PassageIndex:
+    """
+    TF-IDF index over one video's transcript. Consecutive segments are grouped
+    into passages of roughly `window` seconds so each hit carries enough text to
+    be useful in a prompt.
+    """
+
+    def __init__(self, segments: List[Dict], window: float):
+        self.passages = []
+        current = None
+        for segment in segments:
+            if current is None or segment['start'] - current['start'] >= window:
+                current = {'start': segment['start'], 'end': segment['start'], 'texts': []}
+                self.passages.append(current)
+            current['texts'].append(segment.get('text', ''))
+            current['end'] = segment['start'] + segment.get('duration', 0)
+        for passage in self.passages:
+            passage['text'] = ' '.join(passage.pop('texts')).replace('\n', ' ')
+
+        # Imported on first use: scikit-learn (and scipy) take ~1s to import
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        self.vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True, ngram_range=(1, 2))
+        try:
+            # Rows are L2-normalized, so a dot product is the cosine similarity
+            self.matrix = self.vectorizer.fit_transform([passage['text'] for passage in self.passages])
+        except ValueError:
+            # Empty vocabulary (e.g. music-only captions)
+            self.matrix = None
+
+    def search(self, query: str, k: int, timestamp: Optional[float] = None,
+               proximity_weight: float = 0.0, proximity_scale: float = 120.0) -> List[Dict]:
+        if not self.passages:
+            return []
+
+        if self.matrix is not None:
+            similarities = (self.matrix @ self.vectorizer.transform([query]).T).toarray().ravel()
+        else:
+            similarities = [0.0] * len(self.passages)
+
+        scored = []
+        for i, passage in enumerate(self.passages):
+            score = float(similarities[i])
+            if timestamp is not None and proximity_weight:
+                middle = (passage['start'] + passage['end']) / 2
+                score += proximity_weight * math.exp(-abs(timestamp - middle) / proximity_scale)
+            if score > 0:
+                scored.append((score, i))
+
+        scored.sort(reverse=True)
+        hits = [dict(self.passages[i], score=round(score, 4)) for score, i in scored[:k]]
+        # Chronological order reads better in a prompt
+        return sorted(hits, key=lambda hit: hit['start'])
+
+
+class TranscriptRetriever:
+    """
+    Per-video passage indexes, kept in a bounded LRU and keyed by transcript
+    version. Indexes are built when a transcript is stored and rebuilt lazily
+    after a restart.
+    """
+
+    def __init__(self):
+        self.window = float(os.getenv('RETRIEVAL_PASSAGE_SECONDS', '30'))
+        self.top_k = int(os.getenv('RETRIEVAL_TOP_K', '3'))
+        self.proximity_weight = float(os.getenv('RETRIEVAL_PROXIMITY_WEIGHT', '0.3'))
+        self.proximity_scale = float(os.getenv('RETRIEVAL_PROXIMITY_SECONDS', '120'))
+        self.max_indexes = int(os.getenv('RETRIEVAL_MAX_INDEXES', '128'))
+
+        self._indexes: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build(self, video_id: str, version: str, segments: List[Dict]) -> PassageIndex:
+        index = PassageIndex(segments, self.window)
+        with self._lock:
+            self._indexes[video_id] = (version, index)
+            self._indexes.move_to_end(video_id)
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+    def get(self, video_id: str, version: str) -> Optional[PassageIndex]:
+        with self._lock:
+            entry = self._indexes.get(video_id)
+            if entry and entry[0] == version:
+                self._indexes.move_to_end(video_id)
+                return entry[1]
+        return None
+
+    def retrieve(self, video_id: str, version: str, segments_loader, query: str,
+                 timestamp: Optional[float] = None, k: Optional[int] = None) -> List[Dict]:
+        """
+        Top-k passages for a question, favouring ones near the playback position.
+        segments_loader() is only called if the index has to be (re)built.
+        """
+        index = self.get(video_id, version) or self.build(video_id, version, segments_loader())
+        return index.search(query, k or self.top_k, timestamp, self.proximity_weight, self.proximity_scale)
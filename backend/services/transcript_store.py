@@ -0,0 +1,209 @@
+"""
+FocusLearner Pro - Transcript Store
+Fetch-once, compressed storage for YouTube transcripts
+"""
+
+import os
+import json
+import zlib
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from models import db, VideoTranscript
+from utils.singleflight import get_singleflight
+from .registry import get_transcript_retriever
+
+
+def _unavailable_errors():
+    """Errors meaning the video has no transcript (as opposed to a failed request)"""
+    from youtube_transcript_api import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
+    return TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
+
+
+class TranscriptStore:
+    """
+    Transcripts are fetched from YouTube once per video and kept in the
+    video_transcripts table as zlib-compressed JSON. Videos without a transcript
+    are recorded too and only re-checked after TRANSCRIPT_NEGATIVE_TTL, since
+    captions are sometimes added later. Transient fetch errors are not stored.
+    """
+
+    def __init__(self, youtube_service):
+        self.youtube_service = youtube_service
+        self.negative_ttl = timedelta(seconds=int(os.getenv('TRANSCRIPT_NEGATIVE_TTL', '86400')))
+        self.inflight = get_singleflight('transcripts')
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('TRANSCRIPT_PREFETCH_WORKERS', '2')), thread_name_prefix='transcript-prefetch'
+        )
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'negative_hits': 0, 'fetched': 0, 'unavailable': 0, 'fetch_errors': 0}
+
+        # Decoded transcripts with their sorted start offsets, for range lookups
+        self.max_decoded = int(os.getenv('TRANSCRIPT_MEMORY_ENTRIES', '64'))
+        self._decoded: "OrderedDict[str, Tuple[str, List[float], List[Dict]]]" = OrderedDict()
+
+    def get(self, video_id: str) -> Optional[VideoTranscript]:
+        """
+        Stored record for a video, fetching it on first use. Returns None only when
+        the fetch failed transiently; check is_available on the record otherwise.
+        """
+        record = VideoTranscript.query.filter_by(video_id=video_id).first()
+        if record is not None:
+            if record.is_available:
+                self._count('hits')
+                return record
+            if record.retry_after and record.retry_after > datetime.utcnow():
+                self._count('negative_hits')
+                return record
+
+        self.inflight.do(video_id, lambda: self._fetch_and_store(video_id))
+        db.session.expire_all()
+        return VideoTranscript.query.filter_by(video_id=video_id).first()
+
+    def peek(self, video_id: str) -> Optional[VideoTranscript]:
+        """Stored record for a video, without fetching anything"""
+        return VideoTranscript.query.filter_by(video_id=video_id).first()
+
+    def segments(self, record: VideoTranscript) -> List[Dict]:
+        """Decoded segments, sorted by start time"""
+        return self._index(record)[1]
+
+    def excerpts(self, video_id: str, query: str, timestamp: Optional[float] = None) -> List[Dict]:
+        """
+        Transcript passages relevant to a question, favouring ones near `timestamp`.
+        Never fetches on the caller's path: a transcript that isn't stored yet is
+        prefetched in the background and nothing is returned this time.
+        """
+        record = self.peek(video_id)
+        if record is None:
+            self.prefetch([video_id])
+            return []
+        if not record.is_available:
+            return []
+        return get_transcript_retriever().retrieve(
+            video_id, record.etag, lambda: self.segments(record), query, timestamp
+        )
+
+    @staticmethod
+    def load_segments(record: VideoTranscript) -> List[Dict]:
+        if not record or not record.is_available:
+            return []
+        return json.loads(zlib.decompress(record.data).decode('utf-8'))
+
+    def _index(self, record: VideoTranscript) -> Tuple[List[float], List[Dict]]:
+        """(sorted start offsets, segments) for a stored transcript, decoded once per version"""
+        with self._lock:
+            cached = self._decoded.get(record.video_id)
+            if cached and cached[0] == record.etag:
+                self._decoded.move_to_end(record.video_id)
+                return cached[1], cached[2]
+
+        segments = self.load_segments(record)
+        starts = [segment['start'] for segment in segments]
+        with self._lock:
+            self._decoded[record.video_id] = (record.etag, starts, segments)
+            self._decoded.move_to_end(record.video_id)
+            while len(self._decoded) > self.max_decoded:
+                self._decoded.popitem(last=False)
+        return starts, segments
+
+    def segments_between(self, record: VideoTranscript, start: float, end: float) -> Tuple[int, List[Dict]]:
+        """
+        Segments overlapping [start, end) seconds.
+
+        Returns:
+            Tuple[index of the first segment, segments]
+        """
+        starts, segments = self._index(record)
+        first = bisect.bisect_right(starts, start) - 1
+        # The segment that began before `start` only counts if it is still running
+        if first < 0 or starts[first] + segments[first].get('duration', 0) <= start:
+            first += 1
+        last = bisect.bisect_left(starts, end)
+        return first, segments[first:last]
+
+    def segments_around(self, record: VideoTranscript, at: float, count: int) -> Tuple[int, List[Dict]]:
+        """
+        `count` segments centred on the one playing at `at` seconds.
+
+        Returns:
+            Tuple[index of the first segment, segments]
+        """
+        starts, segments = self._index(record)
+        current = max(0, bisect.bisect_right(starts, at) - 1)
+        first = max(0, min(current - count // 2, len(segments) - count))
+        return first, segments[first:first + count]
+
+    def prefetch(self, video_ids: List[str]):
+        """Store transcripts for these videos in the background (e.g. when added to a lecture)"""
+        if not video_ids:
+            return
+        app = current_app._get_current_object()
+        self._executor.submit(self._prefetch, app, list(video_ids))
+
+    def _prefetch(self, app, video_ids: List[str]):
+        with app.app_context():
+            for video_id in video_ids:
+                try:
+                    self.get(video_id)
+                except Exception as e:
+                    print(f"Transcript prefetch failed for {video_id}: {e}")
+            db.session.remove()
+
+    def _fetch_and_store(self, video_id: str):
+        try:
+            segments = self.youtube_service.fetch_transcript(video_id)
+        except Exception as e:
+            if not isinstance(e, _unavailable_errors()):
+                print(f"Error fetching transcript for video {video_id}: {e}")
+                self._count('fetch_errors')
+                return
+            self._count('unavailable')
+            segments = None
+
+        record = VideoTranscript.query.filter_by(video_id=video_id).first()
+        if record is None:
+            record = VideoTranscript(video_id=video_id)
+            db.session.add(record)
+
+        record.fetched_at = datetime.utcnow()
+        if segments:
+            segments = sorted(segments, key=lambda segment: segment['start'])
+            record.data = zlib.compress(json.dumps(segments, separators=(',', ':')).encode('utf-8'), 6)
+            record.is_available = True
+            record.segment_count = len(segments)
+            record.etag = hashlib.sha256(record.data).hexdigest()[:32]
+            record.retry_after = None
+            self._count('fetched')
+        else:
+            record.data = None
+            record.is_available = False
+            record.segment_count = 0
+            record.etag = None
+            record.retry_after = record.fetched_at + self.negative_ttl
+
+        try:
+            db.session.commit()
+        except Exception as e:
+            # Most likely a concurrent insert of the same video from another process
+            db.session.rollback()
+            print(f"Failed to store transcript for {video_id}: {e}")
+            return
+
+        if segments:
+            # Build the retrieval index while the segments are at hand
+            get_transcript_retriever().build(video_id, record.etag, segments)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
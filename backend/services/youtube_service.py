@@ -4,23 +4,49 @@ Service for fetching and managing YouTube content
 """
 
 import os
-import requests
+import re
+import math
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import List, Dict, Optional
-from youtube_transcript_api import YouTubeTranscriptApi
-from .content_filter import ContentFilter
-from .ai_service import AIService
+from .registry import get_ai_service, get_content_filter, get_search_result_cache
+from .relevance_ranker import RelevanceRanker, intent_terms
+from utils.http_client import get_http_client
+from utils.response_cache import get_response_cache
+from utils.resilience import current_deadline
+from utils.upstreams import upstream_base_url, using_stub
+
+VIDEOS_LIST_BATCH = 50  # videos.list accepts at most 50 ids per call
+
+# Shared pool for running query refinement alongside a raw-query search
+_search_executor = ThreadPoolExecutor(max_workers=int(os.getenv('SEARCH_WORKERS', '8')), thread_name_prefix='search')
 
 
 class YouTubeService:
     """Service for interacting with YouTube content"""
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('YOUTUBE_API_KEY', '')
-        self.base_url = 'https://www.googleapis.com/youtube/v3'
-        self.content_filter = ContentFilter()
-        self.ai_service = AIService()
+    def __init__(self, api_key: Optional[str] = None, ai_service=None, content_filter=None):
+        self.api_key = api_key or os.getenv('YOUTUBE_API_KEY', '') or ('stub-key' if using_stub() else '')
+        self.base_url = upstream_base_url('YOUTUBE')
+        self.content_filter = content_filter or get_content_filter()
+        self.ai_service = ai_service or get_ai_service()
+        self.http = get_http_client()
+        # 'sequential': refine then search. 'race': on a memo miss, search the raw query
+        # while refining and use the refined query only if it arrives within budget.
+        self.refine_mode = os.getenv('SEARCH_REFINE_MODE', 'sequential')
+        self.refine_budget = float(os.getenv('SEARCH_REFINE_BUDGET_SECONDS', '1.5'))
+        self.result_cache = get_search_result_cache()
+        # Tags/duration/category/statistics from videos.list, cached per video id
+        self.enrich_enabled = os.getenv('VIDEO_ENRICHMENT_ENABLED', 'true').lower() == 'true'
+        self.details_cache = get_response_cache(
+            'video_details', ttl=int(os.getenv('VIDEO_DETAILS_TTL', str(7 * 86400)))
+        )
+        # search.list results requested per wanted result (headroom for filtered-out videos)
+        self.overfetch = float(os.getenv('SEARCH_OVERFETCH', '1.25' if self.enrich_enabled else '2'))
+        # Filtered results are re-ranked against the subject focus / learning intent on every call
+        self.ranker = RelevanceRanker()
     
-    def search_videos(self, query: str, subject_focus: str, max_results: int = 10) -> List[Dict]:
+    def search_videos(self, query: str, subject_focus: str, max_results: int = 10, intent=None) -> List[Dict]:
         """
         Search for YouTube videos related to the query and subject focus.
         
@@ -28,57 +54,150 @@ class YouTubeService:
             query: Search query
             subject_focus: Current subject focus (e.g., "ECE/Network Analysis")
             max_results: Maximum number of results to return
+            intent: Optional LearningIntent (or its to_dict()) whose topic and
+                required outcomes the results are ranked against
         
         Returns:
-            List of filtered video dictionaries
+            List of filtered video dictionaries, best match first
         """
         if not self.api_key:
             # Return mock data for development
             return self._get_mock_videos(query, subject_focus, max_results)
         
+        try:
+            # Rank the whole cached result list, then take the top results
+            pool_size = max(max_results, self.result_cache.fetch_size)
+            candidates = self.result_cache.get_or_fetch(query, subject_focus, pool_size, self._search_live)
+            context = [subject_focus, query] + intent_terms(intent)
+            return self.ranker.rank(candidates, context)[:max_results]
+        except Exception as e:
+            print(f"Error fetching YouTube videos: {e}")
+            return self._get_mock_videos(query, subject_focus, max_results)
+    
+    def _search_live(self, query: str, subject_focus: str, max_results: int) -> List[Dict]:
+        """Refine, search and filter against the live API (raises on failure)"""
         # Use AI to refine the search query for better educational relevance
-        refined_query = self.ai_service.refine_search_query(subject_focus, query)
-        print(f"Original Query: {subject_focus} {query} -> Refined: {refined_query}")
+        refined_query = self.ai_service.cached_refinement(subject_focus, query)
+        if refined_query:
+            videos = self._fetch_search(refined_query, subject_focus, max_results)
+        elif self.refine_mode == 'race':
+            videos = self._race_refinement(query, subject_focus, max_results)
+        else:
+            refined_query = self.ai_service.refine_search_query(subject_focus, query)
+            videos = self._fetch_search(refined_query, subject_focus, max_results)
+        
+        if self.enrich_enabled:
+            videos = self._enrich(videos)
+        
+        # Filter videos using content filter
+        filtered_videos = self.content_filter.filter_video_list(videos)
         
+        return filtered_videos[:max_results]
+    
+    def _race_refinement(self, query: str, subject_focus: str, max_results: int) -> List[Dict]:
+        """
+        Give query refinement a time budget and run a single search: the refined
+        query if refinement finishes within budget, otherwise the raw query.
+        A late refinement still completes in the background and is memoized for
+        next time. (Searching the raw query up front can't be undone once its
+        request is in flight, so it would spend search quota twice.)
+        """
+        refinement = _search_executor.submit(
+            contextvars.copy_context().run, self.ai_service.refine_search_query, subject_focus, query
+        )
+        try:
+            refined_query = refinement.result(timeout=self.refine_budget)
+        except FutureTimeoutError:
+            print(f"Query refinement exceeded {self.refine_budget}s budget, searching the raw query")
+            return self._fetch_search(f"{subject_focus} {query}", subject_focus, max_results)
+        
+        return self._fetch_search(refined_query, subject_focus, max_results)
+
+    def _fetch_search(self, search_query: str, subject_focus: str, max_results: int) -> List[Dict]:
+        """Call search.list and normalize results (unfiltered)"""
+        print(f"Original Query: {subject_focus} -> Searching: {search_query}")
         params = {
             'part': 'snippet',
-            'q': refined_query,
+            'q': search_query,
             'type': 'video',
-            'maxResults': max_results * 2,  # Get more to filter
+            'maxResults': min(50, math.ceil(max_results * self.overfetch)),  # Get more to filter
             'key': self.api_key,
             'videoCategoryId': '27',  # Education category
             'order': 'relevance'
         }
         
-        try:
-            response = requests.get(f"{self.base_url}/search", params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            videos = []
-            for item in data.get('items', []):
-                video = {
-                    'video_id': item['id']['videoId'],
-                    'title': item['snippet']['title'],
-                    'description': item['snippet']['description'],
-                    'thumbnail': item['snippet']['thumbnails']['medium']['url'],
-                    'channel': item['snippet']['channelTitle'],
-                    'published_at': item['snippet']['publishedAt'],
-                    'url': f"https://www.youtube.com/watch?v={item['id']['videoId']}",
-                    'source': 'youtube',
-                    'subject_focus': subject_focus,
-                    'tags': []  # Tags not available in search API
-                }
-                videos.append(video)
-            
-            # Filter videos using content filter
-            filtered_videos = self.content_filter.filter_video_list(videos)
-            
-            return filtered_videos[:max_results]
+        response = self.http.get(f"{self.base_url}/search", params=params, deadline=current_deadline())
+        response.raise_for_status()
+        data = response.json()
         
-        except Exception as e:
-            print(f"Error fetching YouTube videos: {e}")
-            return self._get_mock_videos(query, subject_focus, max_results)
+        videos = []
+        for item in data.get('items', []):
+            video = {
+                'video_id': item['id']['videoId'],
+                'title': item['snippet']['title'],
+                'description': item['snippet']['description'],
+                'thumbnail': item['snippet']['thumbnails']['medium']['url'],
+                'channel': item['snippet']['channelTitle'],
+                'published_at': item['snippet']['publishedAt'],
+                'url': f"https://www.youtube.com/watch?v={item['id']['videoId']}",
+                'source': 'youtube',
+                'subject_focus': subject_focus,
+                'tags': []  # Tags not available in search API
+            }
+            videos.append(video)
+        return videos
+    
+    def _enrich(self, videos: List[Dict]) -> List[Dict]:
+        """
+        Add tags, duration, category and statistics to search results. Details are
+        cached per video id; missing ones are fetched in batches of 50 ids per
+        videos.list call. Videos whose details can't be fetched pass through as-is.
+        """
+        missing = []
+        for video in videos:
+            details, _ = self.details_cache.get(video['video_id'], allow_stale=True)
+            if details:
+                video.update(details)
+            else:
+                missing.append(video)
+        
+        for start in range(0, len(missing), VIDEOS_LIST_BATCH):
+            batch = missing[start:start + VIDEOS_LIST_BATCH]
+            try:
+                fetched = self._fetch_details([video['video_id'] for video in batch])
+            except Exception as e:
+                print(f"Error fetching YouTube video details: {e}")
+                break
+            for video in batch:
+                details = fetched.get(video['video_id'])
+                if details:
+                    self.details_cache.set(video['video_id'], details)
+                    video.update(details)
+        return videos
+    
+    def _fetch_details(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """One videos.list call for up to 50 ids"""
+        params = {
+            'part': 'snippet,contentDetails,statistics',
+            'id': ','.join(video_ids),
+            'key': self.api_key,
+            'maxResults': len(video_ids)
+        }
+        response = self.http.get(f"{self.base_url}/videos", params=params, deadline=current_deadline())
+        response.raise_for_status()
+        
+        details = {}
+        for item in response.json().get('items', []):
+            snippet = item.get('snippet', {})
+            statistics = item.get('statistics', {})
+            details[item['id']] = {
+                'tags': snippet.get('tags', []),
+                'category_id': snippet.get('categoryId'),
+                'duration_seconds': _parse_duration(item.get('contentDetails', {}).get('duration')),
+                'view_count': int(statistics.get('viewCount', 0) or 0),
+                'like_count': int(statistics.get('likeCount', 0) or 0)
+            }
+        return details
     
     def get_video_transcript(self, video_id: str) -> Optional[List[Dict]]:
         """
@@ -91,12 +210,19 @@ class YouTubeService:
             List of transcript entries with 'text' and 'start' keys, or None
         """
         try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            return transcript
+            return self.fetch_transcript(video_id)
         except Exception as e:
             print(f"Error fetching transcript for video {video_id}: {e}")
             return None
     
+    def fetch_transcript(self, video_id: str) -> List[Dict]:
+        """
+        Fetch a transcript from YouTube, raising on failure. TranscriptsDisabled,
+        NoTranscriptFound and VideoUnavailable mean there is no transcript to get.
+        """
+        from youtube_transcript_api import YouTubeTranscriptApi
+        return YouTubeTranscriptApi.get_transcript(video_id)
+    
     def _get_mock_videos(self, query: str, subject_focus: str, max_results: int) -> List[Dict]:
         """Return smart mock video data for development/testing"""
         
@@ -187,3 +313,12 @@ class YouTubeService:
         
         return mock_videos[:max_results]
 
+
+def _parse_duration(duration: Optional[str]) -> Optional[int]:
+    """ISO 8601 duration (e.g. PT1H2M30S) in seconds"""
+    match = re.match(r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$', duration or '')
+    # A bare "P" or "PT" matches the pattern but isn't a duration
+    if not match or not any(match.groups()):
+        return None
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
@@ -0,0 +1,360 @@
+"""
+FocusLearner Pro - Upstream Stand-in Server
+Local HTTP server speaking the subset of the Gemini, YouTube Data and Google
+OAuth APIs the backend uses, with injectable latency, errors and quota failures.
+
+Usage:
+    python stub_server.py --port 8090 --latency gemini=lognormal:800:400 --error-rate 0.02
+    UPSTREAM_STUB_URL=http://127.0.0.1:8090 python app.py
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class LatencyProfile:
+    """Latency distribution in milliseconds: fixed, uniform, normal, lognormal or exponential"""
+
+    def __init__(self, dist: str = 'fixed', mean: float = 0.0, spread: float = 0.0):
+        self.dist = dist
+        self.mean = mean
+        self.spread = spread
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyProfile':
+        """Parse 'dist:mean[:spread]', e.g. 'normal:150:40'"""
+        parts = spec.split(':')
+        dist = parts[0]
+        mean = float(parts[1]) if len(parts) > 1 else 0.0
+        spread = float(parts[2]) if len(parts) > 2 else 0.0
+        return cls(dist, mean, spread)
+
+    def sample_ms(self) -> float:
+        if self.dist == 'uniform':
+            return random.uniform(max(0.0, self.mean - self.spread), self.mean + self.spread)
+        if self.dist == 'normal':
+            return max(0.0, random.gauss(self.mean, self.spread))
+        if self.dist == 'lognormal':
+            # mean/spread are the median and (approximate) standard deviation in ms
+            if self.mean <= 0:
+                return 0.0
+            sigma = (self.spread / self.mean) if self.spread else 0.0
+            return random.lognormvariate(math.log(self.mean), sigma)
+        if self.dist == 'exponential':
+            return random.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+        return self.mean
+
+    def to_dict(self):
+        return {'dist': self.dist, 'mean_ms': self.mean, 'spread_ms': self.spread}
+
+
+class StubConfig:
+    SERVICES = ['gemini', 'youtube', 'oauth']
+
+    def __init__(self):
+        self.latency = {name: LatencyProfile() for name in self.SERVICES}
+        self.chunk_latency = LatencyProfile('fixed', 30)  # Gap between streamed Gemini chunks
+        self.error_rate = {name: 0.0 for name in self.SERVICES}
+        self.quota_rate = {name: 0.0 for name in self.SERVICES}
+        self.stats = {name: {'requests': 0, 'errors': 0, 'quota_errors': 0} for name in self.SERVICES}
+        self.lock = threading.Lock()
+
+    def record(self, service: str, key: str):
+        with self.lock:
+            self.stats[service][key] += 1
+
+    def to_dict(self):
+        return {
+            'latency': {name: profile.to_dict() for name, profile in self.latency.items()},
+            'chunk_latency': self.chunk_latency.to_dict(),
+            'error_rate': dict(self.error_rate),
+            'quota_rate': dict(self.quota_rate),
+            'stats': self.stats
+        }
+
+
+# --- Canned content -------------------------------------------------------
+
+SAMPLE_VIDEOS = [
+    ("Kirchhoff's Current Law Explained", "Lecture on KCL with solved circuit examples.", ['circuits', 'kcl', 'lecture']),
+    ("Binary Search Tutorial", "Step-by-step tutorial on binary search with practice problems.", ['algorithms', 'tutorial']),
+    ("Linear Algebra Lecture 1: Vectors", "University course lecture introducing vectors and spaces.", ['linear algebra', 'course']),
+    ("Calculus Derivatives - Full Lesson", "Learn derivatives with worked examples and exercises.", ['calculus', 'lesson']),
+    ("Data Structures Course for Beginners", "Complete course covering arrays, lists, trees and graphs.", ['data structures', 'course']),
+    ("Top 10 Funniest Gaming Fails", "Epic gaming fail compilation reaction video.", ['gaming', 'funny']),
+    ("Network Analysis: Mesh Current Method", "Professor explains mesh analysis with examples.", ['network analysis', 'lecture']),
+    ("Prank Challenge Vlog", "You won't believe this prank challenge!", ['prank', 'vlog']),
+]
+
+
+def _stable_hash(value: str) -> int:
+    return int(hashlib.md5(value.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def _video_id(index: int, query: str) -> str:
+    # Encodes the sample index so videos.list returns details matching the search result
+    return f"stub{index % len(SAMPLE_VIDEOS)}x{_stable_hash(f'{query}:{index}') % 10**6:06d}"
+
+
+def _sample_for(video_id: str):
+    match = re.match(r'^stub(\d+)x', video_id)
+    index = int(match.group(1)) if match else _stable_hash(video_id)
+    return SAMPLE_VIDEOS[index % len(SAMPLE_VIDEOS)]
+
+
+def gemini_text(prompt: str) -> str:
+    """Plausible completion for the prompts AIService sends"""
+    lowered = prompt.lower()
+    if 'multiple choice quiz' in lowered:
+        count = int(re.search(r'(\d+)-question', lowered).group(1)) if re.search(r'(\d+)-question', lowered) else 5
+        return json.dumps([{
+            'id': i + 1,
+            'question': f'Stub question {i + 1}?',
+            'options': ['A', 'B', 'C', 'D'],
+            'correctAnswer': 'A',
+            'explanation': 'Stub explanation.'
+        } for i in range(count)])
+    if 'coding challenge' in lowered:
+        return json.dumps({
+            'type': 'coding', 'title': 'Stub Coding Challenge', 'description': 'Return the sum of a and b.',
+            'starter_code': 'def solve(a, b):\n    pass', 'test_cases': [{'input': '1, 2', 'output': '3'}],
+            'solution': 'def solve(a, b):\n    return a + b', 'points': 100
+        })
+    if 'virtual lab' in lowered:
+        return json.dumps({
+            'type': 'lab', 'title': 'Stub Virtual Lab', 'scenario': 'Measure the current at a node.',
+            'steps': ['Connect', 'Measure', 'Record'], 'question': 'What is the sum of currents?',
+            'options': ['Zero', 'One', 'Infinite', 'Negative'], 'correct_answer': 'Zero',
+            'explanation': 'KCL: currents into a node sum to zero.'
+        })
+    if 'crossword' in lowered:
+        return json.dumps({
+            'type': 'crossword', 'title': 'Stub Crossword',
+            'words': [{'word': w, 'clue': f'Clue for {w}'} for w in ['NODE', 'LOOP', 'CURRENT', 'VOLTAGE', 'OHM']]
+        })
+    if 'misconception' in lowered:
+        return json.dumps({'analysis': 'You mixed up the sign convention.', 'remediation_focus': 'sign conventions'})
+    if 'refine the following search query' in lowered:
+        match = re.search(r'user query: "([^"]*)"', lowered)
+        return f"{match.group(1) if match else 'topic'} lecture tutorial"
+    if 'running summary' in lowered:
+        return 'The student asked about core concepts and the tutor explained them with examples.'
+    return ("Great question! Think of it step by step: first identify what is given, "
+            "then apply the relevant rule, and finally check your answer against an example.")
+
+
+def youtube_search_items(query: str, max_results: int):
+    items = []
+    for i in range(max_results):
+        title, description, _ = SAMPLE_VIDEOS[i % len(SAMPLE_VIDEOS)]
+        vid = _video_id(i, query)
+        items.append({
+            'kind': 'youtube#searchResult',
+            'id': {'kind': 'youtube#video', 'videoId': vid},
+            'snippet': {
+                'publishedAt': '2024-01-01T00:00:00Z',
+                'title': title,
+                'description': description,
+                'thumbnails': {'medium': {'url': f'https://img.youtube.com/vi/{vid}/mqdefault.jpg'}},
+                'channelTitle': 'Stub Channel'
+            }
+        })
+    return items
+
+
+def youtube_video_items(ids):
+    items = []
+    for vid in ids:
+        title, description, tags = _sample_for(vid)
+        items.append({
+            'kind': 'youtube#video',
+            'id': vid,
+            'snippet': {'title': title, 'description': description, 'tags': tags, 'categoryId': '27'},
+            'contentDetails': {'duration': 'PT12M30S'},
+            'statistics': {'viewCount': '12345', 'likeCount': '678'}
+        })
+    return items
+
+
+# --- HTTP handler ---------------------------------------------------------
+
+class StubHandler(BaseHTTPRequestHandler):
+    config: StubConfig = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _service(self, path: str):
+        if path.startswith('/gemini/'):
+            return 'gemini'
+        if path.startswith('/youtube/'):
+            return 'youtube'
+        if path.startswith('/oauth2/'):
+            return 'oauth'
+        return None
+
+    def _send_json(self, status: int, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject_faults(self, service: str) -> bool:
+        """Sleep for the service's latency and maybe answer with an error. True if handled."""
+        config = self.config
+        config.record(service, 'requests')
+        time.sleep(config.latency[service].sample_ms() / 1000.0)
+
+        if random.random() < config.quota_rate[service]:
+            config.record(service, 'quota_errors')
+            if service == 'youtube':
+                # YouTube reports exhausted quota as 403 quotaExceeded
+                self._send_json(403, {'error': {'code': 403, 'message': 'quota exceeded',
+                                                'errors': [{'reason': 'quotaExceeded'}]}})
+            else:
+                self._send_json(429, {'error': {'code': 429, 'message': 'Resource has been exhausted',
+                                                'status': 'RESOURCE_EXHAUSTED'}}, {'Retry-After': '1'})
+            return True
+
+        if random.random() < config.error_rate[service]:
+            config.record(service, 'errors')
+            self._send_json(503, {'error': {'code': 503, 'message': 'Service unavailable', 'status': 'UNAVAILABLE'}})
+            return True
+        return False
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        if parsed.path == '/stub/config':
+            return self._send_json(200, self.config.to_dict())
+
+        service = self._service(parsed.path)
+        if service is None:
+            return self._send_json(404, {'error': 'unknown path'})
+        if self._inject_faults(service):
+            return
+
+        if parsed.path == '/youtube/v3/search':
+            max_results = int(query.get('maxResults', ['10'])[0])
+            return self._send_json(200, {'items': youtube_search_items(query.get('q', [''])[0], max_results)})
+        if parsed.path == '/youtube/v3/videos':
+            ids = [vid for vid in query.get('id', [''])[0].split(',') if vid]
+            return self._send_json(200, {'items': youtube_video_items(ids)})
+        if parsed.path == '/oauth2/v2/userinfo':
+            return self._send_json(200, {
+                'id': '1234567890', 'email': 'student@example.com', 'name': 'Stub Student',
+                'picture': '', 'verified_email': True
+            })
+        if parsed.path == '/oauth2/v1/tokeninfo':
+            return self._send_json(200, {'audience': '', 'user_id': '1234567890', 'expires_in': 3600})
+        return self._send_json(404, {'error': 'unknown path'})
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        if parsed.path == '/stub/config':
+            return self._update_config(body)
+
+        service = self._service(parsed.path)
+        if service != 'gemini':
+            return self._send_json(404, {'error': 'unknown path'})
+        if self._inject_faults(service):
+            return
+
+        prompt = ''.join(part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', []))
+        text = gemini_text(prompt)
+
+        if parsed.path.endswith(':streamGenerateContent'):
+            return self._stream(text)
+        if parsed.path.endswith(':generateContent'):
+            return self._send_json(200, {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]})
+        return self._send_json(404, {'error': 'unknown path'})
+
+    def _stream(self, text: str):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        words = text.split(' ')
+        for i in range(0, len(words), 3):
+            chunk = ' '.join(words[i:i + 3]) + (' ' if i + 3 < len(words) else '')
+            event = {'candidates': [{'content': {'parts': [{'text': chunk}], 'role': 'model'}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(self.config.chunk_latency.sample_ms() / 1000.0)
+        self.close_connection = True
+
+    def _update_config(self, body):
+        """Change fault injection at runtime, e.g. {"error_rate": {"gemini": 0.5}}"""
+        config = self.config
+        for service, spec in body.get('latency', {}).items():
+            config.latency[service] = LatencyProfile.parse(spec)
+        for service, rate in body.get('error_rate', {}).items():
+            config.error_rate[service] = float(rate)
+        for service, rate in body.get('quota_rate', {}).items():
+            config.quota_rate[service] = float(rate)
+        if 'chunk_latency' in body:
+            config.chunk_latency = LatencyProfile.parse(body['chunk_latency'])
+        return self._send_json(200, config.to_dict())
+
+
+def _apply_per_service(target: dict, specs, convert):
+    """Apply 'service=value' (or bare 'value' for every service) settings"""
+    for spec in specs or []:
+        if '=' in spec:
+            service, value = spec.split('=', 1)
+            target[service] = convert(value)
+        else:
+            for service in target:
+                target[service] = convert(spec)
+
+
+def build_server(host: str = '127.0.0.1', port: int = 8090, config: StubConfig = None) -> ThreadingHTTPServer:
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'config': config or StubConfig()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for Gemini, YouTube and Google OAuth')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', action='append',
+                        help="[service=]dist:mean_ms[:spread_ms], e.g. gemini=lognormal:800:400")
+    parser.add_argument('--chunk-latency', default='fixed:30', help='Gap between streamed Gemini chunks')
+    parser.add_argument('--error-rate', action='append', help='[service=]fraction of requests answered with 503')
+    parser.add_argument('--quota-rate', action='append', help='[service=]fraction of requests answered with quota errors')
+    args = parser.parse_args()
+
+    config = StubConfig()
+    _apply_per_service(config.latency, args.latency, LatencyProfile.parse)
+    _apply_per_service(config.error_rate, args.error_rate, float)
+    _apply_per_service(config.quota_rate, args.quota_rate, float)
+    config.chunk_latency = LatencyProfile.parse(args.chunk_latency)
+
+    server = build_server(args.host, args.port, config)
+    print(f"Upstream stand-in listening on http://{args.host}:{args.port}")
+    print(f"Point the backend at it with UPSTREAM_STUB_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Train the content relevance classifier from content_items rows a reviewer has
+labelled (moderation_label). Prints hold-out precision/recall next to the rule
+engine's, then writes the model to CONTENT_CLASSIFIER_PATH. Enable it with
+CONTENT_FILTER_MODE=classifier.
+
+    python train_content_classifier.py [--labels labelled.json]
+
+--labels first imports a JSON list of videos (title, description, tags,
+channel, video_id, label), e.g. tests/data/content_filter_corpus.json.
+"""
+import os
+import json
+import random
+import argparse
+from app import app
+from models import db, ContentItem
+from services.content_filter import ContentFilter
+from services.relevance_classifier import RelevanceClassifier, training_rows, DEFAULT_MODEL_PATH, MODERATION_LABELS
+
+MIN_ROWS = int(os.getenv('CONTENT_CLASSIFIER_MIN_ROWS', '50'))
+HOLDOUT = 0.2
+
+
+def precision_recall(predicted, labels):
+    """Precision/recall of the 'educational' class"""
+    true_positive = sum(1 for p, l in zip(predicted, labels) if p and l)
+    predicted_positive = sum(predicted) or 1
+    actual_positive = sum(labels) or 1
+    return true_positive / predicted_positive, true_positive / actual_positive
+
+
+def import_labels(path):
+    """Store labelled videos as curated content_items rows (updating rows with the same source id)"""
+    with open(path, encoding='utf-8') as f:
+        labelled = [video for video in json.load(f) if video.get('label') in MODERATION_LABELS]
+
+    for video in labelled:
+        item = ContentItem.query.filter_by(source='labelled', source_id=video['video_id']).first()
+        if item is None:
+            item = ContentItem(source='labelled', source_id=video['video_id'], subject_focus='General',
+                               url=f"https://www.youtube.com/watch?v={video['video_id']}")
+            db.session.add(item)
+        item.title = video['title']
+        item.description = video.get('description')
+        item.channel = video.get('channel')
+        item.details = json.dumps({'tags': video.get('tags') or []})
+        item.moderation_label = video['label']
+        item.is_approved = video['label'] == 'educational'
+        item.is_filtered = not item.is_approved
+    db.session.commit()
+    print(f"Imported {len(labelled)} labelled videos from {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the content relevance classifier")
+    parser.add_argument('--labels', help="JSON file of labelled videos to import first")
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.labels:
+            import_labels(args.labels)
+        videos, labels = training_rows()
+
+    print(f"{len(videos)} labelled rows ({sum(labels)} educational)")
+    if len(videos) < MIN_ROWS or len(set(labels)) < 2:
+        raise SystemExit(f"Need at least {MIN_ROWS} rows covering both labels")
+
+    rows = list(zip(videos, labels))
+    random.Random(0).shuffle(rows)
+    split = int(len(rows) * (1 - HOLDOUT))
+    train, test = rows[:split], rows[split:]
+    test_videos = [video for video, _ in test]
+    test_labels = [label for _, label in test]
+
+    classifier = RelevanceClassifier().train([v for v, _ in train], [l for _, l in train])
+    threshold = float(os.getenv('CONTENT_CLASSIFIER_THRESHOLD', '0.5'))
+    model_predicted = [score >= threshold for score in classifier.score(test_videos)]
+
+    content_filter = ContentFilter()
+    rule_predicted = [
+        not content_filter.filter_content(v.get('title', ''), v.get('description') or '', v.get('tags'))[0]
+        for v in test_videos
+    ]
+
+    for name, predicted in (('rules', rule_predicted), ('classifier', model_predicted)):
+        precision, recall = precision_recall(predicted, test_labels)
+        print(f"  {name:<10} precision {precision:.3f}  recall {recall:.3f}")
+
+    # Final model uses every row
+    path = os.getenv('CONTENT_CLASSIFIER_PATH', DEFAULT_MODEL_PATH)
+    RelevanceClassifier().train(videos, labels).save(path)
+    print(f"Saved model to {path}")
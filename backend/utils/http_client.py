@@ -0,0 +1,205 @@
+"""
+FocusLearner Pro - Outbound HTTP Client
+Shared pooled HTTP layer for calls to Gemini, YouTube and Google OAuth
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Upstream statuses that are worth retrying (rate limited / transient server errors)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The caller's deadline ran out: before an attempt, or during one whose timeout it had shortened"""
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """
+    Whether an error from request() (or raise_for_status) says the upstream is
+    unhealthy: connection errors, its own timeouts and 429/5xx responses.
+    Running out of the caller's deadline, 4xx responses and bad payloads don't.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+
+class HTTPClient:
+    """Keep-alive HTTP client with one connection pool per upstream host"""
+
+    def __init__(self, connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 pool_size: Optional[int] = None):
+        self.connect_timeout = connect_timeout if connect_timeout is not None else float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+        self.read_timeout = read_timeout if read_timeout is not None else float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('HTTP_MAX_RETRIES', '2'))
+        self.backoff_base = backoff_base if backoff_base is not None else float(os.getenv('HTTP_BACKOFF_BASE', '0.5'))
+        self.backoff_max = float(os.getenv('HTTP_BACKOFF_MAX', '8'))
+        self.pool_size = pool_size if pool_size is not None else int(os.getenv('HTTP_POOL_SIZE', '10'))
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._metrics: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def default_timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+    def _session_for(self, host: str) -> requests.Session:
+        """Get (or lazily create) the pooled session for a host"""
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # Retries are handled by request() so they can be jittered and counted
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+                self._metrics[host] = {
+                    'requests': 0,
+                    'retries': 0,
+                    'errors': 0,
+                    'in_flight': 0,
+                    'total_latency_ms': 0.0,
+                    'status_codes': {}
+                }
+        return session
+
+    def _record(self, host: str, **changes):
+        with self._lock:
+            stats = self._metrics[host]
+            for key, value in changes.items():
+                if key == 'status_code':
+                    codes = stats['status_codes']
+                    codes[str(value)] = codes.get(str(value), 0) + 1
+                else:
+                    stats[key] += value
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, timeout=None, retries: Optional[int] = None, deadline=None, **kwargs) -> requests.Response:
+        """
+        Send a request through the host's pooled session.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            timeout: (connect, read) tuple or single float; defaults to the client timeouts
+            retries: Override for the number of retries on 429/5xx and connection errors
+            deadline: Optional utils.resilience.Deadline; attempts are clamped to the time
+                left and no retry is started that could not finish in time
+
+        Returns:
+            The final requests.Response (which may still carry an error status)
+
+        Raises:
+            requests.RequestException if every attempt failed at the transport level
+            (DeadlineExceeded if the deadline cut it short)
+        """
+        host = urlparse(url).netloc
+        session = self._session_for(host)
+        timeout = timeout if timeout is not None else self.default_timeout
+        retries = self.max_retries if retries is None else retries
+
+        attempt = 0
+        while True:
+            attempt_timeout = timeout
+            if deadline is not None:
+                remaining = deadline.remaining()
+                if remaining <= 0:
+                    self._record(host, errors=1)
+                    raise DeadlineExceeded(f"Deadline exceeded before request to {host}")
+                if isinstance(timeout, tuple):
+                    attempt_timeout = tuple(min(t, remaining) for t in timeout)
+                else:
+                    attempt_timeout = min(timeout, remaining)
+
+            self._record(host, requests=1, in_flight=1)
+            started = time.monotonic()
+            response = None
+            error = None
+            try:
+                response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            finally:
+                self._record(host, in_flight=-1, total_latency_ms=(time.monotonic() - started) * 1000)
+
+            if response is not None:
+                self._record(host, status_code=response.status_code)
+
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            delay = self._backoff_delay(attempt, response) if retryable else 0
+            out_of_time = deadline is not None and delay >= deadline.remaining()
+            if not retryable or attempt >= retries or out_of_time:
+                if error is not None:
+                    self._record(host, errors=1)
+                    if isinstance(error, requests.Timeout) and attempt_timeout != timeout:
+                        raise DeadlineExceeded(f"Deadline exceeded during request to {host}") from error
+                    raise error
+                if response.status_code >= 400:
+                    self._record(host, errors=1)
+                return response
+
+            self._record(host, retries=1)
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Per-host pool statistics"""
+        with self._lock:
+            metrics = {}
+            for host, stats in self._metrics.items():
+                metrics[host] = {
+                    'requests': stats['requests'],
+                    'retries': stats['retries'],
+                    'errors': stats['errors'],
+                    'in_flight': stats['in_flight'],
+                    'avg_latency_ms': round(stats['total_latency_ms'] / stats['requests'], 1) if stats['requests'] else 0.0,
+                    'status_codes': dict(stats['status_codes']),
+                    'pool_maxsize': self.pool_size
+                }
+            return metrics
+
+
+_http_client: Optional[HTTPClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Process-wide shared HTTP client"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HTTPClient()
+    return _http_client
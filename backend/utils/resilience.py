@@ -0,0 +1,308 @@
+"""
+FocusLearner Pro - Resilience Utilities
+Request deadlines, circuit breakers and hedged calls for slow upstreams
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar('request_deadline', default=None)
+
+
+class Deadline:
+    """Absolute point in time by which a request must be answered"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request being handled in this context, if any"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Run a block under a deadline (never extending an enclosing, tighter one)"""
+    deadline = Deadline(seconds)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def with_deadline(seconds: float):
+    """Decorator giving a route a time budget that downstream calls respect"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with deadline_scope(seconds):
+                return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls flow; failures (and slow calls) are counted
+    open      -> calls are short-circuited until reset_timeout elapses
+    half_open -> a single trial call decides between closed and open
+    """
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None,
+                 slow_call_seconds: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold if failure_threshold is not None else int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv('BREAKER_RESET_SECONDS', '30'))
+        self.slow_call_seconds = slow_call_seconds if slow_call_seconds is not None else float(os.getenv('BREAKER_SLOW_CALL_SECONDS', '20'))
+
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.stats = {'successes': 0, 'failures': 0, 'slow_calls': 0, 'short_circuited': 0, 'trips': 0}
+
+    def allow(self) -> bool:
+        """Whether a call may proceed right now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.stats['short_circuited'] += 1
+            return False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether a call right now would be short-circuited (without claiming the half-open trial)"""
+        with self._lock:
+            if self.state == 'open':
+                return time.monotonic() - self._opened_at < self.reset_timeout
+            return self.state == 'half_open' and self._trial_in_flight
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            if latency >= self.slow_call_seconds:
+                self.stats['slow_calls'] += 1
+                self._fail()
+                return
+            self.stats['successes'] += 1
+            self._failures = 0
+            self._trial_in_flight = False
+            self.state = 'closed'
+
+    def record_failure(self):
+        with self._lock:
+            self._fail()
+
+    def release(self):
+        """A call ended without saying anything about upstream health (e.g. the caller's deadline ran out)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _fail(self):
+        self.stats['failures'] += 1
+        self._failures += 1
+        self._trial_in_flight = False
+        if self.state == 'half_open' or self._failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.stats['trips'] += 1
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Recent call latency at the given percentile (0-100), in seconds"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        p95 = self.latency_percentile(95)
+        with self._lock:
+            stats = dict(self.stats)
+            stats['state'] = self.state
+            stats['consecutive_failures'] = self._failures
+        stats['p95_latency_ms'] = round(p95 * 1000, 1) if p95 is not None else None
+        return stats
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Process-wide circuit breaker for an upstream"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name)
+                _breakers[name] = breaker
+    return breaker
+
+
+def get_breaker_metrics() -> Dict[str, Dict]:
+    return {name: breaker.get_stats() for name, breaker in list(_breakers.items())}
+
+
+HEDGE_MAX_WORKERS = int(os.getenv('HEDGE_MAX_WORKERS', '8'))
+# At most this share of recent calls may start a hedge (over a window of HEDGE_WINDOW calls)
+HEDGE_BUDGET_RATIO = float(os.getenv('HEDGE_BUDGET_RATIO', '0.05'))
+HEDGE_WINDOW = 100
+
+_hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix='hedge')
+
+
+class _HedgeTimer:
+    """One background thread that fires the hedges due across all callers"""
+
+    def __init__(self):
+        self._due = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, delay: float, callback: Callable[[], None]):
+        with self._condition:
+            heapq.heappush(self._due, (time.monotonic() + delay, next(self._sequence), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='hedge-timer', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._due or self._due[0][0] > time.monotonic():
+                    self._condition.wait(self._due[0][0] - time.monotonic() if self._due else None)
+                _, _, callback = heapq.heappop(self._due)
+            callback()
+
+
+class _Hedge:
+    """The second attempt of one hedged_call, started later only if still wanted"""
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+        self.context = contextvars.copy_context()
+        self.future = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.cancelled or not _reserve_hedge():
+                return
+            self.future = _hedge_executor.submit(self.context.run, self._attempt)
+
+    def _attempt(self):
+        try:
+            return self.fn()
+        finally:
+            _release_hedge()
+
+    def cancel(self):
+        """Stop a hedge that hasn't started; returns the running one, if any"""
+        with self.lock:
+            self.cancelled = True
+            return self.future
+
+
+_hedge_timer = _HedgeTimer()
+_hedge_lock = threading.Lock()
+_hedges_running = 0
+_recent_calls = deque(maxlen=HEDGE_WINDOW)  # Whether each recent call was hedged
+_hedge_stats = {'calls': 0, 'hedged': 0, 'skipped_saturated': 0, 'skipped_budget': 0}
+
+
+def _reserve_hedge() -> bool:
+    """Claim a worker for a hedge, unless the pool is busy or the hedge budget is spent"""
+    global _hedges_running
+    with _hedge_lock:
+        if _hedges_running >= HEDGE_MAX_WORKERS:
+            _hedge_stats['skipped_saturated'] += 1
+            return False
+        if sum(_recent_calls) + _hedges_running >= max(1, int(HEDGE_BUDGET_RATIO * HEDGE_WINDOW)):
+            _hedge_stats['skipped_budget'] += 1
+            return False
+        _hedges_running += 1
+        _hedge_stats['hedged'] += 1
+        return True
+
+
+def _release_hedge():
+    global _hedges_running
+    with _hedge_lock:
+        _hedges_running -= 1
+
+
+def get_hedge_metrics() -> Dict[str, Any]:
+    with _hedge_lock:
+        return dict(_hedge_stats, running=_hedges_running)
+
+
+def hedged_call(fn: Callable[[], Any], hedge_after: float) -> Any:
+    """
+    Run fn on the caller's thread, and if it hasn't finished after hedge_after
+    seconds, start a second attempt on the shared hedge pool (unless the pool is
+    saturated or the hedge budget is spent). Returns the first attempt's result,
+    or the hedge's if the first failed or returned None.
+    The caller's context (including its deadline) is carried into the hedge.
+    """
+    hedge = _Hedge(fn)
+    _hedge_timer.schedule(hedge_after, hedge.start)
+    try:
+        result = fn()
+        error = None
+    except Exception as e:
+        result, error = None, e
+    future = hedge.cancel()
+
+    with _hedge_lock:
+        _hedge_stats['calls'] += 1
+        _recent_calls.append(future is not None)
+
+    if result is not None or future is None:
+        if error is not None:
+            raise error
+        return result
+    if error is not None:
+        print(f"Hedged attempt failed: {error}")
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"Hedged attempt failed: {e}")
+        return None
@@ -0,0 +1,195 @@
+"""
+FocusLearner Pro - Response Cache
+Two-tier (in-process LRU + on-disk SQLite) cache for expensive generated responses
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance')
+
+
+class ResponseCache:
+    """
+    Key/value cache with a TTL, bounded size and optional stale reads.
+
+    Values must be JSON-serializable. They are stored serialized in both tiers so
+    callers always get a private copy they are free to mutate.
+    """
+
+    PRUNE_EVERY = 100  # Disk writes between eviction passes
+
+    def __init__(self, namespace: str, path: Optional[str] = None, ttl: Optional[int] = None,
+                 stale_ttl: Optional[int] = None, max_entries: Optional[int] = None,
+                 max_disk_entries: Optional[int] = None):
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else int(os.getenv('AI_CACHE_TTL', '86400'))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else int(os.getenv('AI_CACHE_STALE_TTL', '604800'))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('AI_CACHE_MAX_ENTRIES', '1000'))
+        self.max_disk_entries = max_disk_entries if max_disk_entries is not None else int(os.getenv('AI_CACHE_MAX_DISK_ENTRIES', '50000'))
+
+        if path is None:
+            path = os.getenv('AI_CACHE_PATH', os.path.join(DEFAULT_CACHE_DIR, 'response_cache.db'))
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0, 'evictions': 0}
+
+        # Empty path disables the disk tier
+        self._db = None
+        if path:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable fingerprint of the given parts (prompt, generation config, ...)"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, allow_stale: bool = False) -> Tuple[Optional[Any], bool]:
+        """
+        Look up a key.
+
+        Returns:
+            Tuple[value, is_fresh]: (None, False) on a miss. Entries past their TTL are
+            only returned (with is_fresh=False) when allow_stale is set.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                tier = 'memory_hits'
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM response_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row:
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+                    self._db.execute(
+                        "UPDATE response_cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key)
+                    )
+                    self._db.commit()
+                tier = 'disk_hits'
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None, False
+
+            value, created_at = entry
+            age = now - created_at
+            if age <= self.ttl:
+                self.stats['hits'] += 1
+                self.stats[tier] += 1
+                return json.loads(value), True
+            if allow_stale and age <= self.ttl + self.stale_ttl:
+                self.stats['stale_hits'] += 1
+                return json.loads(value), False
+
+            self.stats['misses'] += 1
+            return None, False
+
+    def set(self, key: str, value: Any):
+        """Store a value in both tiers"""
+        now = time.time()
+        serialized = json.dumps(value)
+        with self._lock:
+            self._remember(key, (serialized, now))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO response_cache (namespace, key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, serialized, now, now)
+                )
+                self._writes += 1
+                if self._writes % self.PRUNE_EVERY == 0:
+                    self._prune_disk(now)
+                self._db.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM response_cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM response_cache WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def _remember(self, key: str, entry: Tuple[str, float]):
+        """Insert into the LRU tier, evicting the least recently used entries"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _prune_disk(self, now: float):
+        """Drop expired rows and trim the table to max_disk_entries (least recently used first)"""
+        self._db.execute(
+            "DELETE FROM response_cache WHERE namespace = ? AND created_at < ?",
+            (self.namespace, now - self.ttl - self.stale_ttl)
+        )
+        count = self._db.execute(
+            "SELECT COUNT(*) FROM response_cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM response_cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM response_cache WHERE namespace = ? ORDER BY accessed_at LIMIT ?)",
+                (self.namespace, self.namespace, overflow)
+            )
+            self.stats['evictions'] += overflow
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(namespace: str, **options) -> ResponseCache:
+    """Process-wide cache for a namespace (options only apply when it is first created)"""
+    cache = _caches.get(namespace)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(namespace)
+            if cache is None:
+                cache = ResponseCache(namespace, **options)
+                _caches[namespace] = cache
+    return cache
+
+
+def get_cache_metrics() -> Dict[str, Dict]:
+    """Stats for every cache created in this process"""
+    return {name: cache.get_stats() for name, cache in list(_caches.items())}
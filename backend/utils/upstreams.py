@@ -0,0 +1,33 @@
+"""
+FocusLearner Pro - Upstream Endpoints
+Base URLs for external APIs, overridable to point at a local stand-in server
+"""
+
+import os
+
+# Set UPSTREAM_STUB_URL (e.g. http://127.0.0.1:8090) to route every external
+# call to stub_server.py instead of Google. Individual *_BASE_URL variables
+# take precedence over the stub switch.
+UPSTREAM_STUB_URL = os.getenv('UPSTREAM_STUB_URL', '').rstrip('/')
+
+_DEFAULTS = {
+    'GEMINI': ('https://generativelanguage.googleapis.com/v1beta', '/gemini/v1beta'),
+    'YOUTUBE': ('https://www.googleapis.com/youtube/v3', '/youtube/v3'),
+    'GOOGLE_OAUTH': ('https://www.googleapis.com/oauth2', '/oauth2'),
+}
+
+
+def upstream_base_url(name: str) -> str:
+    """Base URL for an upstream: 'GEMINI', 'YOUTUBE' or 'GOOGLE_OAUTH'"""
+    real, stub_path = _DEFAULTS[name]
+    override = os.getenv(f'{name}_BASE_URL')
+    if override:
+        return override.rstrip('/')
+    if UPSTREAM_STUB_URL:
+        return f"{UPSTREAM_STUB_URL}{stub_path}"
+    return real
+
+
+def using_stub() -> bool:
+    """True when calls go to the local stand-in, which accepts any API key"""
+    return bool(UPSTREAM_STUB_URL)
@@ -21,7 +21,7 @@ import DeleteSweepIcon from '@mui/icons-material/DeleteSweep';
 import { motion, AnimatePresence } from 'framer-motion';
 import { chatAPI } from '../services/api';
 
-const AIChatWidget = ({ context }) => {
+const AIChatWidget = ({ context, videoId, getTimestamp }) => {
     const [isOpen, setIsOpen] = useState(false);
     const [message, setMessage] = useState('');
     const [history, setHistory] = useState([]);
@@ -62,13 +62,29 @@ const AIChatWidget = ({ context }) => {
         setLoading(true);
 
         try {
-            const response = await chatAPI.send(userMsg, context);
+            // Placeholder tutor message that fills in as tokens stream in
+            setHistory(prev => [...prev, { role: 'model', parts: [''] }]);
+            const appendDelta = (delta) => {
+                setLoading(false);
+                setHistory(prev => {
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, parts: [last.parts[0] + delta] }];
+                });
+            };
+            const video = videoId ? { video_id: videoId, timestamp: getTimestamp?.() } : {};
+            const result = await chatAPI.stream(userMsg, context, appendDelta, video);
             // Replace history with backend version to ensure sync
-            setHistory(response.data.history);
+            if (result?.history) {
+                setHistory(result.history);
+            }
         } catch (error) {
             console.error("Error sending message:", error);
-            // Fallback optimistic error
-            setHistory(prev => [...prev, { role: 'model', parts: ["Error: Could not reach FocusBot."] }]);
+            // Fallback optimistic error (replacing the empty streaming placeholder)
+            setHistory(prev => {
+                const last = prev[prev.length - 1];
+                const base = last?.role === 'model' && !last.parts[0] ? prev.slice(0, -1) : prev;
+                return [...base, { role: 'model', parts: ["Error: Could not reach FocusBot."] }];
+            });
         } finally {
             setLoading(false);
         }
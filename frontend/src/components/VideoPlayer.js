@@ -343,7 +343,11 @@ const VideoPlayer = () => {
       </Grid>
 
       {/* AI Tutor Chat Widget */}
-      <AIChatWidget context={`Subject: ${currentSession?.subject_focus || selectedVideo?.subject_focus}, Video: ${selectedVideo?.title}`} />
+      <AIChatWidget
+        context={`Subject: ${currentSession?.subject_focus || selectedVideo?.subject_focus}, Video: ${selectedVideo?.title}`}
+        videoId={selectedVideo?.video_id}
+        getTimestamp={() => playerRef?.getCurrentTime?.()}
+      />
 
       {/* Deep Focus Monitor */}
       <FocusMonitor
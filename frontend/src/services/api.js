@@ -77,6 +77,10 @@ export const contentAPI = {
 
   getTranscript: (videoId) =>
     api.get(`/content/transcript/${videoId}`),
+
+  // params: { start, end } seconds, or { at, count } around a playback position
+  getTranscriptRange: (videoId, params) =>
+    api.get(`/content/transcript/${videoId}/range`, { params }),
 };
 
 // NO REPLACEMENT CONTENT IN THIS TOOL CALL - SWITCHING TO MULTI_REPLACE
@@ -111,6 +115,9 @@ export const gameAPI = {
       }
     }),
 
+  getLeaderboardStanding: (moduleId, filters = {}) =>
+    api.get(`/game/leaderboard/${moduleId}/me`, { params: filters }),
+
   generateChallenge: (subject, level) =>
     api.post('/game/challenge/generate', { subject, level }),
 
@@ -166,7 +173,49 @@ export const lectureAPI = {
 
 // Chat API
 export const chatAPI = {
-  send: (message, context) => api.post('/chat/send', { message, context }),
+  // video: optional { video_id, timestamp } so the tutor can use the transcript
+  send: (message, context, video = {}) => api.post('/chat/send', { message, context, ...video }),
+  // Streams the reply over Server-Sent Events; onDelta receives each text chunk.
+  // Resolves with the final { response, history } payload.
+  stream: async (message, context, onDelta, video = {}) => {
+    const token = localStorage.getItem('token');
+    const res = await fetch(`${API_BASE_URL}/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify({ message, context, ...video }),
+    });
+    if (!res.ok || !res.body) {
+      throw new Error(`Chat stream failed with status ${res.status}`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let final = null;
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+      for (const raw of events) {
+        const lines = raw.split('\n');
+        const isDone = lines.some((line) => line === 'event: done');
+        const dataLine = lines.find((line) => line.startsWith('data:'));
+        if (!dataLine) continue;
+        const payload = JSON.parse(dataLine.slice(5).trim());
+        if (isDone) {
+          final = payload;
+        } else if (payload.delta) {
+          onDelta(payload.delta);
+        }
+      }
+    }
+    return final;
+  },
   getHistory: () => api.get('/chat/history'),
   clearHistory: () => api.post('/chat/clear'),
 };
@@ -0,0 +1,102 @@
+
+import sys
+import os
+import json
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Shares the throwaway database and fixtures of the submission tests
+from test_activity_submit import app, db, User, LearningIntent, GameChallenge
+from services.activity_pool_service import ActivityPoolService
+
+
+class ScriptedAI:
+    """AI service stand-in returning the given activities in order"""
+
+    is_available = True
+
+    def __init__(self, activities):
+        self.activities = list(activities)
+
+    def generate_result_based_activity(self, subject, topic, activity_type, intent, fresh=False):
+        return dict(self.activities.pop(0))
+
+
+def activity(question):
+    return {'type': 'crossword', 'question': question, 'answer': 'zero'}
+
+
+def make_pool(name, activities):
+    """Pool service (no background refills) plus a fresh intent and its id"""
+    intent = LearningIntent(subject='Pool', topic=name, required_outcomes=json.dumps(['Apply KCL']))
+    db.session.add(intent)
+    db.session.commit()
+    pool = ActivityPoolService(ScriptedAI(activities))
+    pool.low_water = 0
+    pool.target_size = len(activities)
+    return pool, intent
+
+
+def make_users(*names):
+    users = [User(username=name, email=f'{name}@example.com', password_hash='x') for name in names]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+
+def test_concurrent_claims_get_distinct_rows():
+    with app.app_context():
+        db.create_all()
+        pool, intent = make_pool('concurrent', [activity('q1'), activity('q2')])
+        assert pool.replenish(intent, 'crossword') == 2
+        user_ids = make_users('pool-racer-1', 'pool-racer-2')
+        intent_id = intent.id
+
+    start = threading.Barrier(len(user_ids))
+    claimed = {}
+
+    def claim(user_id):
+        with app.app_context():
+            start.wait()
+            result = pool.claim(user_id, db.session.get(LearningIntent, intent_id), 'crossword')
+            claimed[user_id] = result and result['challenge_id']
+            db.session.remove()
+
+    threads = [threading.Thread(target=claim, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(claimed.values()) and len(set(claimed.values())) == 2
+    with app.app_context():
+        owners = {row.id: row.user_id for row in GameChallenge.query.filter(GameChallenge.id.in_(claimed.values()))}
+        assert owners == {challenge_id: user_id for user_id, challenge_id in claimed.items()}
+        assert pool.available_count(intent_id, 'crossword') == 0
+
+
+def test_duplicate_content_is_pooled_once_and_never_repeated():
+    with app.app_context():
+        db.create_all()
+        pool, intent = make_pool('dedupe', [activity('same'), activity('same'), activity('other')])
+        assert pool.replenish(intent, 'crossword') == 2
+        first, second = make_users('pool-learner', 'pool-classmate')
+
+        served = [pool.claim(first, intent, 'crossword'), pool.claim(first, intent, 'crossword')]
+        assert [item['question'] for item in served] == ['same', 'other']
+        assert 'answer' not in served[0]
+        assert pool.claim(first, intent, 'crossword') is None
+
+        # Once claimed, the same content may be pooled again, but only for someone who hasn't had it
+        pool.ai_service = ScriptedAI([activity('same')])
+        pool.target_size = 1
+        assert pool.replenish(intent, 'crossword') == 1
+        assert pool.claim(first, intent, 'crossword') is None
+        assert pool.claim(second, intent, 'crossword')['question'] == 'same'
+
+
+if __name__ == "__main__":
+    test_concurrent_claims_get_distinct_rows()
+    test_duplicate_content_is_pooled_once_and_never_repeated()
+    print("Activity pool checks passed.")
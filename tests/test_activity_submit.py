@@ -0,0 +1,134 @@
+
+import sys
+import os
+import json
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+# Throwaway database, no background analysis worker
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'submit.db')
+os.environ['MISCONCEPTION_WORKER_INPROCESS'] = 'false'
+
+from sqlalchemy import event
+from app import app
+from models import (db, User, LearningIntent, GameChallenge, LearningLoopState, LearningStage,
+                    MisconceptionJob, UserTopicMastery, GameProgress, ActivityResult)
+from utils.auth import generate_token
+
+# Round trips allowed for one submission: challenge, mastery, progress and loop
+# state are each read once, then one flush writes everything and one commit ends it
+MAX_SELECTS = 4
+MAX_COMMITS = 1
+
+
+class QueryCounter:
+    """Counts SQL statements and commits on the app's engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.commits = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        event.listen(self.engine, 'commit', self._on_commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        event.remove(self.engine, 'commit', self._on_commit)
+
+    def selects(self, table=None):
+        return [s for s in self.statements if s.lstrip().upper().startswith('SELECT') and (table is None or table in s)]
+
+
+def setup_data(username, stage, subject='ECE'):
+    """User, intent, a crossword challenge and a loop state at `stage`; returns (user_id, challenge_id)"""
+    user = User(username=username, email=f'{username}@example.com', password_hash='x')
+    intent = LearningIntent(subject=subject, topic='KCL', required_outcomes=json.dumps(['Apply KCL']))
+    db.session.add_all([user, intent])
+    db.session.flush()
+    challenge = GameChallenge(
+        id=f'challenge-{username}', user_id=user.id, subject=subject, topic='KCL', activity_type='crossword',
+        learning_intent_id=intent.id, data=json.dumps({'question': 'Sum of currents at a node?'}),
+        solution=json.dumps({'answer': 'zero', 'explanation': 'Charge is conserved.'})
+    )
+    db.session.add(challenge)
+    if stage is not None:
+        db.session.add(LearningLoopState(user_id=user.id, learning_intent_id=intent.id, current_stage=stage, attempts=0))
+    db.session.commit()
+    return user.id, challenge.id
+
+
+def submit(client, user_id, challenge_id, answer):
+    with QueryCounter(db.engine) as counter:
+        response = client.post(
+            '/api/game/activity/submit',
+            json={'challenge_id': challenge_id, 'answer': answer},
+            headers={'Authorization': f'Bearer {generate_token(user_id)}'}
+        )
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['result'], counter
+
+
+def test_failed_submission_single_transaction():
+    """Wrong answer in APPLY: result, mastery, progress, REMEDIATE state and analysis job in one commit"""
+    with app.app_context():
+        db.create_all()
+        user_id, challenge_id = setup_data('submit-fail', LearningStage.APPLY)
+        client = app.test_client()
+
+        result, counter = submit(client, user_id, challenge_id, 'one')
+        print(f"failed submission: {len(counter.statements)} statements, "
+              f"{len(counter.selects())} selects, {counter.commits} commit(s)")
+
+        assert not result['is_correct']
+        assert result['loop_status']['stage'] == 'REMEDIATE'
+        assert result['loop_status']['analysis_pending']
+        assert counter.commits <= MAX_COMMITS
+        assert len(counter.selects()) <= MAX_SELECTS
+        assert len(counter.selects('game_challenges')) == 1
+
+        db.session.expire_all()
+        state = LearningLoopState.query.filter_by(user_id=user_id).one()
+        assert state.current_stage == LearningStage.REMEDIATE
+        assert MisconceptionJob.query.filter_by(loop_state_id=state.id).count() == 1
+        assert ActivityResult.query.filter_by(user_id=user_id).count() == 1
+
+
+def test_first_submission_creates_rows():
+    """First attempt on a topic: mastery, progress and loop state rows are created with counters set"""
+    with app.app_context():
+        db.create_all()
+        user_id, challenge_id = setup_data('submit-first', None)
+        client = app.test_client()
+
+        result, counter = submit(client, user_id, challenge_id, 'Zero')
+        assert result['is_correct']
+        assert result['loop_status']['stage'] == 'APPLY'
+        assert counter.commits <= MAX_COMMITS
+        assert len(counter.selects()) <= MAX_SELECTS
+
+        db.session.expire_all()
+        mastery = UserTopicMastery.query.filter_by(user_id=user_id).one()
+        assert mastery.total_attempts == 1 and mastery.proficiency_score > 0
+        assert GameProgress.query.filter_by(user_id=user_id).one().mastery_points == result['xp_earned']
+
+        # Second attempt reuses the rows
+        submit(client, user_id, challenge_id, 'zero')
+        db.session.expire_all()
+        assert UserTopicMastery.query.filter_by(user_id=user_id).one().total_attempts == 2
+
+
+if __name__ == "__main__":
+    test_failed_submission_single_transaction()
+    test_first_submission_creates_rows()
+    print("Activity submission checks passed.")
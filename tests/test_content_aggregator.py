@@ -0,0 +1,102 @@
+
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from services.content_aggregator import ContentAggregator, SourceAdapter, FallbackResults
+from utils.resilience import deadline_scope
+
+
+def item(source, video_id):
+    return {'source': source, 'video_id': video_id, 'title': f'{source} {video_id}'}
+
+
+class StubAdapter(SourceAdapter):
+    """Source returning fixed results after a delay, or raising"""
+
+    def __init__(self, name, results=(), delay=0.0, error=None, timeout=1.0, weight=1.0):
+        self.name = name
+        super().__init__(timeout=timeout, weight=weight)
+        self.results = list(results)
+        self.delay = delay
+        self.error = error
+
+    def search(self, query, subject_focus, limit):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.results[:limit]
+
+
+def ids(results):
+    return [(video['source'], video['video_id']) for video in results]
+
+
+def test_slow_source_is_dropped_and_the_rest_returned():
+    aggregator = ContentAggregator([
+        StubAdapter('youtube', [item('youtube', 'y1'), item('youtube', 'y2')]),
+        StubAdapter('nptel', [item('nptel', 'n1')], delay=0.05),
+        StubAdapter('udemy', [item('udemy', 'u1')], delay=1.0, timeout=0.1),
+    ])
+    started = time.monotonic()
+    response = aggregator.search('kcl', 'ECE', ['youtube', 'nptel', 'udemy'])
+    assert time.monotonic() - started < 0.5
+
+    sources = response['sources']
+    assert sources['youtube']['status'] == 'ok' and sources['youtube']['count'] == 2
+    assert sources['nptel']['status'] == 'ok' and sources['nptel']['latency_ms'] >= 50
+    assert sources['udemy'] == {'status': 'timeout', 'count': 0}
+    assert response['partial']
+    assert sorted(ids(response['results'])) == [('nptel', 'n1'), ('youtube', 'y1'), ('youtube', 'y2')]
+    assert aggregator.get_stats()['udemy']['timeouts'] == 1
+
+
+def test_request_deadline_caps_every_source():
+    aggregator = ContentAggregator([StubAdapter('nptel', [item('nptel', 'n1')], delay=1.0, timeout=5.0)])
+    started = time.monotonic()
+    with deadline_scope(0.1):
+        response = aggregator.search('kcl', 'ECE', ['nptel'])
+    assert time.monotonic() - started < 0.5
+    assert response['sources']['nptel']['status'] == 'timeout' and response['results'] == []
+
+
+def test_fusion_dedupes_on_source_and_id():
+    aggregator = ContentAggregator([
+        StubAdapter('youtube', [item('youtube', 'a'), item('youtube', 'shared'), item('nptel', 'x')]),
+        StubAdapter('nptel', [item('nptel', 'x'), item('nptel', 'b'), item('youtube', 'c')]),
+    ])
+    response = aggregator.search('kcl', 'ECE', ['youtube', 'nptel'])
+    results = ids(response['results'])
+    assert len(results) == len(set(results)) == 5
+    # Listed by both sources, so it outranks every single-source result
+    assert results[0] == ('nptel', 'x')
+    assert not response['partial']
+
+
+def test_errors_and_fallback_suggestions():
+    fallback = [item('mock', 'canned')]
+    aggregator = ContentAggregator([
+        StubAdapter('youtube', error=FallbackResults(fallback)),
+        StubAdapter('nptel', error=RuntimeError('catalog down')),
+        StubAdapter('udemy', [item('udemy', 'u1')]),
+    ])
+    response = aggregator.search('kcl', 'ECE', ['youtube', 'nptel', 'udemy'])
+    assert response['sources']['youtube']['status'] == 'fallback'
+    assert response['sources']['nptel']['status'] == 'error'
+    # Suggestions are never mixed into real results...
+    assert ids(response['results']) == [('udemy', 'u1')]
+
+    # ...and only stand in when no source produced any
+    response = aggregator.search('kcl', 'ECE', ['youtube', 'nptel'])
+    assert ids(response['results']) == [('mock', 'canned')] and response['partial']
+
+
+if __name__ == "__main__":
+    test_slow_source_is_dropped_and_the_rest_returned()
+    test_request_deadline_caps_every_source()
+    test_fusion_dedupes_on_source_and_id()
+    test_errors_and_fallback_suggestions()
+    print("Content aggregator checks passed.")
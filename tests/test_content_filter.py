@@ -0,0 +1,185 @@
+
+import sys
+import os
+import re
+import time
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from services.content_filter import ContentFilter, KeywordMatcher, DecisionCache
+from utils.response_cache import ResponseCache
+from services.relevance_classifier import RelevanceClassifier
+
+
+def reference_filter(content_filter, title, description="", tags=None):
+    """The original substring-scanning rules, kept here to check the compiled matcher against"""
+    tags = tags or []
+    text = f"{title} {description} {' '.join(tags)}".lower()
+    distraction = sum(1 for keyword in content_filter.DISTRACTION_KEYWORDS if keyword in text)
+    educational = sum(1 for keyword in content_filter.EDUCATIONAL_KEYWORDS if keyword in text)
+
+    if distraction > 2:
+        return True, f"Contains {distraction} distraction keyword(s)"
+    if distraction > 0 and educational == 0:
+        return True, "Contains distraction content without educational value"
+    if any(re.search(pattern, title.lower()) for pattern in content_filter.DISTRACTION_PATTERNS):
+        return True, "Title matches distraction pattern"
+    if educational >= 3:
+        return False, "Educational content approved"
+    return False, "Content approved"
+
+
+CORPUS = [
+    ("Kirchhoff's Current Law Explained", "Lecture on KCL with solved circuit examples.", ['circuits', 'kcl', 'lecture']),
+    ("Thevenin Theorem Tutorial", "Step by step solution of practice problems", []),
+    ("MIT 6.006 Introduction to Algorithms, Lecture 1", "Professor explains the course concept", ['mit', 'algorithms']),
+    ("Calculus 1 - Full College Course", "Learn calculus in this university course", []),
+    ("Funny Cat Compilation", "Try not to laugh", []),
+    ("Minecraft Gaming Stream", "Let's play with friends", ['gaming', 'minecraft']),
+    ("Top 10 Football Goals", "Best goals of the season", ['football', 'sports']),
+    ("I Tried The Viral Recipe", "Cooking vlog from my kitchen", ['food', 'cooking', 'vlog']),
+    ("Organic Chemistry Lecture 5", "Reaction mechanisms explained with example problems", []),
+    ("10 Million Subscribers Special", "Thank you all", []),
+    ("You Won't Believe This Circuit", "A lecture on op-amps", ['education']),
+    ("Epic Fail Compilation - Best Of All Time", "", []),
+    ("Prank On My Roommate", "Lecture hall prank", []),
+    ("Reacting To Physics Exams", "Teacher reacts", []),
+    ("Linear Algebra Lesson: Eigenvalues", "Theory and example exercises", ['linear algebra', 'math']),
+    ("Data Structures Course for Beginners", "Study arrays, lists and trees", ['programming', 'tutorial']),
+    ("Travel Vlog: Tokyo", "Vacation in Japan, food and shopping", ['travel', 'lifestyle']),
+    ("Makeup Haul 2024", "Beauty and fashion", ['beauty', 'makeup', 'haul']),
+    ("Movie Trailer Breakdown", "Film review", ['movie', 'film', 'review']),
+    ("Python Tutorial: Decorators", "Practice exercise with solution", ['python', 'tutorial']),
+    ("Quantum Mechanics Lecture 3 - Stanford University", "Professor Susskind", []),
+    ("ASMR Study With Me", "Oddly satisfying study session", ['asmr']),
+    ("Electronics Homework Help", "Assignment solution walk-through", ['homework']),
+    ("Basketball Highlights", "", ['sports', 'basketball']),
+    ("Celebrity Gossip Roundup", "Entertainment news", []),
+    ("Signals and Systems - Academic Lecture Series", "Instructor notes included", []),
+    ("How Transistors Work", "", []),
+    ("Dance Challenge", "", ['dance']),
+    ("Network Analysis Lesson 4", "Mesh and nodal concept review", []),
+    ("Unboxing the New Phone", "Tech unboxing", ['unboxing']),
+    ("Physics Problem Solving Practice", "Learn by doing exercises", []),
+    ("Song Cover", "Acoustic song", ['music video', 'song']),
+    # Inflected and derived forms count like the keyword they start with
+    ("Educational review of circuits", "", []),
+    ("Senior lecturer on football tactics", "", []),
+    ("Educational cooking basics", "", []),
+    ("Conceptual physics: sports edition", "", []),
+    ("Pro gamers react", "", []),
+]
+
+
+def test_matches_reference_rules():
+    """Compiled matcher gives the same verdicts as the original rules on the corpus"""
+    content_filter = ContentFilter()
+    for title, description, tags in CORPUS:
+        expected = reference_filter(content_filter, title, description, tags)
+        actual = content_filter.filter_content(title, description, tags)
+        assert actual == expected, f"{title!r}: {actual} != {expected}"
+
+
+def test_whole_word_matching():
+    """Short keywords no longer fire inside other words; inflections still count"""
+    content_filter = ContentFilter()
+    counts = content_filter._keywords.count("mvc architecture and the mvp of seafood ordering")
+    assert counts == {'distraction': 0, 'educational': 0}
+
+    counts = content_filter._keywords.count("lectures for learning: worked examples and practiced problems")
+    assert counts['educational'] == 5  # lecture, learn, example, practice, problem
+    assert content_filter._keywords.count("oddly satisfying")['distraction'] == 2
+
+    # The substring rules rejected this ("mv" in "MVC", "game" in "endgame")
+    assert content_filter.filter_content("MVC Pattern in the Endgame of Software Design") == (False, "Content approved")
+
+
+def test_keyword_matcher_counts_each_keyword_once():
+    matcher = KeywordMatcher({'a': ['alpha', 'beta'], 'b': ['gamma']})
+    assert matcher.count("Alpha alpha ALPHAS beta gamma") == {'a': 2, 'b': 1}
+
+
+def test_decision_cache():
+    """Verdicts are reused per video content and keyed by the rule-set version"""
+    content_filter = ContentFilter()
+    video = {'video_id': 'cache-test', 'title': 'Funny Cat Compilation', 'tags': []}
+    content_filter.filter_video_list([dict(video)])
+    hits = content_filter.decision_cache.get_stats()['hits']
+
+    content_filter.filter_video_list([dict(video)])
+    assert content_filter.decision_cache.get_stats()['hits'] == hits + 1
+
+    # Edited metadata is a different key
+    edited = dict(video, title='Circuit Analysis Lecture')
+    assert content_filter.filter_video_list([edited]) == [edited]
+
+    class StricterFilter(ContentFilter):
+        DISTRACTION_KEYWORDS = ContentFilter.DISTRACTION_KEYWORDS + ['circuit']
+    assert StricterFilter().rules_version != content_filter.rules_version
+
+    class LowerBarFilter(ContentFilter):
+        MIN_EDUCATIONAL_KEYWORDS = 2
+    assert LowerBarFilter().rules_version != content_filter.rules_version
+
+
+def test_decision_cache_persistent_tier():
+    """With FILTER_CACHE_PERSIST, a new process finds verdicts on disk"""
+    path = os.path.join(tempfile.mkdtemp(), 'decisions.db')
+    key = ('v1', 'video', 'Funny Cat Compilation', '', (), None)
+    DecisionCache(10, ResponseCache('filter_decisions', path=path, ttl=60, stale_ttl=0)).set(key, (True, 'reason'))
+
+    restarted = DecisionCache(10, ResponseCache('filter_decisions', path=path, ttl=60, stale_ttl=0))
+    assert restarted.get(key) == (True, 'reason')
+    assert restarted.get(key) == (True, 'reason')  # now from memory
+    assert restarted.get_stats()['hits'] == 2 and restarted.persistent.get_stats()['hits'] == 1
+    assert DecisionCache(1).get(key) is None
+
+
+def corpus_videos():
+    """CORPUS as video dicts labelled by the original rules (1 = educational)"""
+    content_filter = ContentFilter()
+    videos = [{'title': t, 'description': d, 'tags': tags} for t, d, tags in CORPUS]
+    labels = [0 if reference_filter(content_filter, v['title'], v['description'], v['tags'])[0] else 1 for v in videos]
+    return videos, labels
+
+
+def test_classifier_batch_scoring():
+    """One predict_proba call scores a whole candidate list in milliseconds"""
+    videos, labels = corpus_videos()
+    classifier = RelevanceClassifier().train(videos * 5, labels * 5)
+
+    candidates = [dict(video, title=f"{video['title']} part {i}") for i in range(32) for video in videos][:1000]
+    started = time.perf_counter()
+    scores = classifier.score(candidates)
+    elapsed = time.perf_counter() - started
+    print(f"Scored {len(candidates)} candidates in {elapsed * 1000:.1f} ms")
+
+    assert len(scores) == len(candidates)
+    assert classifier.score([{'title': 'Calculus lecture with worked examples'}])[0] > \
+        classifier.score([{'title': 'Funny prank compilation vlog'}])[0]
+
+
+def test_classifier_mode_filters_rule_survivors():
+    videos, labels = corpus_videos()
+    content_filter = ContentFilter()
+    content_filter.mode = 'classifier'
+    content_filter.classifier_threshold = 0.99
+    content_filter.classifier = RelevanceClassifier().train(videos, labels)
+    rejected, candidate = {'title': 'Funny Cat Compilation'}, {'title': 'How Transistors Work'}
+    kept = content_filter.filter_video_list([rejected, candidate])
+    assert kept == []  # nothing clears a 0.99 threshold
+    assert 'relevance_score' not in rejected  # the rules rejected it before scoring
+    assert candidate['is_filtered'] and 'relevance_score' in candidate
+
+
+if __name__ == "__main__":
+    test_matches_reference_rules()
+    test_whole_word_matching()
+    test_keyword_matcher_counts_each_keyword_once()
+    test_decision_cache()
+    test_decision_cache_persistent_tier()
+    test_classifier_batch_scoring()
+    test_classifier_mode_filters_rule_survivors()
+    print("Content filter checks passed.")
@@ -0,0 +1,236 @@
+
+import sys
+import os
+import json
+import time
+import argparse
+import tracemalloc
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from services.content_filter import ContentFilter
+from services.relevance_classifier import RelevanceClassifier
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CORPUS_PATH = os.path.join(DATA_DIR, 'content_filter_corpus.json')
+BASELINE_PATH = os.path.join(DATA_DIR, 'content_filter_baseline.json')
+
+# Fail when a mode's throughput drops more than this fraction below its baseline
+# (standalone runs only: absolute numbers depend on the machine)
+MAX_REGRESSION = float(os.getenv('FILTER_BENCH_MAX_REGRESSION', '0.5'))
+# Cached verdicts must be at least this much faster than re-running the rules in the same run
+# (standalone runs only, like the throughput check)
+MIN_CACHE_SPEEDUP = float(os.getenv('FILTER_BENCH_MIN_CACHE_SPEEDUP', '1.2'))
+# The compiled keyword matcher must be at least this much faster than one substring scan per keyword
+MIN_MATCHER_SPEEDUP = float(os.getenv('FILTER_BENCH_MIN_MATCHER_SPEEDUP', '1.2'))
+# Allowed drop in precision/recall from the baseline
+ACCURACY_TOLERANCE = float(os.getenv('FILTER_BENCH_ACCURACY_TOLERANCE', '0.02'))
+# Times the corpus is repeated for the throughput run
+REPEAT = int(os.getenv('FILTER_BENCH_REPEAT', '10'))
+# Videos per filter_video_list call (one page of search results)
+PAGE_SIZE = 20
+
+MODES = ['rules', 'cached', 'classifier']
+
+
+def load_corpus():
+    """Labelled videos: 'label' is 'educational' or 'distracting'"""
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def make_filter(mode, corpus):
+    """
+    ContentFilter configured for a mode. The classifier is trained on the even
+    corpus rows; accuracy is always reported on the odd rows.
+    """
+    content_filter = ContentFilter()
+    if mode != 'cached':
+        content_filter.decision_cache = None
+    if mode == 'classifier':
+        train = corpus[::2]
+        content_filter.mode = 'classifier'
+        content_filter.classifier = RelevanceClassifier().train(
+            train, [1 if video['label'] == 'educational' else 0 for video in train]
+        )
+    return content_filter
+
+
+def fresh(videos):
+    """Copies, since filter_video_list annotates the dicts it is given"""
+    return [dict(video) for video in videos]
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run_mode(mode, corpus):
+    content_filter = make_filter(mode, corpus)
+    pages = [corpus[i:i + PAGE_SIZE] for i in range(0, len(corpus), PAGE_SIZE)]
+
+    # Warm-up (for 'cached' this is what fills the cache)
+    for page in pages:
+        content_filter.filter_video_list(fresh(page))
+
+    # Throughput: whole pages, as search_videos calls it
+    work = [fresh(page) for _ in range(REPEAT) for page in pages]
+    started = time.perf_counter()
+    for page in work:
+        content_filter.filter_video_list(page)
+    elapsed = time.perf_counter() - started
+    videos_per_sec = len(corpus) * REPEAT / elapsed
+
+    # Per-call latency: one video at a time
+    latencies = []
+    for video in fresh(corpus):
+        started = time.perf_counter()
+        content_filter.filter_video_list([video])
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+
+    # Peak memory allocated while filtering the corpus once
+    tracemalloc.start()
+    for page in pages:
+        content_filter.filter_video_list(fresh(page))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Precision/recall of the 'educational' verdict on the held-out rows
+    held_out = fresh(corpus[1::2])
+    kept = {video['video_id'] for video in content_filter.filter_video_list(held_out)}
+    true_positive = sum(1 for video in held_out if video['video_id'] in kept and video['label'] == 'educational')
+    relevant = sum(1 for video in held_out if video['label'] == 'educational')
+
+    return {
+        'videos_per_sec': round(videos_per_sec),
+        'p50_us': round(percentile(latencies, 50), 1),
+        'p95_us': round(percentile(latencies, 95), 1),
+        'p99_us': round(percentile(latencies, 99), 1),
+        'peak_kb': round(peak / 1024, 1),
+        'precision': round(true_positive / (len(kept) or 1), 3),
+        'recall': round(true_positive / (relevant or 1), 3),
+    }
+
+
+def compare_matcher(corpus):
+    """
+    Seconds spent counting keywords over the corpus texts: (substring scan per
+    keyword, as the rules did before the compiled matcher, compiled matcher)
+    """
+    content_filter = ContentFilter()
+    texts = [f"{video['title']} {video.get('description') or ''} {' '.join(video.get('tags') or [])}".lower()
+             for video in corpus] * REPEAT
+
+    started = time.perf_counter()
+    for text in texts:
+        sum(1 for keyword in content_filter.DISTRACTION_KEYWORDS if keyword in text)
+        sum(1 for keyword in content_filter.EDUCATIONAL_KEYWORDS if keyword in text)
+    substring_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for text in texts:
+        content_filter._keywords.count(text)
+    return substring_seconds, time.perf_counter() - started
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_regressions(results, baseline, throughput=True):
+    """Modes whose accuracy (and, with throughput, speed) fell too far below the baseline"""
+    failures = []
+    for mode, result in results.items():
+        expected = baseline.get(mode, {})
+        if throughput and expected.get('videos_per_sec') and \
+                result['videos_per_sec'] < expected['videos_per_sec'] * (1 - MAX_REGRESSION):
+            failures.append(f"{mode}: {result['videos_per_sec']} videos/s < {expected['videos_per_sec']} baseline -{MAX_REGRESSION:.0%}")
+        for metric in ('precision', 'recall'):
+            if metric in expected and result[metric] < expected[metric] - ACCURACY_TOLERANCE:
+                failures.append(f"{mode}: {metric} {result[metric]} < {expected[metric]} baseline")
+    return failures
+
+
+def check_cache_speedup(results):
+    """Whether cached verdicts beat re-running the rules, when both modes were run"""
+    if 'rules' not in results or 'cached' not in results:
+        return []
+    speedup = results['cached']['videos_per_sec'] / results['rules']['videos_per_sec']
+    if speedup < MIN_CACHE_SPEEDUP:
+        return [f"cached is only {speedup:.2f}x the uncached rules"]
+    return []
+
+
+def print_report(results, corpus):
+    educational = sum(1 for video in corpus if video['label'] == 'educational')
+    print(f"Corpus: {len(corpus)} videos ({educational} educational), x{REPEAT} for throughput")
+    print(f"{'mode':<11}{'videos/s':>10}{'p50 us':>9}{'p95 us':>9}{'p99 us':>9}{'peak KB':>9}{'prec':>7}{'recall':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<11}{r['videos_per_sec']:>10}{r['p50_us']:>9}{r['p95_us']:>9}{r['p99_us']:>9}"
+              f"{r['peak_kb']:>9}{r['precision']:>7}{r['recall']:>8}")
+
+
+def test_rules_accuracy():
+    """
+    Rule engine keeps its baseline precision/recall on the bundled corpus, with
+    and without the decision cache. Timings are reported but only checked by
+    the standalone run, since they depend on the machine and its load.
+    """
+    corpus = load_corpus()
+    results = {mode: run_mode(mode, corpus) for mode in ('rules', 'cached')}
+    print_report(results, corpus)
+    failures = check_regressions(results, load_baseline(), throughput=False)
+    assert not failures, '; '.join(failures)
+
+
+def test_second_pass_served_from_cache():
+    corpus = load_corpus()
+    content_filter = make_filter('cached', corpus)
+    content_filter.filter_video_list(fresh(corpus))
+    before = content_filter.decision_cache.get_stats()
+
+    cached = fresh(corpus)
+    content_filter.filter_video_list(cached)
+    after = content_filter.decision_cache.get_stats()
+    assert after['hits'] - before['hits'] == len(corpus)
+    assert after['misses'] == before['misses']
+
+    # Same verdicts as running the rules
+    uncached = fresh(corpus)
+    make_filter('rules', corpus).filter_video_list(uncached)
+    verdicts = lambda videos: [(video['is_filtered'], video['filter_reason']) for video in videos]
+    assert verdicts(cached) == verdicts(uncached)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ContentFilter throughput and accuracy benchmark")
+    parser.add_argument('--modes', default=','.join(MODES), help=f"comma-separated subset of {MODES}")
+    parser.add_argument('--update-baseline', action='store_true', help="record these results as the new baseline")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    results = {mode: run_mode(mode, corpus) for mode in args.modes.split(',')}
+    print_report(results, corpus)
+    substring_seconds, matcher_seconds = compare_matcher(corpus)
+    matcher_speedup = substring_seconds / matcher_seconds
+    print(f"Keyword counting: substring {substring_seconds * 1000:.1f} ms, compiled {matcher_seconds * 1000:.1f} ms "
+          f"({matcher_speedup:.2f}x)")
+
+    if args.update_baseline:
+        baseline = dict(load_baseline(), **results)
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {BASELINE_PATH}")
+    else:
+        failures = check_regressions(results, load_baseline()) + check_cache_speedup(results)
+        if matcher_speedup < MIN_MATCHER_SPEEDUP:
+            failures.append(f"compiled matcher is only {matcher_speedup:.2f}x the substring scan")
+        if failures:
+            print("Regression: " + '; '.join(failures))
+            sys.exit(1)
+        print("Benchmark within baseline.")
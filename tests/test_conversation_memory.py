@@ -0,0 +1,116 @@
+
+import sys
+import os
+import time
+import threading
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from services.conversation_memory import ConversationMemory, estimate_tokens
+
+USER = 1
+
+
+class StubSummarizer:
+    """AI service stand-in; summaries can be held back or made to fail"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+        self.batches = []
+
+    def summarize_conversation(self, previous_summary, batch):
+        self.release.wait(5)
+        self.batches.append(batch)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return f"summary of {len(batch)} messages"
+
+
+def wait_until(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline, "background summary never finished"
+        time.sleep(0.001)
+
+
+def idle(memory):
+    state = memory._state(USER)
+    return not state['summarizing']
+
+
+def text(tokens):
+    return 'x' * (tokens * 4)
+
+
+def test_overflow_is_folded_into_the_summary():
+    memory = ConversationMemory(StubSummarizer(), token_budget=1000, max_recent_messages=4)
+    for i in range(3):
+        memory.add_turn(USER, f"question {i}", f"answer {i}")
+    wait_until(lambda: idle(memory))
+
+    summary, messages = memory.get_context(USER)
+    assert summary == "summary of 2 messages"
+    assert [m['parts'][0] for m in messages] == ['question 1', 'answer 1', 'question 2', 'answer 2']
+
+
+def test_token_budget_moves_old_turns_out():
+    memory = ConversationMemory(StubSummarizer(), token_budget=30, max_recent_messages=10)
+    memory.add_turn(USER, text(10), text(10))
+    memory.add_turn(USER, text(10), text(10))
+    wait_until(lambda: idle(memory))
+
+    summary, messages = memory.get_context(USER)
+    assert summary and len(messages) == 2
+    assert sum(estimate_tokens(m['parts'][0]) for m in messages) + estimate_tokens(summary) <= 30
+
+
+def test_messages_stay_verbatim_until_summarized():
+    summarizer = StubSummarizer()
+    summarizer.release.clear()
+    memory = ConversationMemory(summarizer, token_budget=1000, max_recent_messages=2)
+    memory.add_turn(USER, 'first', 'reply')
+    memory.add_turn(USER, 'second', 'reply')
+
+    assert [m['parts'][0] for m in memory.get_context(USER)[1]] == ['first', 'reply', 'second', 'reply']
+    summarizer.release.set()
+    wait_until(lambda: idle(memory))
+    assert [m['parts'][0] for m in memory.get_context(USER)[1]] == ['second', 'reply']
+
+
+def test_failed_summary_trims_to_budget():
+    memory = ConversationMemory(StubSummarizer(fail=True), token_budget=25, max_recent_messages=2)
+    memory.add_turn(USER, text(10), text(1))
+    memory.add_turn(USER, text(10), text(10))
+    wait_until(lambda: idle(memory))
+
+    summary, messages = memory.get_context(USER)
+    assert summary == ''
+    assert sum(estimate_tokens(m['parts'][0]) for m in messages) <= 25
+    # The orphaned model reply is dropped along with its question
+    assert messages[0]['role'] == 'user' and len(messages) == 2
+
+
+def test_clear_discards_summary_in_flight():
+    summarizer = StubSummarizer()
+    summarizer.release.clear()
+    memory = ConversationMemory(summarizer, token_budget=1000, max_recent_messages=2)
+    memory.add_turn(USER, 'first', 'reply')
+    memory.add_turn(USER, 'second', 'reply')
+
+    memory.clear(USER)
+    summarizer.release.set()
+    wait_until(lambda: summarizer.batches)
+    wait_until(lambda: idle(memory))
+    assert memory.get_context(USER) == ('', [])
+
+
+if __name__ == "__main__":
+    test_overflow_is_folded_into_the_summary()
+    test_token_budget_moves_old_turns_out()
+    test_messages_stay_verbatim_until_summarized()
+    test_failed_summary_trims_to_budget()
+    test_clear_discards_summary_in_flight()
+    print("Conversation memory checks passed.")
@@ -0,0 +1,149 @@
+
+import sys
+import os
+import random
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import requests
+from utils.http_client import HTTPClient, DeadlineExceeded, RETRY_STATUS_CODES, is_upstream_failure
+from utils.resilience import Deadline
+
+URL = 'https://upstream.test/v1/generate'
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return response
+
+
+class ScriptedSession:
+    """requests.Session stand-in: each request takes the next outcome (status code or exception)"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.timeouts = []
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, tuple):
+            return make_response(*outcome)
+        return make_response(outcome)
+
+
+def client_with(outcomes, **options):
+    """Client whose session for URL's host replays outcomes; no real backoff sleeps"""
+    client = HTTPClient(backoff_base=0.001, **options)
+    client.backoff_max = 0.01
+    client._session_for('upstream.test')
+    session = ScriptedSession(outcomes)
+    client._sessions['upstream.test'] = session
+    return client, session
+
+
+def test_only_transient_failures_are_retried():
+    client, session = client_with([503, 429, 200])
+    assert client.get(URL).status_code == 200
+    assert len(session.timeouts) == 3
+    assert client.get_metrics()['upstream.test']['retries'] == 2
+
+    client, session = client_with([requests.ConnectionError('reset'), 200])
+    assert client.get(URL).status_code == 200 and len(session.timeouts) == 2
+
+    for status in (400, 401, 404):
+        client, session = client_with([status, 200])
+        assert client.get(URL).status_code == status and len(session.timeouts) == 1
+    assert 404 not in RETRY_STATUS_CODES
+
+
+def test_retries_are_bounded():
+    client, session = client_with([500, 500, 500, 200], max_retries=2)
+    response = client.get(URL)
+    assert response.status_code == 500 and len(session.timeouts) == 3
+    assert client.get_metrics()['upstream.test']['errors'] == 1
+
+    client, session = client_with([requests.ConnectionError('down')] * 2, max_retries=1)
+    try:
+        client.get(URL)
+        assert False, "transport error was swallowed"
+    except requests.ConnectionError:
+        pass
+
+
+def test_backoff_is_full_jitter_and_honours_retry_after():
+    client = HTTPClient(backoff_base=0.5)
+    random.seed(7)
+    for attempt in range(6):
+        ceiling = min(client.backoff_max, 0.5 * 2 ** attempt)
+        delays = [client._backoff_delay(attempt, None) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) > ceiling * 0.8 and min(delays) < ceiling * 0.2
+
+    assert client._backoff_delay(0, make_response(429, {'Retry-After': '3'})) == 3.0
+    assert client._backoff_delay(0, make_response(429, {'Retry-After': '120'})) == client.backoff_max
+    # HTTP-date form isn't parsed; falls back to jitter
+    assert client._backoff_delay(0, make_response(503, {'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'})) <= 0.5
+
+
+def test_attempt_timeouts_are_clamped_to_the_deadline():
+    client, session = client_with([200, 200], connect_timeout=3.05, read_timeout=30)
+    client.get(URL, deadline=Deadline(0.5))
+    connect, read = session.timeouts[0]
+    assert 0 < connect <= 0.5 and 0 < read <= 0.5
+
+    client.get(URL, timeout=10, deadline=Deadline(0.5))
+    assert 0 < session.timeouts[1] <= 0.5
+
+    client, session = client_with([200])
+    client.get(URL)
+    assert session.timeouts == [client.default_timeout]
+
+
+def test_deadline_exceeded():
+    # Out of time before the first attempt: nothing is sent
+    client, session = client_with([200])
+    try:
+        client.get(URL, deadline=Deadline(0))
+        assert False, "request sent after the deadline"
+    except DeadlineExceeded:
+        pass
+    assert session.timeouts == []
+
+    # An attempt whose timeout the deadline shortened ran out: the caller's deadline, not the upstream
+    client, session = client_with([requests.ReadTimeout('slow')])
+    try:
+        client.get(URL, deadline=Deadline(0.5), retries=0)
+        assert False, "timeout was swallowed"
+    except DeadlineExceeded as e:
+        assert not is_upstream_failure(e)
+
+    # Without a deadline the same timeout is the upstream's fault
+    client, session = client_with([requests.ReadTimeout('slow')])
+    try:
+        client.get(URL, retries=0)
+        assert False, "timeout was swallowed"
+    except requests.Timeout as e:
+        assert not isinstance(e, DeadlineExceeded) and is_upstream_failure(e)
+
+
+def test_no_retry_that_cannot_finish_in_time():
+    client, session = client_with([(503, {'Retry-After': '5'}), 200])
+    client.backoff_max = 8
+    assert client.get(URL, deadline=Deadline(1)).status_code == 503
+    assert len(session.timeouts) == 1
+
+
+if __name__ == "__main__":
+    test_only_transient_failures_are_retried()
+    test_retries_are_bounded()
+    test_backoff_is_full_jitter_and_honours_retry_after()
+    test_attempt_timeouts_are_clamped_to_the_deadline()
+    test_deadline_exceeded()
+    test_no_retry_that_cannot_finish_in_time()
+    print("HTTP client checks passed.")
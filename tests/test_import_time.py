@@ -0,0 +1,57 @@
+
+import sys
+import os
+import subprocess
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+# Cold-start budget for `import app` (seconds). Timing depends on the machine, so
+# it is only enforced when set (e.g. IMPORT_BUDGET_SECONDS=1.0); otherwise reported
+IMPORT_BUDGET_SECONDS = float(os.getenv('IMPORT_BUDGET_SECONDS', '0')) or None
+
+# Loaded on first use only; importing them at startup costs ~1s each
+LAZY_MODULES = ['nltk', 'sklearn', 'scipy', 'youtube_transcript_api']
+
+
+def measure_app_import():
+    """Import the app in a fresh interpreter with -X importtime; return (rows, loaded lazy modules)"""
+    probe = (
+        "import sys, app; "
+        f"print('LOADED:' + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, DATABASE_URL=os.getenv('DATABASE_URL', 'sqlite://'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    marker = next(line for line in result.stdout.splitlines() if line.startswith('LOADED:'))
+    loaded = [m for m in marker[len('LOADED:'):].split(',') if m]
+    return rows, loaded
+
+
+def test_app_import_time():
+    """Importing the app doesn't pull in heavy optional dependencies (and stays within budget, if one is set)"""
+    rows, loaded = measure_app_import()
+    total = next(cumulative for _, cumulative, name in rows if name.strip() == 'app') / 1e6
+
+    print(f"import app: {total:.3f}s (budget {f'{IMPORT_BUDGET_SECONDS}s' if IMPORT_BUDGET_SECONDS else 'not enforced'})")
+    print("Slowest imports (self time):")
+    for self_us, cumulative_us, name in sorted(rows, reverse=True)[:10]:
+        print(f"  {self_us / 1000:8.1f} ms self  {cumulative_us / 1000:8.1f} ms total  {name.strip()}")
+
+    assert not loaded, f"Heavy modules imported at startup: {loaded}"
+    if IMPORT_BUDGET_SECONDS:
+        assert total < IMPORT_BUDGET_SECONDS, f"import app took {total:.3f}s"
+
+
+if __name__ == "__main__":
+    test_app_import_time()
+    print("Import time check passed.")
@@ -0,0 +1,84 @@
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Shares the throwaway database and fixtures of the submission tests
+from test_activity_submit import app, db, setup_data, submit, QueryCounter, LearningStage
+from models import User, GameProgress
+from services.leaderboard_service import Leaderboard, LeaderboardService
+from services.registry import get_leaderboard_service
+
+
+def test_leaderboard_ordering():
+    board = Leaderboard()
+    for user_id, score in [(1, 50), (2, 80), (3, 50), (4, 10), (5, 95)]:
+        board.update(user_id, user_id, score, {'id': user_id})
+    assert [payload['id'] for _, payload in board.top(3)] == [5, 2, 1]
+    assert board.rank(3) == 4  # ties broken by user id
+
+    board.update(4, 4, 99, {'id': 4})
+    assert board.rank(4) == 1 and board.rank(5) == 2 and len(board) == 5
+    assert [(rank, payload['id']) for rank, payload in board.around(1, 1)] == [(3, 2), (4, 1), (5, 3)]
+
+    # A stale update arriving after a newer one is ignored
+    assert board.update(6, 6, 70, {'id': 6}, version=70)
+    assert not board.update(6, 6, 30, {'id': 6}, version=30)
+    assert board.rank(6) == 4 and len(board) == 6
+
+
+def test_changes_during_first_build_are_replayed():
+    """A change recorded while the first build reads the database isn't lost"""
+    service = LeaderboardService()
+    service._rebuilding = True
+    service.record_progress(7, 'Replay', 120, 2)
+    assert service._replay == [('progress', 7, 'Replay', 120, 2)]
+
+    with app.app_context():
+        db.create_all()
+        service.rebuild()
+        assert service.top('Replay')[0]['score'] == 120
+
+
+def test_leaderboard_served_from_memory():
+    """Views don't query the database; submissions show up immediately"""
+    with app.app_context():
+        db.create_all()
+        leaderboards = get_leaderboard_service()
+        client = app.test_client()
+        user_id, challenge_id = setup_data('board-climber', LearningStage.APPLY, subject='Boards')
+        rival = User(username='board-rival', email='board-rival@example.com', password_hash='x')
+        db.session.add(rival)
+        db.session.flush()
+        db.session.add(GameProgress(user_id=rival.id, subject_focus='Boards', game_module='all_activities',
+                                    score=20, level=1, mastery_points=20))
+        db.session.commit()
+
+        leaderboards.rebuild()
+        with QueryCounter(db.engine) as counter:
+            response = client.get('/api/game/leaderboard/all?subject=Boards')
+        assert response.status_code == 200
+        assert counter.statements == []
+        assert [row['username'] for row in response.get_json()['leaderboard']][0] == 'board-rival'
+
+        submit(client, user_id, challenge_id, 'zero')  # +40 XP
+        board = client.get('/api/game/leaderboard/all?subject=Boards').get_json()['leaderboard']
+        assert [(row['rank'], row['username'], row['score']) for row in board[:2]] == \
+            [(1, 'board-climber', 40), (2, 'board-rival', 20)]
+
+        topic_board = client.get('/api/game/leaderboard/all?subject=Boards&topic=KCL').get_json()['leaderboard']
+        assert topic_board[0]['username'] == 'board-climber' and topic_board[0]['metric'] == 'Proficiency %'
+
+        from utils.auth import generate_token
+        standing = client.get('/api/game/leaderboard/all/me?subject=Boards',
+                              headers={'Authorization': f'Bearer {generate_token(rival.id)}'}).get_json()
+        assert standing['rank'] == 2 and standing['total'] >= 2
+        assert [row['username'] for row in standing['neighbors']][:2] == ['board-climber', 'board-rival']
+
+
+if __name__ == "__main__":
+    test_leaderboard_ordering()
+    test_changes_during_first_build_are_replayed()
+    test_leaderboard_served_from_memory()
+    print("Leaderboard checks passed.")
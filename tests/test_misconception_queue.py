@@ -0,0 +1,90 @@
+
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Shares the throwaway database and fixtures of the submission tests
+from test_activity_submit import app, db, setup_data, LearningLoopState, LearningStage, MisconceptionJob
+from models import JobStatus
+from services.misconception_queue import MisconceptionQueue
+from utils.resilience import CircuitBreaker
+
+
+class StubAI:
+    """AI service stand-in that reports an outage like AIService does"""
+
+    is_available = True
+
+    def __init__(self):
+        self.breaker = CircuitBreaker('stub', failure_threshold=100, reset_timeout=60)
+        self.calls = 0
+
+    def analyze_misconception(self, question, user_answer, correct_answer, subject):
+        self.calls += 1
+        return {'type': 'misconception', 'error': 'AI unavailable'}
+
+
+def queued_job(username):
+    setup_data(username, LearningStage.REMEDIATE)
+    state = LearningLoopState.query.order_by(LearningLoopState.id.desc()).first()
+    job = MisconceptionJob(user_id=state.user_id, loop_state_id=state.id, status=JobStatus.PENDING,
+                           payload=json.dumps({'question': 'q', 'user_answer': 'a', 'correct_answer': 'b', 'subject': 'ECE'}))
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_failed_job_waits_before_retrying():
+    with app.app_context():
+        db.create_all()
+        ai = StubAI()
+        queue = MisconceptionQueue(ai)
+        job_id = queued_job('queue-backoff')
+
+        # Jobs queued by other tests share the database, so check ours rather than counts
+        queue.run_pending()
+        job = db.session.get(MisconceptionJob, job_id)
+        assert job.status == JobStatus.PENDING and job.attempts == 1
+        assert job.next_attempt_at > datetime.utcnow() + timedelta(seconds=queue.backoff_base / 2 - 1)
+
+        # Not due yet: the same loop doesn't burn the remaining attempts
+        calls = ai.calls
+        assert queue.run_pending() == 0 and ai.calls == calls
+
+        job.next_attempt_at = datetime.utcnow()
+        db.session.commit()
+        assert queue.run_pending() == 1
+        assert db.session.get(MisconceptionJob, job_id).attempts == 2
+
+
+def test_backoff_grows_and_is_capped():
+    queue = MisconceptionQueue(StubAI())
+    queue.backoff_base, queue.backoff_max = 10, 60
+    for attempts, ceiling in [(1, 10), (2, 20), (3, 40), (6, 60)]:
+        delay = queue.backoff_delay(attempts)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_open_breaker_defers_without_using_an_attempt():
+    with app.app_context():
+        db.create_all()
+        ai = StubAI()
+        ai.breaker.failure_threshold = 1
+        ai.breaker.record_failure()
+        queue = MisconceptionQueue(ai)
+        job_id = queued_job('queue-breaker')
+
+        queue.run_pending()
+        job = db.session.get(MisconceptionJob, job_id)
+        assert job.status == JobStatus.PENDING and job.attempts == 0 and ai.calls == 0
+        assert job.next_attempt_at > datetime.utcnow()
+
+
+if __name__ == "__main__":
+    test_failed_job_waits_before_retrying()
+    test_backoff_grows_and_is_capped()
+    test_open_breaker_defers_without_using_an_attempt()
+    print("Misconception queue checks passed.")
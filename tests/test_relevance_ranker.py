@@ -0,0 +1,113 @@
+
+import sys
+import os
+import json
+import math
+from collections import Counter
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from models import LearningIntent
+from services.relevance_ranker import RelevanceRanker, intent_terms
+from services.youtube_service import YouTubeService
+from services.content_filter import ContentFilter
+
+# YouTube's order: the outcome-matching video comes last
+RESULTS = [
+    {'video_id': 'overview', 'title': 'Electric circuits crash course', 'description': 'Voltage, current and resistance', 'tags': []},
+    {'video_id': 'history', 'title': 'History of electricity', 'description': 'From Volta to Tesla', 'tags': ['circuits']},
+    {'video_id': 'nodal', 'title': 'Nodal analysis with KCL, step by step', 'description': 'Solve for node voltages', 'tags': []},
+]
+
+INTENT = LearningIntent(subject='ECE', topic='KCL', sub_topic='Nodal analysis',
+                        required_outcomes=json.dumps(['Apply nodal analysis to find node voltages']),
+                        created_at=datetime.utcnow())
+
+
+def ids(videos):
+    return [video['video_id'] for video in videos]
+
+
+def fresh():
+    return [dict(video) for video in RESULTS]
+
+
+class FixedResults:
+    """Search result cache stand-in returning RESULTS"""
+
+    fetch_size = 10
+
+    def get_or_fetch(self, query, subject_focus, size, fetch):
+        return fresh()
+
+
+def reference_scores(ranker, videos, context):
+    """BM25 computed video by video, to check the vectorized version against"""
+    query = set(ranker._tokens(' '.join(context)))
+    documents = [Counter(ranker._document(video)) for video in videos]
+    lengths = [sum(document.values()) for document in documents]
+    average_length = sum(lengths) / len(lengths)
+    n = len(documents)
+    scores = []
+    for document, length in zip(documents, lengths):
+        norm = ranker.K1 * (1 - ranker.B + ranker.B * length / average_length)
+        score = 0.0
+        for term in query:
+            df = sum(1 for other in documents if term in other)
+            tf = document.get(term)
+            if tf:
+                score += math.log(1 + (n - df + 0.5) / (df + 0.5)) * tf * (ranker.K1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def test_vectorized_scores_match_reference():
+    ranker = RelevanceRanker()
+    context = ['ECE', 'circuits'] + intent_terms(INTENT)
+    videos = fresh() + [{'video_id': 'empty', 'title': '', 'description': '', 'tags': []}]
+    scores = ranker.match_scores(videos, context)
+    assert all(abs(a - b) < 1e-9 for a, b in zip(scores, reference_scores(ranker, videos, context)))
+    assert scores[-1] == 0.0 and len(scores) == len(videos)
+    assert ranker.match_scores(videos, ['the']) == [0.0] * len(videos)  # stop words only
+
+
+def test_outcome_match_outranks_earlier_result():
+    ranker = RelevanceRanker()
+    ranker.match_weight = 0.5
+    ranked = ranker.rank(fresh(), ['ECE', 'circuits'] + intent_terms(INTENT))
+    assert ids(ranked)[0] == 'nodal'
+    assert ranked[0]['match_score'] > ranked[1]['match_score']
+
+
+def test_zero_match_weight_keeps_youtube_order():
+    ranker = RelevanceRanker()
+    ranker.match_weight = 0
+    assert ids(ranker.rank(fresh(), ['ECE', 'circuits'] + intent_terms(INTENT))) == ids(RESULTS)
+
+
+def test_intent_terms_accepts_model_or_dict():
+    expected = ['KCL', 'Nodal analysis', 'Apply nodal analysis to find node voltages']
+    assert intent_terms(INTENT) == expected
+    assert intent_terms(INTENT.to_dict()) == expected
+    assert intent_terms(None) == []
+
+
+def test_search_videos_ranks_against_intent():
+    """The intent passed to search_videos decides the order of the cached results"""
+    service = YouTubeService(api_key='test-key', ai_service=object(), content_filter=ContentFilter())
+    service.result_cache = FixedResults()
+    service.ranker.match_weight = 0.5
+
+    assert ids(service.search_videos('circuits', 'ECE', max_results=3, intent=INTENT))[0] == 'nodal'
+    assert ids(service.search_videos('circuits', 'ECE', max_results=3)) == ['overview', 'history', 'nodal']
+
+
+if __name__ == "__main__":
+    test_vectorized_scores_match_reference()
+    test_outcome_match_outranks_earlier_result()
+    test_zero_match_weight_keeps_youtube_order()
+    test_intent_terms_accepts_model_or_dict()
+    test_search_videos_ranks_against_intent()
+    print("Relevance ranker checks passed.")
@@ -0,0 +1,197 @@
+
+import sys
+import os
+import time
+import threading
+from collections import deque
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from utils import resilience
+from utils.resilience import CircuitBreaker, hedged_call, deadline_scope, current_deadline
+
+RESET_SECONDS = 0.05
+
+
+def make_breaker():
+    return CircuitBreaker('test', failure_threshold=2, reset_timeout=RESET_SECONDS, slow_call_seconds=1.0)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = make_breaker()
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+
+    # A success resets the count
+    breaker.record_success(0.01)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    assert breaker.get_stats()['trips'] == 1 and breaker.get_stats()['short_circuited'] == 1
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(RESET_SECONDS)
+
+    # Exactly one trial call is let through
+    assert breaker.allow() and breaker.state == 'half_open'
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    time.sleep(RESET_SECONDS)
+    assert breaker.allow()
+    breaker.record_success(0.01)
+    assert breaker.state == 'closed' and breaker.allow()
+
+
+def test_slow_calls_count_as_failures():
+    breaker = make_breaker()
+    breaker.record_success(2.0)
+    breaker.record_success(2.0)
+    assert breaker.state == 'open'
+    assert breaker.get_stats()['slow_calls'] == 2
+
+
+def test_release_frees_the_trial_without_counting():
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(RESET_SECONDS)
+    assert breaker.allow()
+
+    breaker.release()
+    assert breaker.state == 'half_open' and breaker.get_stats()['failures'] == 2
+    assert breaker.allow()
+
+
+def test_hedged_call_without_hedge():
+    threads = []
+
+    def fast():
+        threads.append(threading.current_thread())
+        return 'ok'
+
+    assert hedged_call(fast, hedge_after=1.0) == 'ok'
+    assert threads == [threading.current_thread()]
+
+
+def test_concurrent_calls_dont_queue_into_hedges():
+    """A healthy upstream under load is called once per caller"""
+    calls, latencies = [], []
+
+    def upstream():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'ok'
+
+    def call():
+        started = time.monotonic()
+        hedged_call(upstream, hedge_after=0.3)
+        latencies.append(time.monotonic() - started)
+
+    workers = [threading.Thread(target=call) for _ in range(24)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(calls) == 24 and max(latencies) < 0.3
+
+
+def slow_then_fast(first_result):
+    """fn whose first attempt is slow and returns first_result; the hedge answers at once"""
+    calls = []
+
+    def fn():
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            time.sleep(0.2)
+            return first_result
+        return 'hedge'
+    return fn, calls
+
+
+def test_hedge_covers_a_failed_first_attempt():
+    fn, calls = slow_then_fast(None)
+    assert hedged_call(fn, hedge_after=0.02) == 'hedge'
+    assert len(calls) == 2 and calls[1] is not threading.current_thread()
+
+    fn, calls = slow_then_fast('first')
+    assert hedged_call(fn, hedge_after=0.02) == 'first'
+
+
+def test_hedged_call_skips_failed_attempts():
+    attempts = iter(['boom', None])
+
+    def flaky():
+        outcome = next(attempts)
+        time.sleep(0.1)
+        if outcome == 'boom':
+            raise RuntimeError(outcome)
+        return outcome
+
+    assert hedged_call(flaky, hedge_after=0.01) is None
+
+    def failing():
+        raise RuntimeError('no hedge')
+    try:
+        hedged_call(failing, hedge_after=1.0)
+        assert False, "error of an unhedged call was swallowed"
+    except RuntimeError:
+        pass
+
+
+def test_no_hedge_when_budget_spent_or_pool_busy():
+    recent = resilience._recent_calls
+    resilience._recent_calls = deque([True] * resilience.HEDGE_WINDOW, maxlen=resilience.HEDGE_WINDOW)
+    try:
+        fn, calls = slow_then_fast(None)
+        assert hedged_call(fn, hedge_after=0.02) is None and len(calls) == 1
+    finally:
+        resilience._recent_calls = recent
+
+    resilience._hedges_running += resilience.HEDGE_MAX_WORKERS
+    try:
+        fn, calls = slow_then_fast(None)
+        assert hedged_call(fn, hedge_after=0.02) is None and len(calls) == 1
+    finally:
+        resilience._hedges_running -= resilience.HEDGE_MAX_WORKERS
+
+    metrics = resilience.get_hedge_metrics()
+    assert metrics['skipped_budget'] >= 1 and metrics['skipped_saturated'] >= 1
+
+
+def test_hedged_call_carries_the_deadline():
+    seen = []
+
+    def check():
+        seen.append(current_deadline())
+        if len(seen) == 1:
+            time.sleep(0.1)
+            return None
+        return 'ok'
+
+    with deadline_scope(5) as deadline:
+        assert hedged_call(check, hedge_after=0.01) == 'ok'
+    assert seen == [deadline, deadline]
+
+
+if __name__ == "__main__":
+    test_breaker_opens_after_consecutive_failures()
+    test_half_open_trial_closes_or_reopens()
+    test_slow_calls_count_as_failures()
+    test_release_frees_the_trial_without_counting()
+    test_hedged_call_without_hedge()
+    test_concurrent_calls_dont_queue_into_hedges()
+    test_hedge_covers_a_failed_first_attempt()
+    test_hedged_call_skips_failed_attempts()
+    test_no_hedge_when_budget_spent_or_pool_busy()
+    test_hedged_call_carries_the_deadline()
+    print("Resilience checks passed.")
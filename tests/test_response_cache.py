@@ -0,0 +1,102 @@
+
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from utils import response_cache
+from utils.response_cache import ResponseCache
+
+
+class FakeClock:
+    """Stands in for the time module inside response_cache"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def temp_path():
+    return os.path.join(tempfile.mkdtemp(), 'cache.db')
+
+
+def test_lru_eviction_falls_back_to_disk():
+    cache = ResponseCache('t', path=temp_path(), ttl=60, stale_ttl=60, max_entries=2)
+    cache.set('a', {'n': 1})
+    cache.set('b', {'n': 2})
+    assert cache.get('a') == ({'n': 1}, True)  # 'a' is now the most recent
+    cache.set('c', {'n': 3})  # evicts 'b'
+
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1 and stats['memory_entries'] == 2 and stats['memory_hits'] == 1
+
+    # 'b' is still on disk and comes back into memory
+    assert cache.get('b') == ({'n': 2}, True)
+    stats = cache.get_stats()
+    assert stats['disk_hits'] == 1 and stats['memory_entries'] == 2
+    assert cache.get('missing') == (None, False)
+
+
+def test_disk_tier_survives_a_new_instance():
+    path = temp_path()
+    ResponseCache('t', path=path, ttl=60, stale_ttl=60).set('key', ['value'])
+
+    reopened = ResponseCache('t', path=path, ttl=60, stale_ttl=60)
+    assert reopened.get('key') == (['value'], True)
+    assert reopened.get_stats()['disk_hits'] == 1
+
+    # Namespaces sharing a file don't see each other's entries
+    assert ResponseCache('other', path=path, ttl=60, stale_ttl=60).get('key') == (None, False)
+
+
+def test_ttl_and_stale_reads():
+    clock = FakeClock()
+    original = response_cache.time
+    response_cache.time = clock
+    try:
+        cache = ResponseCache('t', path=temp_path(), ttl=10, stale_ttl=20)
+        cache.set('key', 'value')
+
+        clock.now += 10
+        assert cache.get('key') == ('value', True)
+
+        clock.now += 5  # past the TTL, inside the stale window
+        assert cache.get('key') == (None, False)
+        assert cache.get('key', allow_stale=True) == ('value', False)
+
+        clock.now += 20  # past both
+        assert cache.get('key', allow_stale=True) == (None, False)
+        stats = cache.get_stats()
+        assert stats['hits'] == 1 and stats['stale_hits'] == 1 and stats['misses'] == 2
+    finally:
+        response_cache.time = original
+
+
+def test_get_returns_private_copies():
+    cache = ResponseCache('t', path='', ttl=60, stale_ttl=60)
+    cache.set('key', {'items': [1]})
+    value, _ = cache.get('key')
+    value['items'].append(2)
+    assert cache.get('key') == ({'items': [1]}, True)
+
+
+def test_empty_path_disables_disk_tier():
+    cache = ResponseCache('t', path='', ttl=60, stale_ttl=60, max_entries=1)
+    assert cache._db is None
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == (None, False)
+    assert cache.get('b') == (2, True)
+
+
+if __name__ == "__main__":
+    test_lru_eviction_falls_back_to_disk()
+    test_disk_tier_survives_a_new_instance()
+    test_ttl_and_stale_reads()
+    test_get_returns_private_copies()
+    test_empty_path_disables_disk_tier()
+    print("Response cache checks passed.")
@@ -0,0 +1,84 @@
+
+import sys
+import os
+import time
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Shares the throwaway database of the submission tests
+from test_activity_submit import app, db
+from models import ContentItem
+from services.search_cache_service import SearchResultCache
+
+CALLERS = 10
+
+
+def video(video_id):
+    return {'video_id': video_id, 'title': f'Lecture {video_id}', 'source': 'youtube', 'subject_focus': 'ECE'}
+
+
+class CountingFetch:
+    """search.list stand-in; slow enough that concurrent misses overlap"""
+
+    def __init__(self, videos):
+        self.videos = videos
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, query, subject_focus, size):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return [dict(v) for v in self.videos]
+
+
+def test_concurrent_misses_share_one_search():
+    cache = SearchResultCache()
+    fetch = CountingFetch([video('a'), video('b')])
+    results = []
+
+    def search():
+        with app.app_context():
+            results.append(cache.get_or_fetch('Ohms law', 'ECE', 5, fetch))
+            db.session.remove()
+
+    with app.app_context():
+        db.create_all()
+    threads = [threading.Thread(target=search) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert len(results) == CALLERS and all([v['video_id'] for v in r] == ['a', 'b'] for r in results)
+    with app.app_context():
+        assert ContentItem.query.filter_by(search_key=cache.make_key('Ohms law', 'ECE')).count() == 2
+
+
+def test_store_keeps_one_row_per_video():
+    cache = SearchResultCache()
+    with app.app_context():
+        db.create_all()
+        key = cache.make_key('duplicates', 'ECE')
+        cache._store(key, [video('x'), video('y'), video('x')])
+        cache._store(key, [video('y'), video('z')])
+        rows = cache._load(key)
+        assert [(row.source_id, row.search_rank) for row in rows] == [('y', 0), ('z', 1)]
+
+        # A second writer inserting the same list without deleting first is refused
+        db.session.add(ContentItem(title='y', source='youtube', source_id='y', url='u', subject_focus='ECE',
+                                   search_key=key, search_rank=5))
+        try:
+            db.session.commit()
+            assert False, "duplicate cached row was accepted"
+        except Exception:
+            db.session.rollback()
+        assert len(cache._load(key)) == 2
+
+
+if __name__ == "__main__":
+    test_concurrent_misses_share_one_search()
+    test_store_keeps_one_row_per_video()
+    print("Search cache checks passed.")
@@ -0,0 +1,93 @@
+
+import sys
+import os
+import time
+import threading
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from utils.singleflight import SingleFlight
+
+CALLERS = 5
+
+
+def run_concurrently(group, key, fn):
+    """Call group.do(key, fn) from CALLERS threads; returns (results, errors)"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(group.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def wait_for_followers(group):
+    deadline = time.monotonic() + 5
+    while group.get_stats()['collapsed'] < CALLERS - 1:
+        assert time.monotonic() < deadline, "followers never joined the flight"
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def slow_fetch():
+        executions.append(1)
+        release.wait(5)
+        return {'items': [1, 2, 3]}
+
+    threads, results, errors = run_concurrently(group, 'prompt', slow_fetch)
+    wait_for_followers(group)
+    assert group.get_stats()['in_flight'] == 1
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert not errors and len(executions) == 1
+    assert results == [{'items': [1, 2, 3]}] * CALLERS
+    # Every caller has its own copy
+    assert len({id(result) for result in results}) == CALLERS
+    assert group.get_stats() == {'calls': CALLERS, 'executed': 1, 'collapsed': CALLERS - 1, 'in_flight': 0}
+
+
+def test_error_reaches_every_caller():
+    group = SingleFlight()
+    release = threading.Event()
+
+    def failing_fetch():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    threads, results, errors = run_concurrently(group, 'prompt', failing_fetch)
+    wait_for_followers(group)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert not results and len(errors) == CALLERS
+    assert all(str(error) == "upstream down" for error in errors)
+
+
+def test_nothing_is_remembered_after_a_call():
+    group = SingleFlight()
+    counter = iter(range(10))
+    assert group.do('key', lambda: next(counter)) == 0
+    assert group.do('key', lambda: next(counter)) == 1
+    assert group.do('other', lambda: 'x') == 'x'
+    assert group.get_stats()['collapsed'] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_execution()
+    test_error_reaches_every_caller()
+    test_nothing_is_remembered_after_a_call()
+    print("Singleflight checks passed.")
@@ -0,0 +1,70 @@
+
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from services.transcript_retrieval import TranscriptRetriever
+
+
+def segments(*texts, spacing=30):
+    """One segment per passage window, `spacing` seconds apart"""
+    return [{'start': i * spacing, 'duration': spacing, 'text': text} for i, text in enumerate(texts)]
+
+
+LECTURE = segments(
+    "Welcome to the course, today we review circuit basics",
+    "Kirchhoff's current law says currents entering a node sum to zero",
+    "Thevenin equivalent replaces a network with a source and resistor",
+    "Capacitors store energy in an electric field between plates",
+)
+
+
+def make_retriever():
+    retriever = TranscriptRetriever()
+    retriever.window = 30
+    return retriever
+
+
+def test_matching_passage_ranks_first():
+    retriever = make_retriever()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return LECTURE
+
+    hits = retriever.retrieve('lec', 'v1', loader, 'what is the current law at a node', k=1)
+    assert [hit['start'] for hit in hits] == [30]
+    assert 'Kirchhoff' in hits[0]['text'] and hits[0]['score'] > 0
+
+    hits = retriever.retrieve('lec', 'v1', loader, 'how does a capacitor store energy', k=1)
+    assert [hit['start'] for hit in hits] == [90]
+    # The index is reused until the transcript version changes
+    assert len(loads) == 1
+    retriever.retrieve('lec', 'v2', loader, 'capacitor', k=1)
+    assert len(loads) == 2
+
+
+def test_timestamp_breaks_text_ties():
+    # The same sentence is repeated early and late in the video
+    repeated = "Ohm's law relates voltage current and resistance"
+    lecture = segments(repeated, "An unrelated aside about lab safety", "More on lab equipment",
+                       "Another aside on grading", repeated, spacing=60)
+    retriever = make_retriever()
+    retriever.window = 60
+
+    for timestamp, expected in ((20, 0), (250, 240), (1000, 240)):
+        hits = retriever.retrieve('ohm', 'v1', lambda: lecture, 'explain ohms law', timestamp=timestamp, k=1)
+        assert [hit['start'] for hit in hits] == [expected], timestamp
+
+    # Without a position the two passages score the same
+    hits = retriever.retrieve('ohm', 'v1', lambda: lecture, 'explain ohms law', k=2)
+    assert [hit['start'] for hit in hits] == [0, 240] and hits[0]['score'] == hits[1]['score']
+
+
+if __name__ == "__main__":
+    test_matching_passage_ranks_first()
+    test_timestamp_breaks_text_ties()
+    print("Transcript retrieval checks passed.")
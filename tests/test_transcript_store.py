@@ -0,0 +1,101 @@
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Shares the throwaway database of the submission tests
+from test_activity_submit import app, db
+from services.registry import get_transcript_store
+
+SEGMENTS = [
+    {'text': 'voltage is the push', 'start': 0, 'duration': 5},
+    {'text': 'current is the flow', 'start': 5, 'duration': 5},
+    {'text': 'resistance opposes it', 'start': 10, 'duration': 2},
+    {'text': 'ohms law ties them together', 'start': 20, 'duration': 5},
+]
+
+
+class FakeYouTube:
+    """youtube_service stand-in that counts transcript fetches"""
+
+    def __init__(self):
+        self.fetches = []
+
+    def fetch_transcript(self, video_id):
+        self.fetches.append(video_id)
+        return [dict(segment) for segment in reversed(SEGMENTS)]
+
+
+def with_fake_youtube(test):
+    def run():
+        store = get_transcript_store()
+        original = store.youtube_service
+        store.youtube_service = FakeYouTube()
+        try:
+            with app.app_context():
+                db.create_all()
+                test(store)
+        finally:
+            store.youtube_service = original
+    run.__name__ = test.__name__
+    return run
+
+
+def texts(segments):
+    return [segment['text'] for segment in segments]
+
+
+@with_fake_youtube
+def test_range_lookup(store):
+    record = store.get('range-video')
+    assert record.is_available and record.segment_count == 4
+
+    # Segment 1 is still playing at 6s; segment 2 starts before 11s
+    first, segments = store.segments_between(record, 6, 11)
+    assert first == 1 and texts(segments) == texts(SEGMENTS[1:3])
+
+    # The gap between segments 2 and 3
+    first, segments = store.segments_between(record, 13, 19)
+    assert first == 3 and segments == []
+
+    # Boundaries: segment 0 ends at 5s, segment 2 starts at 10s
+    first, segments = store.segments_between(record, 5, 10)
+    assert first == 1 and texts(segments) == texts(SEGMENTS[1:2])
+
+    first, segments = store.segments_around(record, 11, 3)
+    assert first == 1 and texts(segments) == texts(SEGMENTS[1:4])
+    first, segments = store.segments_around(record, 0, 3)
+    assert first == 0 and len(segments) == 3
+
+
+@with_fake_youtube
+def test_conditional_requests(store):
+    client = app.test_client()
+    response = client.get('/api/content/transcript/etag-video')
+    assert response.status_code == 200
+    assert texts(response.get_json()['transcript']) == texts(SEGMENTS)
+    etag = response.headers['ETag']
+
+    response = client.get('/api/content/transcript/etag-video', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.headers['ETag'] == etag
+
+    response = client.get('/api/content/transcript/etag-video/range?start=6&end=11')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['first_index'] == 1 and body['total_segments'] == 4 and len(body['transcript']) == 2
+
+    range_etag = response.headers['ETag']
+    assert range_etag != etag
+    response = client.get('/api/content/transcript/etag-video/range?start=6&end=11',
+                          headers={'If-None-Match': range_etag})
+    assert response.status_code == 304
+
+    # Stored once, never refetched
+    assert store.youtube_service.fetches == ['etag-video']
+
+
+if __name__ == "__main__":
+    test_range_lookup()
+    test_conditional_requests()
+    print("Transcript store checks passed.")
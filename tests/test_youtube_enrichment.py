@@ -0,0 +1,85 @@
+
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from services.youtube_service import YouTubeService, VIDEOS_LIST_BATCH, _parse_duration
+from services.content_filter import ContentFilter
+from utils.response_cache import ResponseCache
+
+
+class DetailsResponse:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'items': [{
+            'id': video_id,
+            'snippet': {'tags': ['lecture'], 'categoryId': '27'},
+            'contentDetails': {'duration': 'PT10M'},
+            'statistics': {'viewCount': '1500', 'likeCount': '30'}
+        } for video_id in self.ids]}
+
+
+class VideosListStub:
+    """HTTP client stand-in answering videos.list; records the ids of each call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, deadline=None):
+        assert url.endswith('/videos')
+        ids = params['id'].split(',')
+        self.calls.append(ids)
+        return DetailsResponse(ids)
+
+
+def make_service():
+    service = YouTubeService(api_key='test-key', ai_service=object(), content_filter=ContentFilter())
+    service.http = VideosListStub()
+    service.details_cache = ResponseCache('video_details_test', path='', ttl=60, stale_ttl=60)
+    return service
+
+
+def test_details_fetched_in_batches_then_cached():
+    service = make_service()
+    videos = [{'video_id': f'vid{i:03d}', 'title': f'Lecture {i}'} for i in range(120)]
+
+    service._enrich(videos)
+    assert [len(ids) for ids in service.http.calls] == [VIDEOS_LIST_BATCH, VIDEOS_LIST_BATCH, 20]
+    assert sorted(video_id for ids in service.http.calls for video_id in ids) == [v['video_id'] for v in videos]
+    assert all(video['duration_seconds'] == 600 and video['view_count'] == 1500 for video in videos)
+
+    # Second pass: every id is cached, no videos.list call
+    again = [{'video_id': video['video_id'], 'title': video['title']} for video in videos]
+    service._enrich(again)
+    assert len(service.http.calls) == 3
+    assert all(video['tags'] == ['lecture'] and video['category_id'] == '27' for video in again)
+
+
+def test_only_uncached_ids_are_fetched():
+    service = make_service()
+    service._enrich([{'video_id': 'known'}])
+    service._enrich([{'video_id': 'known'}, {'video_id': 'new'}])
+    assert service.http.calls == [['known'], ['new']]
+
+
+def test_parse_duration():
+    assert _parse_duration('PT1H2M3S') == 3723
+    assert _parse_duration('PT45S') == 45
+    assert _parse_duration('P0D') == 0
+    assert _parse_duration('P1DT1M') == 86460
+    for malformed in (None, '', 'PT', 'P', '1:02:03', 'PT1X', 'pt45s', 'PT45S '):
+        assert _parse_duration(malformed) is None, malformed
+
+
+if __name__ == "__main__":
+    test_details_fetched_in_batches_then_cached()
+    test_only_uncached_ids_are_fetched()
+    test_parse_duration()
+    print("YouTube enrichment checks passed.")